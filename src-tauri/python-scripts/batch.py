@@ -0,0 +1,274 @@
+"""
+Génération de rapports en lot sur plusieurs expériences.
+
+Usage:
+    python main.py --batch <racines ou globs...> --metrics <json ou fichier.json>
+                   [--out-dir DIR] [--workers N] [--no-resume]
+
+Chaque racine est un dossier contenant `Bobine_data/`. Les rapports sont
+générés dans un pool de processus ; l'état de chaque expérience est ajouté
+au journal `batch_state.jsonl` (dans --out-dir, ou le répertoire courant),
+ce qui permet de reprendre un lot interrompu sans refaire les rapports déjà
+produits. Une expérience n'est ignorée que si son rapport a été produit
+avec les mêmes métriques, la même version de rapport (REPORT_VERSION) et les
+mêmes fichiers (empreinte de Bobine_data).
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+
+from utils.fingerprint import directory_fingerprint
+from utils.text_utils import sanitize_for_filename
+
+STATE_FILE = "batch_state.jsonl"
+# Version du contenu des rapports (à incrémenter si les calculs ou les
+# constantes changent : COMPOUND_MAPPING, METRIC_SPECS...)
+REPORT_VERSION = 1
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+def expand_experiment_roots(patterns: list[str]) -> list[str]:
+    """
+    Développe les chemins/globs en une liste triée de racines d'expérience.
+
+    Args:
+        patterns: Chemins ou motifs glob (ex: "archive/*")
+
+    Returns:
+        Liste de chemins absolus contenant un dossier Bobine_data (sans doublons)
+    """
+    roots = []
+    seen = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern) or [pattern]
+        for path in sorted(matches):
+            path = os.path.abspath(path)
+            if path in seen or not os.path.isdir(os.path.join(path, "Bobine_data")):
+                continue
+            seen.add(path)
+            roots.append(path)
+    return roots
+
+
+def load_metrics_spec(spec: str) -> dict:
+    """Charge le spec metrics_wanted depuis une chaîne JSON ou un fichier .json."""
+    if os.path.isfile(spec):
+        with open(spec, encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(spec)
+
+
+def load_state(state_path: str) -> dict[str, dict]:
+    """
+    Lit le journal d'un lot précédent.
+
+    Returns:
+        Dictionnaire {racine: dernier enregistrement} (lignes illisibles ignorées)
+    """
+    state = {}
+    if not os.path.exists(state_path):
+        return state
+    with open(state_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                state[record["root"]] = record
+            except (ValueError, KeyError):
+                continue
+    return state
+
+
+def metrics_hash(metrics_wanted: dict) -> str:
+    """Empreinte (sha1) du spec metrics_wanted, indépendante de l'ordre des clés."""
+    return hashlib.sha1(json.dumps(metrics_wanted, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _data_fingerprint(root: str) -> Optional[str]:
+    try:
+        return directory_fingerprint(os.path.join(root, "Bobine_data"))
+    except FileNotFoundError:
+        return None
+
+
+def plan_output_paths(roots: list[str], out_dir: Optional[str]) -> dict[str, Optional[str]]:
+    """
+    Chemin de sortie de chaque racine.
+
+    Sans out_dir, le chemin vaut None : le rapport est écrit dans la racine
+    elle-même sous le nom d'expérience du contexte. Avec out_dir, il est nommé
+    d'après le dossier de l'expérience (suffixé en cas de doublon).
+    """
+    paths = {}
+    used = set()
+    for root in roots:
+        if out_dir is None:
+            paths[root] = None
+            continue
+        base = sanitize_for_filename(os.path.basename(root)) or "experience"
+        name, i = base, 2
+        while name in used:
+            name = f"{base}_{i}"
+            i += 1
+        used.add(name)
+        paths[root] = os.path.join(out_dir, f"{name}.xlsx")
+    return paths
+
+
+def _remove_partial(out_path: Optional[str]) -> None:
+    """Supprime le fichier .part laissé par un enregistrement interrompu."""
+    if out_path is None:
+        return
+    try:
+        os.remove(out_path + ".part")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"[BATCH] Impossible de supprimer {out_path}.part: {e}", file=sys.stderr)
+
+
+def generate_report(root: str, metrics_wanted: dict, out_path: Optional[str]) -> dict:
+    """
+    Génère le rapport d'une expérience (exécuté dans un processus du pool).
+
+    Returns:
+        Enregistrement d'état {"root", "status", "out_path", "seconds", "error"}
+    """
+    start = time.perf_counter()
+    try:
+        import main
+
+        if out_path is None:
+            out_path = os.path.join(root, f"{main.get_context_experience_name(root)}.xlsx")
+        masses = main.get_context_masses(root)
+        wb = main.save_to_excel_with_charts(root, metrics_wanted, masses)
+        tmp_path = out_path + ".part"
+        wb.save(tmp_path)
+        os.replace(tmp_path, out_path)
+        return {
+            "root": root,
+            "status": STATUS_OK,
+            "out_path": out_path,
+            "seconds": round(time.perf_counter() - start, 3),
+            "error": None,
+        }
+    except Exception as e:
+        print(f"[BATCH] {root}: {e}", file=sys.stderr)
+        print(traceback.format_exc(), file=sys.stderr)
+        _remove_partial(out_path)
+        return {
+            "root": root,
+            "status": STATUS_ERROR,
+            "out_path": out_path,
+            "seconds": round(time.perf_counter() - start, 3),
+            "error": str(e),
+        }
+
+
+def run_batch(
+    roots: list[str],
+    metrics_wanted: dict,
+    out_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+    resume: bool = True,
+) -> dict:
+    """
+    Génère les rapports de toutes les racines dans un pool de processus.
+
+    Args:
+        roots: Racines d'expérience (voir expand_experiment_roots)
+        metrics_wanted: Même format que GENERATE_EXCEL_TO_FILE
+        out_dir: Répertoire de sortie (défaut: chaque racine)
+        workers: Nombre de processus (défaut: os.cpu_count())
+        resume: Ignore les racines déjà générées avec succès dans le journal
+
+    Returns:
+        Résumé {"total", "skipped", "ok", "error", "seconds", "reports_per_min", "results"}
+    """
+    state_dir = out_dir or os.getcwd()
+    os.makedirs(state_dir, exist_ok=True)
+    state_path = os.path.join(state_dir, STATE_FILE)
+
+    previous = load_state(state_path) if resume else {}
+    out_paths = plan_output_paths(roots, out_dir)
+    # Clé de reprise : un rapport n'est réutilisé que s'il a été produit à
+    # l'identique (mêmes métriques, même version, mêmes fichiers)
+    run_key = {"metrics_hash": metrics_hash(metrics_wanted), "report_version": REPORT_VERSION}
+    fingerprints = {root: _data_fingerprint(root) for root in roots}
+
+    def up_to_date(root: str) -> bool:
+        record = previous.get(root, {})
+        return (record.get("status") == STATUS_OK
+                and os.path.exists(record.get("out_path") or "")
+                and all(record.get(k) == v for k, v in run_key.items())
+                and fingerprints[root] is not None
+                and record.get("fingerprint") == fingerprints[root])
+
+    todo = [root for root in roots if not up_to_date(root)]
+    skipped = len(roots) - len(todo)
+    if skipped:
+        print(f"[BATCH] {skipped} expérience(s) déjà générée(s), ignorée(s)", file=sys.stderr)
+
+    results = []
+    start = time.perf_counter()
+    with open(state_path, "a", encoding="utf-8") as journal, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(generate_report, root, metrics_wanted, out_paths[root]): root
+            for root in todo
+        }
+        for n, future in enumerate(as_completed(futures), start=1):
+            root = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                # Processus du pool tué (mémoire, crash natif...)
+                _remove_partial(out_paths[root])
+                record = {"root": root, "status": STATUS_ERROR, "out_path": out_paths[root],
+                          "seconds": None, "error": str(e)}
+            record.update(run_key, fingerprint=fingerprints[root])
+            journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+            journal.flush()
+            results.append(record)
+            print(f"[BATCH] {n}/{len(todo)} {record['status']} {root}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    n_ok = sum(1 for r in results if r["status"] == STATUS_OK)
+    return {
+        "total": len(roots),
+        "skipped": skipped,
+        "ok": n_ok,
+        "error": len(results) - n_ok,
+        "seconds": round(elapsed, 3),
+        "reports_per_min": round(n_ok / elapsed * 60, 2) if elapsed > 0 else None,
+        "results": results,
+    }
+
+
+def main(argv: list[str]) -> dict:
+    parser = argparse.ArgumentParser(prog="main.py --batch", description="Génération de rapports en lot")
+    parser.add_argument("roots", nargs="+", help="Racines d'expérience ou motifs glob")
+    parser.add_argument("--metrics", required=True, help="metrics_wanted (JSON ou chemin d'un fichier .json)")
+    parser.add_argument("--out-dir", default=None, help="Répertoire de sortie des rapports")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--no-resume", action="store_true", help="Regénère aussi les rapports déjà produits")
+    args = parser.parse_args(argv)
+
+    roots = expand_experiment_roots(args.roots)
+    if not roots:
+        raise FileNotFoundError("Aucune racine d'expérience (dossier contenant Bobine_data) trouvée")
+
+    return run_batch(
+        roots,
+        load_metrics_spec(args.metrics),
+        out_dir=args.out_dir,
+        workers=args.workers,
+        resume=not args.no_resume,
+    )
@@ -0,0 +1,175 @@
+"""
+Harnais de non-régression mémoire des processeurs.
+
+Usage:
+    python benchmarks/memory.py [--scales 1,10,100] [--baseline FICHIER.json]
+                                [--max-ratio 1.25] [--write-baseline]
+
+Pour chaque facteur de taille, un dossier d'expérience synthétique est généré
+(benchmarks/synthetic.py) puis chaque étape est exécutée sous tracemalloc dans
+un processus neuf : parsing Pignat, ChromeleonOnline (+ tableaux de
+synthèse), ChromeleonOffline (+ tableaux par carbone) et rapport complet
+(save_to_excel_with_charts + wb.save). Pour chaque étape on relève le pic et
+la mémoire retenue (encore allouée à la fin de l'étape).
+
+Avec --baseline, le script échoue (code 1) si le pic d'une étape dépasse
+max-ratio fois celui de la référence ; --write-baseline enregistre les
+mesures courantes comme nouvelle référence.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_MAX_RATIO = 1.25
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "memory_baseline.json")
+
+
+def _measure(stage, results: dict, name: str) -> None:
+    """Exécute `stage` sous tracemalloc et enregistre pic et mémoire retenue (Ko)."""
+    gc.collect()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = stage()
+    after, peak = tracemalloc.get_traced_memory()
+    results[name] = {
+        "peak_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((after - before) / 1024, 1),
+    }
+    del kept
+    gc.collect()
+
+
+def run_stages(root: str) -> dict:
+    """Mesure chaque étape sur l'expérience `root` (exécuté dans un processus dédié)."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    sys.path.insert(0, BENCHMARKS_DIR)
+    # Imports hors mesure: seul le traitement des données est compté
+    import main
+    from pignat import PignatData
+    from chromeleon_online import ChromeleonOnline
+    from chromeleon_offline import ChromeleonOffline
+    from synthetic import FULL_REPORT_METRICS
+
+    dirs = main.getDirectories(root)
+
+    def pignat():
+        return PignatData(dirs[main.PIGNAT])
+
+    def chromeleon_online():
+        online = ChromeleonOnline(dirs[main.CHROMELEON_ONLINE])
+        return online, online.make_summary_tables()
+
+    def chromeleon_offline():
+        offline = ChromeleonOffline(dirs[main.CHROMELEON_OFFLINE])
+        return offline, offline.get_relative_area_by_carbon_tables()
+
+    def report():
+        wb = main.save_to_excel_with_charts(root, FULL_REPORT_METRICS, main.get_context_masses(root))
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        return buffer.getbuffer().nbytes
+
+    results = {}
+    tracemalloc.start()
+    try:
+        for name, stage in (
+            ("pignat", pignat),
+            ("chromeleon_online", chromeleon_online),
+            ("chromeleon_offline", chromeleon_offline),
+            ("save_to_excel_with_charts", report),
+        ):
+            _measure(stage, results, name)
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def measure_scale(scale: float, work_dir: str) -> dict:
+    """Génère l'expérience au facteur `scale` et mesure ses étapes dans un processus neuf."""
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from synthetic import make_experiment
+
+    root = os.path.join(work_dir, f"scale_{scale:g}")
+    sizes = make_experiment(root, scale=scale)
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", root],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, encoding="utf-8",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Mesure au facteur {scale:g} en échec:\n{proc.stderr[-2000:]}")
+    return {"sizes": sizes, "stages": json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def compare_to_baseline(report: dict, baseline: dict, max_ratio: float) -> list[dict]:
+    """
+    Returns:
+        Étapes dont le pic dépasse max_ratio × pic de référence
+    """
+    regressions = []
+    for scale, measured in report.items():
+        reference = baseline.get(scale, {}).get("stages", {})
+        for stage, values in measured["stages"].items():
+            ref_peak = reference.get(stage, {}).get("peak_kb")
+            if not ref_peak:
+                continue
+            ratio = values["peak_kb"] / ref_peak
+            if ratio > max_ratio:
+                regressions.append({
+                    "scale": scale, "stage": stage, "peak_kb": values["peak_kb"],
+                    "baseline_peak_kb": ref_peak, "ratio": round(ratio, 2),
+                })
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pic mémoire des processeurs selon la taille des données")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="Facteurs de taille séparés par des virgules")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Fichier JSON de référence")
+    parser.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO,
+                        help="Croissance maximale tolérée du pic par rapport à la référence")
+    parser.add_argument("--write-baseline", action="store_true", help="Enregistre les mesures comme référence")
+    parser.add_argument("--work-dir", default=None, help="Répertoire des données générées (défaut: temporaire)")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_stages(args.child)))
+        return 0
+
+    scales = [float(s) for s in args.scales.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory(prefix="bobine_memory_") as tmp:
+        work_dir = args.work_dir or tmp
+        report = {}
+        for scale in scales:
+            print(f"[MEMORY] facteur {scale:g}...", file=sys.stderr)
+            report[f"{scale:g}"] = measure_scale(scale, work_dir)
+
+    output = {"scales": report}
+    regressions = []
+    if args.write_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        output["baseline_written"] = args.baseline
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.max_ratio)
+        output["baseline"] = {"path": args.baseline, "max_ratio": args.max_ratio, "regressions": regressions}
+
+    print(json.dumps(output, indent=2, ensure_ascii=False))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Benchmark du transport d'un DataFrame Pignat entre processus : pickle
+(retour normal d'un ProcessPoolExecutor) contre mémoire partagée
+(shared_frames.py).
+
+Usage:
+    python benchmarks/shared_memory.py [--rows 500000] [--repeat 5] [--with-time]
+
+Le processus de travail construit une trame Pignat synthétique (toutes les
+colonnes capteurs de l'exemple, en float64) puis la renvoie, soit telle
+quelle (pickle), soit sous forme de poignée vers un segment publié. Le temps
+mesuré va de la fin de la construction dans le processus de travail jusqu'au
+DataFrame utilisable dans le coordinateur (time.perf_counter est monotone et
+commun aux processus sous Linux). Avec --with-time, la colonne Time (texte)
+est aussi transportée.
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+DEFAULT_ROWS = 500_000
+DEFAULT_REPEAT = 5
+
+
+def build_pignat_frame(n_rows: int, with_time: bool):
+    """Trame Pignat synthétique de n_rows lignes, colonnes de l'exemple."""
+    import numpy as np
+    import pandas as pd
+    from synthetic import PIGNAT_PERIOD_S, SAMPLE_PIGNAT_CSV
+
+    with open(SAMPLE_PIGNAT_CSV, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    sensors = [col for col in header if col not in ("Date", "Time", "Millisecond")]
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(100.0, 20.0, size=(n_rows, len(sensors))), columns=sensors)
+    if with_time:
+        seconds = np.arange(n_rows) * PIGNAT_PERIOD_S
+        df.insert(0, "Time", pd.to_datetime(seconds, unit="s").strftime("%H:%M:%S"))
+    return df
+
+
+def _send_pickle(n_rows: int, with_time: bool):
+    df = build_pignat_frame(n_rows, with_time)
+    return time.perf_counter(), df
+
+
+def _send_shared(n_rows: int, with_time: bool):
+    from shared_frames import publish_frame
+
+    df = build_pignat_frame(n_rows, with_time)
+    ready = time.perf_counter()
+    return ready, publish_frame(df)
+
+
+def measure(pool: ProcessPoolExecutor, n_rows: int, with_time: bool, repeat: int) -> dict:
+    from shared_frames import attach_frame
+
+    pickle_ms, shared_ms = [], []
+    for _ in range(repeat):
+        ready, df = pool.submit(_send_pickle, n_rows, with_time).result()
+        float(df.iloc[:, -1].sum())
+        pickle_ms.append((time.perf_counter() - ready) * 1000)
+        del df
+
+        ready, handle = pool.submit(_send_shared, n_rows, with_time).result()
+        with attach_frame(handle) as frame:
+            float(frame.df.iloc[:, -1].sum())
+            shared_ms.append((time.perf_counter() - ready) * 1000)
+
+    pickle_median = statistics.median(pickle_ms)
+    shared_median = statistics.median(shared_ms)
+    return {
+        "rows": n_rows,
+        "with_time": with_time,
+        "pickle_ms": round(pickle_median, 1),
+        "shared_memory_ms": round(shared_median, 1),
+        "speedup": round(pickle_median / shared_median, 2) if shared_median > 0 else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pickle contre mémoire partagée pour une trame Pignat")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--with-time", action="store_true", help="Transporte aussi la colonne Time (texte)")
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        # Démarrage du processus et imports hors mesure
+        pool.submit(build_pignat_frame, 1, args.with_time).result()
+        result = measure(pool, args.rows, args.with_time, args.repeat)
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark du temps de démarrage à froid de main.py.
+
+Usage:
+    python benchmarks/startup.py [--dir RACINE_EXPERIENCE] [--runs 5] [--budget-ms 150]
+
+Chaque scénario lance `python -X importtime main.py <commande>` dans un
+processus neuf. Le script affiche le temps médian, le temps d'import et les
+modules les plus coûteux, puis échoue (code 1) si le démarrage sans commande
+dépasse le budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(SCRIPTS_DIR, "main.py")
+
+# Budget du démarrage à froid (import de main.py + commande vide), en ms
+DEFAULT_BUDGET_MS = 150
+
+# Modules qui ne doivent pas être importés par un démarrage sans commande
+FORBIDDEN_AT_STARTUP = ["pandas", "numpy", "openpyxl", "pignat", "chromeleon_online", "resume"]
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """
+    Extrait les temps cumulés (µs) des imports de premier niveau de `-X importtime`.
+
+    Returns:
+        Dictionnaire {module: temps cumulé en µs}
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+        except ValueError:
+            continue
+        if name.startswith("  "):  # import imbriqué, déjà compté dans son parent
+            continue
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def run_scenario(args: list[str], runs: int) -> dict:
+    """Lance `runs` fois main.py avec `args` et agrège les mesures."""
+    walls, imports = [], []
+    modules = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", MAIN, *args],
+            cwd=SCRIPTS_DIR, capture_output=True, text=True, encoding="utf-8",
+        )
+        walls.append((time.perf_counter() - start) * 1000)
+        modules = parse_importtime(proc.stderr)
+        imports.append(sum(modules.values()) / 1000)
+
+    slowest = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:8]
+    return {
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(imports), 1),
+        "slowest_imports_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        "modules": sorted(modules),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Temps de démarrage de main.py")
+    parser.add_argument("--dir", default=None, help="Racine d'expérience pour les scénarios avec commande")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Budget du démarrage sans commande (temps d'import, ms)")
+    args = parser.parse_args()
+
+    scenarios = {"cold_start": []}
+    if args.dir:
+        scenarios["GET_CONTEXT_EXPERIENCE_NAME"] = ["GET_CONTEXT_EXPERIENCE_NAME", args.dir]
+        scenarios["GET_CONTEXT_MASSES"] = ["GET_CONTEXT_MASSES", args.dir]
+        scenarios["GET_GRAPHS_AVAILABLE"] = ["GET_GRAPHS_AVAILABLE", args.dir]
+
+    report = {}
+    for name, scenario_args in scenarios.items():
+        report[name] = run_scenario(scenario_args, args.runs)
+
+    cold = report["cold_start"]
+    leaked = [m for m in FORBIDDEN_AT_STARTUP if m in cold["modules"]]
+    for result in report.values():
+        del result["modules"]
+
+    over_budget = cold["import_ms"] > args.budget_ms
+    report["budget"] = {
+        "budget_ms": args.budget_ms,
+        "cold_start_import_ms": cold["import_ms"],
+        "over_budget": over_budget,
+        "heavy_modules_at_startup": leaked,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    return 1 if over_budget or leaked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Générateurs de dossiers d'expérience synthétiques pour les benchmarks.
+
+Les tailles de référence (facteur 1) sont celles des données d'exemple de
+`python-scripts/data` : le CSV Pignat et la feuille "Summary" de l'export
+Chromeleon (composants et nombre d'injections). Un facteur N multiplie le
+nombre de lignes Pignat, d'injections online et de pics offline.
+
+Usage:
+    python benchmarks/synthetic.py RACINE [--scale 10] [--injections N] [--components M]
+                                   [--pignat-rows R] [--offline-peaks P]
+"""
+import argparse
+import csv
+import glob
+import os
+import random
+import shutil
+import sys
+from datetime import datetime, timedelta
+from typing import Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DATA_DIR = os.path.join(SCRIPTS_DIR, "data")
+SAMPLE_PIGNAT_CSV = os.path.join(SAMPLE_DATA_DIR, "pignat", "pigna_raw.csv")
+SAMPLE_CHROMELEON_GLOB = os.path.join(SAMPLE_DATA_DIR, "chromeleon *", "*.xlsx")
+# Le contexte ne grossit pas avec la taille de l'essai: on réutilise la feuille du rapport d'exemple
+SAMPLE_REPORT = os.path.join(os.path.dirname(SCRIPTS_DIR), "rapport.xlsx")
+CONTEXT_SHEET = "Context"
+
+PIGNAT_PERIOD_S = 5
+INJECTION_PERIOD_MIN = 20
+PERMANENT_GAS_COMPONENTS = ["Hydrogen", "Methane", "CO", "Carbon dioxide", "Nitrogen", "Oxygen"]
+
+# Colonnes d'un bloc "By Component" (l'export réel + "Inject Time", requis par ChromeleonOnline)
+SUMMARY_HEADERS = ["No", "Injection Name", "Ret.Time", "Area ", "Height ", "Amount ", "Rel.Area ", "Peak Type ", "Inject Time"]
+SUMMARY_UNITS = ["", "", "min", "pA*min", "pA", "%", "%", "", ""]
+INTEGRATION_HEADERS = ["No.", "Peakname", "RetentionTime", "Area", "Height", "Relative Area", "Rel.Height", "Amount"]
+INTEGRATION_UNITS = ["", "", "min", "pA*min", "pA", "%", "%", "%"]
+
+# Pics offline reconnus par ChromeleonOffline (paraffines, isomères, BTX)
+OFFLINE_PEAKS = (
+    [f"n-C{c}" for c in range(6, 33)]
+    + [f"C{c} isomers" for c in range(6, 33)]
+    + ["Benzene", "Toluene", "Xylenes"]
+)
+
+# metrics_wanted d'un rapport complet (tous les graphiques, sans fenêtre de temps)
+FULL_REPORT_METRICS = {
+    "pignat": [
+        {"name": name, "timeRange": {"startTime": None, "endTime": None}}
+        for name in ("temperature_time", "debimetric_time", "pressure_pyrolyseur_time",
+                     "pressure_pump_time", "delta_pressure_time")
+    ],
+    "chromeleon_online": [{"name": "Hydrocarbons mass fractions in Gas"}, {"name": "Products repartition in Gas"}],
+    "chromeleon_offline": ["Résultats d'intégration R1/R2 avec bilan matière"],
+    "chromeleon_online_permanent_gas": [{"name": "Permanent Gas mass fractions"}],
+    "resume": ["Global Repartition", "HVC Repartition", "Phase repartition",
+               "Products repartition, C1 to C23", "Products repartition, C1 to C8"],
+}
+
+DEFAULT_COMPONENTS = [
+    "Methane", "Ethane", "Ethylene", "Propane", "Propylene", "iso-Butane", "n-Butane", "1-Butene",
+    "1,3-Butadiene", "n-Pentane", "n-Hexane", "Benzene", "Toluene",
+]
+DEFAULT_INJECTIONS = 26
+
+
+def sample_chromeleon_shape() -> tuple[list[str], int]:
+    """
+    Composants et nombre d'injections de l'export Chromeleon d'exemple.
+
+    Returns:
+        (noms des composants, nombre d'injections) ; valeurs par défaut si
+        aucun export n'est présent dans data/
+    """
+    files = sorted(f for f in glob.glob(SAMPLE_CHROMELEON_GLOB) if not os.path.basename(f).startswith((".", "~")))
+    if not files:
+        return DEFAULT_COMPONENTS, DEFAULT_INJECTIONS
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(files[0], read_only=True)
+    try:
+        components, n_injections = [], DEFAULT_INJECTIONS
+        for row in wb["Summary"].iter_rows(values_only=True):
+            if not row:
+                continue
+            if row[0] == "No. of Injections:" and isinstance(row[2], int):
+                n_injections = row[2]
+            elif row[0] == "By Component" and row[2]:
+                components.append(str(row[2]))
+        return components or DEFAULT_COMPONENTS, n_injections
+    finally:
+        wb.close()
+
+
+def write_online_summary(path: str, n_injections: int, components: list[str], seed: int = 0) -> None:
+    """
+    Écrit un export Chromeleon online: feuille "Summary" avec un bloc
+    "By Component" (n_injections lignes + 1 blanc) par composant.
+    """
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    start = datetime(2025, 4, 4, 8, 0, 0)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Summary")
+    ws.append(["Summary"])
+    ws.append([])
+    ws.append(["Sequence Details"])
+    ws.append(["Name:", None, "040425_Rx1"])
+    ws.append(["No. of Injections:", None, n_injections + 1])
+    ws.append([])
+    ws.append([])
+    ws.append([])
+
+    for component in components:
+        retention = round(rng.uniform(1.5, 14.0), 3)
+        ws.append(["By Component", None, component])
+        ws.append([])
+        ws.append(SUMMARY_HEADERS)
+        ws.append(SUMMARY_UNITS)
+        ws.append(["", ""] + ["FrontC1C6"] * 7)
+        ws.append(["", ""] + [component] * 7)
+        ws.append([1, "040425 blanc 1"] + ["n.a."] * 6 + [start.strftime("%Y-%m-%d %H:%M:%S")])
+        for i in range(n_injections):
+            inject_time = start + timedelta(minutes=INJECTION_PERIOD_MIN * (i + 1))
+            area = rng.uniform(0.01, 3.0)
+            ws.append([
+                i + 2, f"040425 injection {i + 1}", retention, area, area * 50, "n.a.",
+                rng.uniform(0.1, 25.0), "BMB", inject_time.strftime("%Y-%m-%d %H:%M:%S"),
+            ])
+        ws.append([])
+
+    wb.save(path)
+
+
+def write_offline_integration(dir_path: str, n_peaks: int, seed: int = 0) -> None:
+    """
+    Écrit les exports offline R1.xlsx et R2.xlsx (feuille "Integration").
+    Au-delà des pics reconnus (OFFLINE_PEAKS), des pics inconnus sont ajoutés.
+    """
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    peaks = OFFLINE_PEAKS[:n_peaks] + [f"Unknown {i}" for i in range(1, n_peaks - len(OFFLINE_PEAKS) + 1)]
+    for tag in ("R1", "R2"):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Integration")
+        ws.append(["Chromatogram and Results"])
+        ws.append([])
+        ws.append(["Injection Details"])
+        ws.append(["Injection Name:", None, f"040425 {tag}"])
+        ws.append(["Integration Results"])
+        ws.append(INTEGRATION_HEADERS)
+        ws.append(INTEGRATION_UNITS)
+        ws.append(["FrontC6C32"] * len(INTEGRATION_HEADERS))
+        for i, peak in enumerate(peaks, start=1):
+            ws.append([
+                i, peak, f"{1.0 + i * 0.05:.3f}", f"{rng.uniform(0.1, 5):.4f}", f"{rng.uniform(1, 200):.2f}",
+                f"{rng.uniform(0.01, 6):.4f}", f"{rng.uniform(0.01, 6):.4f}", "n.a.",
+            ])
+        wb.save(os.path.join(dir_path, f"{tag}.xlsx"))
+
+
+def write_pignat_csv(path: str, n_rows: int, sample_csv: str = SAMPLE_PIGNAT_CSV) -> None:
+    """
+    Écrit un CSV Pignat de n_rows lignes en répétant les mesures de l'exemple,
+    avec un horodatage continu (une ligne toutes les PIGNAT_PERIOD_S secondes).
+    """
+    with open(sample_csv, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        sample_rows = [row for row in reader if row]
+
+    start = datetime.strptime(f"{sample_rows[0][0]} {sample_rows[0][1]}", "%Y/%m/%d %H:%M:%S")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(header)
+        for i in range(n_rows):
+            row = list(sample_rows[i % len(sample_rows)])
+            timestamp = start + timedelta(seconds=i * PIGNAT_PERIOD_S)
+            row[0] = timestamp.strftime("%Y/%m/%d")
+            row[1] = timestamp.strftime("%H:%M:%S")
+            writer.writerow(row)
+
+
+def write_context(dir_path: str, report_path: str = SAMPLE_REPORT) -> None:
+    """Écrit le fichier de contexte à partir de la feuille Context du rapport d'exemple."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(report_path)
+    for name in list(wb.sheetnames):
+        if name != CONTEXT_SHEET:
+            wb.remove(wb[name])
+    wb.save(os.path.join(dir_path, "context.xlsx"))
+
+
+def synthetic_components(n_components: int) -> list[str]:
+    """Composants de l'exemple complétés par des pics inconnus jusqu'à n_components."""
+    components, _ = sample_chromeleon_shape()
+    extra = [f"Unknown PM{i}" for i in range(100, 100 + max(0, n_components - len(components)))]
+    return (components + extra)[:n_components]
+
+
+def sample_pignat_rows(sample_csv: str = SAMPLE_PIGNAT_CSV) -> int:
+    with open(sample_csv, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip()) - 1
+
+
+def make_experiment(
+    root: str,
+    scale: float = 1,
+    n_injections: Optional[int] = None,
+    components: Optional[list[str]] = None,
+    n_components: Optional[int] = None,
+    n_pignat_rows: Optional[int] = None,
+    n_offline_peaks: Optional[int] = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Crée un dossier d'expérience complet (Bobine_data/...) sous `root`.
+
+    Args:
+        root: Racine de l'expérience (créée si besoin)
+        scale: Facteur appliqué aux tailles de l'exemple (ignoré pour les tailles explicites)
+        n_injections: Nombre d'injections online
+        components: Composants online (blocs "By Component")
+        n_components: Nombre de composants online (si `components` n'est pas donné)
+        n_pignat_rows: Nombre de lignes du CSV Pignat
+        n_offline_peaks: Nombre de pics des fichiers offline R1/R2
+        seed: Graine des valeurs aléatoires
+
+    Returns:
+        Tailles effectivement générées
+    """
+    sample_components, sample_injections = sample_chromeleon_shape()
+    if components is None:
+        components = synthetic_components(n_components) if n_components else sample_components
+    n_injections = n_injections or max(1, round(sample_injections * scale))
+    n_pignat_rows = n_pignat_rows or max(1, round(sample_pignat_rows() * scale))
+    n_offline_peaks = n_offline_peaks or max(1, round(len(OFFLINE_PEAKS) * scale))
+
+    bobine = os.path.join(root, "Bobine_data")
+    dirs = {
+        "context": os.path.join(bobine, "context", "context"),
+        "pignat": os.path.join(bobine, "pignat", "pignat"),
+        "online": os.path.join(bobine, "chromeleon", "online"),
+        "offline": os.path.join(bobine, "chromeleon", "offline"),
+        "permanent": os.path.join(bobine, "chromeleon_online_permanent_gas", "chromeleon_online_permanent_gas"),
+    }
+    if os.path.isdir(bobine):
+        shutil.rmtree(bobine)
+    for d in dirs.values():
+        os.makedirs(d)
+
+    write_context(dirs["context"])
+    write_pignat_csv(os.path.join(dirs["pignat"], "pignat.csv"), n_pignat_rows)
+    write_online_summary(os.path.join(dirs["online"], "online.xlsx"), n_injections, components, seed)
+    write_online_summary(os.path.join(dirs["permanent"], "permanent.xlsx"), n_injections, PERMANENT_GAS_COMPONENTS, seed + 1)
+    write_offline_integration(dirs["offline"], n_offline_peaks, seed + 2)
+
+    return {
+        "scale": scale,
+        "injections": n_injections,
+        "components": len(components),
+        "pignat_rows": n_pignat_rows,
+        "offline_peaks": n_offline_peaks,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Génère un dossier d'expérience synthétique")
+    parser.add_argument("root", help="Racine de l'expérience à créer")
+    parser.add_argument("--scale", type=float, default=1, help="Facteur de taille par rapport aux données d'exemple")
+    parser.add_argument("--injections", type=int, default=None, help="Nombre d'injections online")
+    parser.add_argument("--components", type=int, default=None, help="Nombre de blocs \"By Component\"")
+    parser.add_argument("--pignat-rows", type=int, default=None, help="Nombre de lignes du CSV Pignat")
+    parser.add_argument("--offline-peaks", type=int, default=None, help="Nombre de pics offline")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(make_experiment(
+        args.root,
+        scale=args.scale,
+        n_injections=args.injections,
+        n_components=args.components,
+        n_pignat_rows=args.pignat_rows,
+        n_offline_peaks=args.offline_peaks,
+        seed=args.seed,
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
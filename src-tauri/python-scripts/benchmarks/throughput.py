@@ -0,0 +1,189 @@
+"""
+Benchmark de débit des points d'entrée selon la taille des données.
+
+Usage:
+    python benchmarks/throughput.py [--scales 0.5,1,2,5,10] [--repeat 3]
+                                    [--baseline FICHIER.json] [--max-ratio 1.3] [--write-baseline]
+
+Pour chaque facteur de taille, une expérience synthétique est générée
+(benchmarks/synthetic.py) puis, dans un processus neuf, chaque point d'entrée
+est chronométré à froid (cache des processeurs vidé) et à chaud :
+GET_GRAPHS_AVAILABLE, GET_TIME_RANGE et save_to_excel_with_charts (suivi de
+wb.save). Le script affiche pour chacun la courbe temps/taille et l'exposant
+d'échelle (pente log-log : 1 = linéaire).
+
+Avec --baseline, il échoue (code 1) si un temps médian dépasse max-ratio fois
+celui de la référence.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+DEFAULT_SCALES = [0.5, 1, 2, 5, 10]
+DEFAULT_REPEAT = 3
+DEFAULT_MAX_RATIO = 1.3
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "throughput_baseline.json")
+
+ENTRY_POINTS = ["get_graphs_available", "get_time_range", "save_to_excel_with_charts", "wb_save"]
+
+
+def run_entry_points(root: str, repeat: int) -> dict:
+    """Chronomètre les points d'entrée sur `root` (exécuté dans un processus dédié)."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    sys.path.insert(0, BENCHMARKS_DIR)
+    import main
+    from synthetic import FULL_REPORT_METRICS
+
+    # Imports des processeurs hors mesure
+    for source in main.SOURCE_CLASSES:
+        main.get_source_class(source)
+
+    def timed(fn) -> float:
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000
+
+    def check(response: dict) -> None:
+        if "error" in response:
+            raise RuntimeError(response["error"])
+
+    samples = {f"{name}_{state}": [] for name in ENTRY_POINTS for state in ("cold", "warm")}
+    for _ in range(repeat):
+        for state in ("cold", "warm"):
+            if state == "cold":
+                main.clear_source_cache()
+            samples[f"get_graphs_available_{state}"].append(
+                timed(lambda: check(main.process_command(["GET_GRAPHS_AVAILABLE", root]))))
+
+            if state == "cold":
+                main.clear_source_cache()
+            samples[f"get_time_range_{state}"].append(
+                timed(lambda: check(main.process_command(["GET_TIME_RANGE", root]))))
+
+            if state == "cold":
+                main.clear_source_cache()
+            holder = {}
+            samples[f"save_to_excel_with_charts_{state}"].append(timed(lambda: holder.update(
+                wb=main.save_to_excel_with_charts(root, FULL_REPORT_METRICS, main.get_context_masses(root)))))
+            samples[f"wb_save_{state}"].append(timed(lambda: holder["wb"].save(io.BytesIO())))
+
+    return {name: round(statistics.median(values), 1) for name, values in samples.items()}
+
+
+def measure_scale(scale: float, work_dir: str, repeat: int) -> dict:
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from synthetic import make_experiment
+
+    root = os.path.join(work_dir, f"scale_{scale:g}")
+    sizes = make_experiment(root, scale=scale)
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", root, "--repeat", str(repeat)],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, encoding="utf-8",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Mesure au facteur {scale:g} en échec:\n{proc.stderr[-2000:]}")
+    return {"sizes": sizes, "median_ms": json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def scaling_curves(report: dict) -> dict:
+    """
+    Courbes temps/taille par point d'entrée et exposant d'échelle entre la plus
+    petite et la plus grande taille (t ∝ taille^exposant).
+    """
+    scales = sorted(report, key=float)
+    curves = {}
+    for name in report[scales[0]]["median_ms"]:
+        points = [(float(s), report[s]["median_ms"][name]) for s in scales]
+        (s0, t0), (s1, t1) = points[0], points[-1]
+        exponent = None
+        if s1 > s0 and t0 > 0 and t1 > 0:
+            exponent = round(math.log(t1 / t0) / math.log(s1 / s0), 2)
+        curves[name] = {"ms_by_scale": {f"{s:g}": t for s, t in points}, "scaling_exponent": exponent}
+    return curves
+
+
+def format_curves(curves: dict) -> str:
+    """Tableau texte: une ligne par point d'entrée, une colonne par facteur."""
+    scales = list(next(iter(curves.values()))["ms_by_scale"])
+    title = "point d'entrée (ms)"
+    header = f"{title:<34}" + "".join(f"{'x' + s:>10}" for s in scales) + f"{'exposant':>10}"
+    lines = [header, "-" * len(header)]
+    for name, curve in curves.items():
+        values = "".join(f"{curve['ms_by_scale'][s]:>10.1f}" for s in scales)
+        exponent = curve["scaling_exponent"]
+        lines.append(f"{name:<34}{values}{(f'{exponent:.2f}' if exponent is not None else '-'):>10}")
+    return "\n".join(lines)
+
+
+def compare_to_baseline(report: dict, baseline: dict, max_ratio: float) -> list[dict]:
+    regressions = []
+    for scale, measured in report.items():
+        reference = baseline.get(scale, {}).get("median_ms", {})
+        for name, ms in measured["median_ms"].items():
+            ref_ms = reference.get(name)
+            if not ref_ms:
+                continue
+            ratio = ms / ref_ms
+            if ratio > max_ratio:
+                regressions.append({"scale": scale, "entry_point": name, "ms": ms,
+                                    "baseline_ms": ref_ms, "ratio": round(ratio, 2)})
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Temps des points d'entrée selon la taille des données")
+    parser.add_argument("--scales", default=",".join(f"{s:g}" for s in DEFAULT_SCALES),
+                        help="Facteurs de taille séparés par des virgules")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Fichier JSON de référence")
+    parser.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO,
+                        help="Ralentissement maximal toléré par rapport à la référence")
+    parser.add_argument("--write-baseline", action="store_true", help="Enregistre les mesures comme référence")
+    parser.add_argument("--work-dir", default=None, help="Répertoire des données générées (défaut: temporaire)")
+    parser.add_argument("--json", action="store_true", help="Affiche le rapport complet en JSON")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_entry_points(args.child, args.repeat)))
+        return 0
+
+    scales = [float(s) for s in args.scales.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory(prefix="bobine_throughput_") as tmp:
+        work_dir = args.work_dir or tmp
+        report = {}
+        for scale in scales:
+            print(f"[THROUGHPUT] facteur {scale:g}...", file=sys.stderr)
+            report[f"{scale:g}"] = measure_scale(scale, work_dir, args.repeat)
+
+    curves = scaling_curves(report)
+    regressions = []
+    if args.write_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(report, json.load(f), args.max_ratio)
+
+    if args.json:
+        print(json.dumps({"scales": report, "curves": curves, "regressions": regressions}, indent=2))
+    else:
+        print(format_curves(curves))
+        for r in regressions:
+            print(f"RÉGRESSION x{r['scale']} {r['entry_point']}: {r['ms']} ms "
+                  f"(référence {r['baseline_ms']} ms, x{r['ratio']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Catalogue SQLite des expériences d'une archive.
+
+Usage:
+    python main.py --catalog index <racines ou globs...> [--db FICHIER] [--workers N]
+    python main.py --catalog query [--feedstock LDPE] [--temperature 450]
+                   [--debit-min X] [--debit-max Y] [--date-from AAAA-MM-JJ] [--date-to ...] [--db FICHIER]
+
+L'indexation enregistre, pour chaque dossier d'expérience, l'empreinte de
+Bobine_data, les conditions opératoires et masses du contexte ainsi que les
+KPI du Résumé. Un dossier dont l'empreinte n'a pas changé n'est pas relu,
+sauf si la version du calcul des KPI (comparison.CACHE_VERSION) a changé
+depuis son indexation.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from batch import expand_experiment_roots
+from comparison import CACHE_VERSION, compute_experiment_kpis
+from utils.fingerprint import directory_fingerprint
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".bobine", "catalog.sqlite")
+
+# Empreinte enregistrée pour un dossier en erreur : jamais égale à une vraie
+# empreinte, le dossier est relu à la prochaine indexation
+FAILED_FINGERPRINT = ""
+
+# Clé de compute_experiment_kpis -> (colonne SQL, type SQL)
+CATALOG_COLUMNS = {
+    "experience": ("experience", "TEXT"),
+    "date": ("date", "TEXT"),
+    "feedstock": ("feedstock", "TEXT"),
+    "debit_kgh": ("debit_kgh", "REAL"),
+    "nb_inducteurs": ("nb_inducteurs", "INTEGER"),
+    "temperature_max": ("temperature_max", "REAL"),
+    "temperature_mean": ("temperature_mean", "REAL"),
+    "masse recette 1 (kg)": ("mass_flask1_kg", "REAL"),
+    "masse recette 2 (kg)": ("mass_flask2_kg", "REAL"),
+    "masse cendrier (kg)": ("mass_ash_kg", "REAL"),
+    "masse injectée (kg)": ("mass_injected_kg", "REAL"),
+    "Light olefin": ("light_olefin", "REAL"),
+    "Aromatics": ("aromatics", "REAL"),
+    "Other Hydrocarbons gas": ("other_hc_gas", "REAL"),
+    "Other Hydrocarbons liquid": ("other_hc_liquid", "REAL"),
+    "Residue": ("residue", "REAL"),
+    "HVC": ("hvc", "REAL"),
+    "Ethylene": ("ethylene", "REAL"),
+    "Propylene": ("propylene", "REAL"),
+    "C4=": ("c4_olefin", "REAL"),
+    "Benzene": ("benzene", "REAL"),
+    "Toluene": ("toluene", "REAL"),
+    "Xylene": ("xylene", "REAL"),
+    "Liquide (%)": ("liquid_pct", "REAL"),
+    "Gas (%)": ("gas_pct", "REAL"),
+    "Residue (%)": ("residue_pct", "REAL"),
+    "error": ("error", "TEXT"),
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS experiments (
+    root TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    kpi_version INTEGER,
+    indexed_at REAL NOT NULL,
+    date_iso TEXT,
+    {", ".join(f"{col} {sql_type}" for col, sql_type in CATALOG_COLUMNS.values())}
+);
+CREATE TABLE IF NOT EXISTS inductor_temperatures (
+    root TEXT NOT NULL REFERENCES experiments(root) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    temperature INTEGER NOT NULL,
+    PRIMARY KEY (root, position)
+);
+CREATE INDEX IF NOT EXISTS idx_experiments_feedstock ON experiments(feedstock);
+CREATE INDEX IF NOT EXISTS idx_experiments_date ON experiments(date_iso);
+CREATE INDEX IF NOT EXISTS idx_experiments_debit ON experiments(debit_kgh);
+CREATE INDEX IF NOT EXISTS idx_inductor_temperature ON inductor_temperatures(temperature, root);
+"""
+
+
+def _date_to_iso(date: Optional[str]) -> Optional[str]:
+    """Convertit "DDMMYYYY" en "YYYY-MM-DD" (None si le format est inattendu)."""
+    if not date or len(date) != 8 or not date.isdigit():
+        return None
+    return f"{date[4:]}-{date[2:4]}-{date[:2]}"
+
+
+class ExperimentCatalog:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        Ouvre (ou crée) le catalogue.
+
+        Args:
+            db_path: Chemin du fichier SQLite
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        # Catalogues créés avant la colonne kpi_version : leurs lignes seront relues
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(experiments)")}
+        if "kpi_version" not in columns:
+            self.conn.execute("ALTER TABLE experiments ADD COLUMN kpi_version INTEGER")
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def index(self, roots: list[str], workers: Optional[int] = None, prune: bool = True) -> dict:
+        """
+        Met à jour le catalogue pour les racines données.
+
+        Args:
+            roots: Racines d'expérience (chemins absolus)
+            workers: Nombre de processus pour les dossiers à (re)lire
+            prune: Supprime les entrées dont le dossier n'existe plus
+
+        Returns:
+            {"indexed", "unchanged", "errors", "removed", "seconds"}
+        """
+        start = time.perf_counter()
+        known = {
+            root: (fingerprint, kpi_version)
+            for root, fingerprint, kpi_version in self.conn.execute(
+                "SELECT root, fingerprint, kpi_version FROM experiments")
+        }
+
+        fingerprints = {}
+        for root in roots:
+            try:
+                fingerprints[root] = directory_fingerprint(os.path.join(root, "Bobine_data"))
+            except FileNotFoundError:
+                continue
+        todo = [root for root, fp in fingerprints.items() if known.get(root) != (fp, CACHE_VERSION)]
+
+        if len(todo) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                records = list(pool.map(compute_experiment_kpis, todo))
+        else:
+            records = [compute_experiment_kpis(root) for root in todo]
+
+        with self.conn:
+            for record in records:
+                self._upsert(record, fingerprints[record["root"]])
+
+            removed = 0
+            if prune:
+                stale = [(root,) for root in known if not os.path.isdir(root)]
+                self.conn.executemany("DELETE FROM experiments WHERE root = ?", stale)
+                removed = len(stale)
+
+        return {
+            "indexed": len(records),
+            "unchanged": len(fingerprints) - len(todo),
+            "errors": {r["root"]: r["error"] for r in records if r["error"]},
+            "removed": removed,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def _upsert(self, record: dict, fingerprint: str) -> None:
+        if record.get("error"):
+            # Une erreur peut être passagère (fichier verrouillé...) : pas de mise en cache
+            fingerprint = FAILED_FINGERPRINT
+        columns = ["root", "fingerprint", "kpi_version", "indexed_at", "date_iso"] + [col for col, _ in CATALOG_COLUMNS.values()]
+        values = [record["root"], fingerprint, CACHE_VERSION, time.time(), _date_to_iso(record.get("date"))]
+        values += [record.get(key) for key in CATALOG_COLUMNS]
+        # Même casse que le filtre de query()
+        feedstock = columns.index("feedstock")
+        if isinstance(values[feedstock], str):
+            values[feedstock] = values[feedstock].upper()
+
+        self.conn.execute("DELETE FROM experiments WHERE root = ?", (record["root"],))
+        self.conn.execute(
+            f"INSERT INTO experiments ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            values,
+        )
+        self.conn.executemany(
+            "INSERT INTO inductor_temperatures (root, position, temperature) VALUES (?, ?, ?)",
+            [(record["root"], i, int(t)) for i, t in enumerate(record.get("temperatures") or [], start=1) if t],
+        )
+
+    def query(
+        self,
+        feedstock: Optional[str] = None,
+        temperature: Optional[int] = None,
+        debit_min: Optional[float] = None,
+        debit_max: Optional[float] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        Recherche des expériences par conditions opératoires.
+
+        Args:
+            feedstock: Matière (insensible à la casse, ex: "LDPE")
+            temperature: Température d'au moins un inducteur (°C)
+            debit_min, debit_max: Bornes du débit plastique (kg/h)
+            date_from, date_to: Bornes de date "YYYY-MM-DD" (incluses)
+
+        Returns:
+            Liste d'enregistrements (toutes les colonnes du catalogue), triés par date
+        """
+        clauses, params = [], []
+        if feedstock is not None:
+            clauses.append("e.feedstock = ?")
+            params.append(feedstock.upper())
+        if temperature is not None:
+            clauses.append("e.root IN (SELECT root FROM inductor_temperatures WHERE temperature = ?)")
+            params.append(int(temperature))
+        if debit_min is not None:
+            clauses.append("e.debit_kgh >= ?")
+            params.append(debit_min)
+        if debit_max is not None:
+            clauses.append("e.debit_kgh <= ?")
+            params.append(debit_max)
+        if date_from is not None:
+            clauses.append("e.date_iso >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            clauses.append("e.date_iso <= ?")
+            params.append(date_to)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT e.* FROM experiments e {where} ORDER BY e.date_iso, e.root", params
+        ).fetchall()
+
+        # Températures de toutes les lignes retenues en une requête
+        temperatures: dict[str, list[int]] = {}
+        if rows:
+            for root, temperature in self.conn.execute(
+                f"SELECT t.root, t.temperature FROM inductor_temperatures t "
+                f"WHERE t.root IN (SELECT e.root FROM experiments e {where}) ORDER BY t.root, t.position",
+                params,
+            ):
+                temperatures.setdefault(root, []).append(temperature)
+
+        results = []
+        for row in rows:
+            record = dict(row)
+            record["temperatures"] = temperatures.get(row["root"], [])
+            results.append(record)
+        return results
+
+
+def main(argv: list[str]) -> object:
+    parser = argparse.ArgumentParser(prog="main.py --catalog", description="Catalogue des expériences")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Fichier SQLite du catalogue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_index = sub.add_parser("index", help="Indexe ou met à jour des dossiers d'expérience")
+    p_index.add_argument("roots", nargs="+", help="Racines d'expérience ou motifs glob")
+    p_index.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+
+    p_query = sub.add_parser("query", help="Recherche dans le catalogue")
+    p_query.add_argument("--feedstock", default=None)
+    p_query.add_argument("--temperature", type=int, default=None)
+    p_query.add_argument("--debit-min", type=float, default=None)
+    p_query.add_argument("--debit-max", type=float, default=None)
+    p_query.add_argument("--date-from", default=None)
+    p_query.add_argument("--date-to", default=None)
+
+    args = parser.parse_args(argv)
+    catalog = ExperimentCatalog(args.db)
+    try:
+        if args.command == "index":
+            return catalog.index(expand_experiment_roots(args.roots), workers=args.workers)
+        return catalog.query(
+            feedstock=args.feedstock,
+            temperature=args.temperature,
+            debit_min=args.debit_min,
+            debit_max=args.debit_max,
+            date_from=args.date_from,
+            date_to=args.date_to,
+        )
+    finally:
+        catalog.close()
+
+
+def handle_command(action: str, arg: Optional[str], db_path: str = DEFAULT_DB_PATH) -> object:
+    """
+    Commandes interactives :
+      - CATALOG_INDEX <json: liste de racines/globs>
+      - CATALOG_QUERY <json: filtres de ExperimentCatalog.query>
+    """
+    catalog = ExperimentCatalog(db_path)
+    try:
+        if action == "CATALOG_INDEX":
+            return catalog.index(expand_experiment_roots(json.loads(arg) if arg else []))
+        return catalog.query(**(json.loads(arg) if arg else {}))
+    finally:
+        catalog.close()
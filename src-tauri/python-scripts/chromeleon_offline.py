@@ -9,6 +9,8 @@ from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 from typing import Optional, Dict, Any, Tuple
 from utils.chart_styles import get_table_title_font, get_table_header_font, get_table_data_font
+from profiling import span
+from protocol import report_progress
 
 MASSE_INJECTEE="masse injectée (kg)"
 MASSE_RECETTE="masse recette 1 (kg)"
@@ -39,12 +41,13 @@ class ChromeleonOffline:
         for fname in files:
             path = os.path.join(dir_root, fname)
             try:
-                df = pd.read_excel(
-                    path,
-                    sheet_name="Integration",
-                    header=None,
-                    dtype=str
-                )
+                with span("file_read"):
+                    df = pd.read_excel(
+                        path,
+                        sheet_name="Integration",
+                        header=None,
+                        dtype=str
+                    )
             except Exception as e:
                 errors.append(f"{fname}: feuille 'Integration' illisible ({e})")
                 continue
@@ -241,15 +244,17 @@ class ChromeleonOffline:
 
         return df1_final, df2_final
 
+    @span("summary_tables")
     def get_relative_area_by_carbon_tables(self) -> dict:
         R1_data, R2_data = self.get_R1_R2_data()
 
         R1_data = R1_data.copy()
         R2_data = R2_data.copy()
-        R1_data['Relative Area'] = pd.to_numeric(
-            R1_data['Relative Area'], errors='coerce')
-        R2_data['Relative Area'] = pd.to_numeric(
-            R2_data['Relative Area'], errors='coerce')
+        with span("numeric_conversion"):
+            R1_data['Relative Area'] = pd.to_numeric(
+                R1_data['Relative Area'], errors='coerce')
+            R2_data['Relative Area'] = pd.to_numeric(
+                R2_data['Relative Area'], errors='coerce')
 
         def process_data(data):
             import re
@@ -765,6 +770,7 @@ class ChromeleonOffline:
             _ = write_summary(tables["Moyenne"], anchor_col=18, title="Moyenne")
 
             ws.freeze_panes = "A4"
+            report_progress("sheet", ws.title, rows=ws.max_row)
             return wb
 
 
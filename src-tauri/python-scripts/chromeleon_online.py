@@ -3,6 +3,7 @@ ChromeleonOnline - Processeur de données avec graphiques Excel
 """
 import os
 import re
+import threading
 import pandas as pd
 import numpy as np
 
@@ -10,20 +11,33 @@ from openpyxl import Workbook
 from openpyxl.chart import LineChart, BarChart, Reference
 
 from utils.gc_online.GC_Online_constants import COMPOUND_MAPPING, CARBON_ROWS, FAMILIES, HVC_CATEGORIES
-from utils.time_utils import standardize_injection_time, create_time_sort_key, calculate_total_time_duration
+from utils.time_utils import standardize_injection_time, create_time_sort_key, calculate_total_time_duration, injection_time_index, select_injection_window
 from utils.excel_parsing import find_data_end_row, count_actual_columns, extract_component_blocks, filter_blanc_injections
 from utils.excel_formatting import get_standard_styles, get_border, format_table_headers, format_data_table, apply_standard_column_widths, create_title_cell, freeze_panes_standard
 from utils.column_mapping import standardize_column_name, get_rel_area_columns, extract_element_names, validate_required_columns
-from utils.data_processing import create_summary_table1, process_table1_with_grouping, create_summary_table2, sort_data_by_time, create_relative_area_summary, process_injection_times, validate_data_availability
-from utils.chart_creation import create_chart_configuration, calculate_chart_positions
+from utils.data_processing import create_summary_table1, process_table1_with_grouping, create_summary_table2, sort_data_by_time, create_relative_area_summary, process_injection_times, validate_data_availability, build_injection_rows, filter_data_by_injections
+from utils.chart_creation import create_chart_configuration, calculate_chart_positions, format_window_suffix
 from utils.file_operations import get_first_excel_file, read_excel_summary, extract_experience_number_simple
 from utils.chart_styles import apply_line_chart_styles, apply_bar_chart_styles
+from utils.downsampling import min_max_indices
+from profiling import span
+from protocol import report_progress
+
+# Limites de taille de la réponse GET_GC_SERIES
+DEFAULT_MAX_POINTS = 2000
+DEFAULT_MAX_ELEMENTS = 60
 
 class ChromeleonOnline:
     def __init__(self, dir_root: str):
         self.first_file = get_first_excel_file(dir_root)
         self.df = read_excel_summary(self.first_file)
         self.experience_number = extract_experience_number_simple(self.df)
+        # Sous-tableaux et injections triées, extraits une seule fois par fichier ;
+        # l'instance est partagée entre threads (cache de main.get_source)
+        self._lock = threading.RLock()
+        self._data_by_elements = None
+        self._injection_rows = None
+        self._injection_index = None
 
     def get_graphs_available(self) -> list[dict]:
         graphs = []
@@ -63,6 +77,14 @@ class ChromeleonOnline:
         return graphs
 
     def _get_data_by_elements(self):
+        if self._data_by_elements is None:
+            with self._lock:
+                if self._data_by_elements is None:
+                    self._data_by_elements = self._parse_data_by_elements()
+        return self._data_by_elements
+
+    @span("block_extraction")
+    def _parse_data_by_elements(self):
         data_by_injection = {}
         
         component_blocks = extract_component_blocks(self.df)
@@ -108,30 +130,40 @@ class ChromeleonOnline:
 
         return data_by_injection
 
-    def get_relative_area_by_injection(self) -> pd.DataFrame:
-        data_by_elements = self._get_data_by_elements()
-        
-        if not data_by_elements:
-            raise ValueError("Aucun élément chimique trouvé dans les sous-tableaux")
-
-        first_element_df = list(data_by_elements.values())[0]
-
-        required_cols = ['Injection Name', 'Injection Time']
-        is_valid, missing = validate_required_columns(first_element_df, required_cols)
-        if not is_valid:
-            raise ValueError(f"Colonnes manquantes: {missing}. "
-                           "Vérifiez que les colonnes 'Inject Time' sont présentes dans les données.")
-        
-        result = first_element_df[required_cols].copy()
-        
-        result = process_injection_times(result)
+    def _get_injection_rows(self) -> pd.DataFrame:
+        """Injections triées par temps avec horodatage complet, sans "Moyennes" (en cache)."""
+        if self._injection_rows is None:
+            with self._lock:
+                if self._injection_rows is None:
+                    with span("numeric_conversion"):
+                        rows = build_injection_rows(self._get_data_by_elements())
+                    # Index publié avant les lignes : un lecteur sans verrou qui
+                    # voit les lignes trouve aussi l'index
+                    self._injection_index = injection_time_index(rows['Timestamp'])
+                    self._injection_rows = rows
+        return self._injection_rows
+
+    def _select_injections(self, start_time=None, end_time=None) -> pd.DataFrame:
+        """Injections comprises dans la fenêtre [start_time, end_time] (toutes sans borne)."""
+        rows = self._get_injection_rows()
+        positions = select_injection_window(self._injection_index, start_time, end_time)
+        if positions is None:
+            return rows
+        return rows.iloc[positions].reset_index(drop=True)
+
+    def get_relative_area_by_injection(self, start_time=None, end_time=None) -> pd.DataFrame:
+        """
+        Aires relatives par injection suivies de la ligne "Moyennes".
 
-        for element, df in data_by_elements.items():
-            col = f'Rel. Area (%) : {element}'
-            if col in df.columns:
-                result[col] = pd.to_numeric(df[col], errors='coerce').values
+        Args:
+            start_time, end_time: Fenêtre de temps optionnelle ("HH:MM[:SS]" ou
+                                  date et heure) ; les moyennes ne portent que
+                                  sur les injections de la fenêtre
 
-        result = sort_data_by_time(result)
+        Raises:
+            ValueError: Si aucun élément n'est trouvé ou si une borne est illisible
+        """
+        result = self._select_injections(start_time, end_time).drop(columns='Timestamp')
 
         first_time = str(result['Injection Time'].iloc[0]) if len(result) > 0 else None
         last_time = str(result['Injection Time'].iloc[-1]) if len(result) > 0 else None
@@ -140,9 +172,89 @@ class ChromeleonOnline:
         result = pd.concat([result, pd.DataFrame([summary])], ignore_index=True)
         return result
 
-    def make_summary_tables(self):
+    def get_injection_timestamps(self, start_time=None, end_time=None) -> pd.DataFrame:
+        """
+        Horodatages complets (date et secondes comprises) des injections, dans
+        l'ordre des lignes de get_relative_area_by_injection, sans "Moyennes".
+
+        Returns:
+            DataFrame ['Injection Name', 'Injection Time' (HH:MM), 'Timestamp'
+            (NaT si illisible ; heure seule placée au 1970-01-01)]
+        """
+        return self._select_injections(start_time, end_time)[['Injection Name', 'Injection Time', 'Timestamp']]
+
+    def get_relative_area_series(
+        self,
+        elements: list[str] | None = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+        max_elements: int = DEFAULT_MAX_ELEMENTS,
+    ) -> dict:
+        """
+        Aires relatives par injection des composés choisis, en colonnes, pour
+        l'aperçu du graphique "Hydrocarbons mass fractions in Gas" (commande
+        GET_GC_SERIES).
+
+        Args:
+            elements: Composés voulus (chimicalElements) ; défaut: tous, comme le graphique
+            max_points: Nombre maximal d'injections retournées (réduction min/max au-delà)
+            max_elements: Nombre maximal de composés retournés
+
+        Returns:
+            {"name", "x_axis", "total_points", "injection_names": [...], "time": [...],
+            "series": {composé: [valeurs ou None]}, "missing": composés demandés absents,
+            "truncated": composés non retournés à cause de max_elements}
+
+        Raises:
+            ValueError: Si max_points < 2 ou max_elements < 1
+        """
+        if max_points < 2:
+            raise ValueError(f"max_points doit être au moins 2 (reçu: {max_points})")
+        if max_elements < 1:
+            raise ValueError(f"max_elements doit être au moins 1 (reçu: {max_elements})")
+
         rel_df = self.get_relative_area_by_injection()
+        data_rows = rel_df[rel_df['Injection Name'] != 'Moyennes']
+        available = [col.replace('Rel. Area (%) : ', '') for col in get_rel_area_columns(rel_df)]
+
+        if elements:
+            missing = [e for e in elements if e not in available]
+            wanted = [e for e in elements if e in available]
+        else:
+            missing = []
+            wanted = available
+        wanted, truncated = wanted[:max_elements], wanted[max_elements:]
+
+        values = np.column_stack([
+            pd.to_numeric(data_rows[f'Rel. Area (%) : {e}'], errors='coerce').to_numpy(dtype="float64")
+            for e in wanted
+        ]) if wanted else np.empty((len(data_rows), 0))
+        keep = min_max_indices(values, max_points) if wanted else np.arange(min(len(data_rows), max_points))
+        if len(keep) > max_points:
+            # Garde-fou : la taille de la réponse ne dépasse jamais max_points
+            keep = keep[np.unique(np.linspace(0, len(keep) - 1, max_points).round().astype(np.int64))]
+        kept = values[keep]
+
+        return {
+            "name": "Hydrocarbons mass fractions in Gas",
+            "x_axis": "Injection Time",
+            "total_points": len(data_rows),
+            "injection_names": data_rows['Injection Name'].astype(str).to_numpy()[keep].tolist(),
+            "time": data_rows['Injection Time'].astype(str).to_numpy()[keep].tolist(),
+            "series": {
+                e: [None if v != v else v for v in kept[:, i].tolist()]
+                for i, e in enumerate(wanted)
+            },
+            "missing": missing,
+            "truncated": truncated,
+        }
+
+    @span("summary_tables")
+    def make_summary_tables(self, start_time=None, end_time=None):
+        rel_df = self.get_relative_area_by_injection(start_time, end_time)
         data_by_elements = self._get_data_by_elements()
+        if start_time is not None or end_time is not None:
+            data_by_elements = filter_data_by_injections(
+                data_by_elements, rel_df['Injection Name'].iloc[:-1])
 
         table1 = create_summary_table1(rel_df, data_by_elements)
         table1 = process_table1_with_grouping(table1)
@@ -422,15 +534,16 @@ class ChromeleonOnline:
     ) -> Workbook:
         chart_config = create_chart_configuration(metrics_wanted)
         
-        rel_df = self.get_relative_area_by_injection()
-        table1, table2 = self.make_summary_tables()
+        start_time, end_time = chart_config['start_time'], chart_config['end_time']
+        rel_df = self.get_relative_area_by_injection(start_time, end_time)
+        table1, table2 = self.make_summary_tables(start_time, end_time)
         
         ws = wb.create_sheet(title=sheet_name[:31])
         
         styles = get_standard_styles()
         styles['border'] = get_border(styles['black_thin'])
         
-        create_title_cell(ws, 1, 1, "%Rel Area par injection (Online)", styles)
+        create_title_cell(ws, 1, 1, "%Rel Area par injection (Online)" + format_window_suffix(start_time, end_time), styles)
         
         headers = list(rel_df.columns)
         start_row = 2
@@ -495,7 +608,8 @@ class ChromeleonOnline:
         hvc_df = pd.DataFrame(hvc_data)
         format_data_table(ws, hvc_df, table1_row + 2, hvc_col, styles=styles)
         apply_standard_column_widths(ws, "hvc")
-        
+        report_progress("sheet", ws.title, rows=ws.max_row)
+
         chart_col = "P"
         first_chart_row = table1_row
 
@@ -616,6 +730,7 @@ class ChromeleonOnline:
                 apply_line_chart_styles(line_chart, "Hydrocarbons mass fractions in Gas", legend_position='b', preserve_legend_layout=True)
 
                 ws.add_chart(line_chart, line_position)
+                report_progress("chart", "Hydrocarbons mass fractions in Gas")
 
         if chart_config['want_bar']:
             # Placer le bar chart à DROITE du line chart si les deux existent, sinon à la position initiale
@@ -712,6 +827,7 @@ class ChromeleonOnline:
             apply_bar_chart_styles(bar_chart, "Products repartition in Gas", legend_position='t')
 
             ws.add_chart(bar_chart, bar_position)
+            report_progress("chart", "Products repartition in Gas")
         
         
         return wb
@@ -1,5 +1,6 @@
 import os
 import re
+import threading
 import pandas as pd
 import numpy as np
 from openpyxl import Workbook
@@ -9,14 +10,16 @@ from openpyxl.chart.legend import Legend
 from openpyxl.chart.series import SeriesLabel
 
 from utils.gc_online.GC_Online_permanent_gas_constants import COMPOUND_MAPPING, CARBON_ROWS, FAMILIES
-from utils.time_utils import standardize_injection_time, create_time_sort_key, calculate_total_time_duration
+from utils.time_utils import standardize_injection_time, create_time_sort_key, calculate_total_time_duration, injection_time_index, select_injection_window
 from utils.excel_parsing import find_data_end_row, count_actual_columns, extract_component_blocks, filter_blanc_injections, extract_element_name_adaptive
 from utils.excel_formatting import get_standard_styles, get_border, format_table_headers, format_data_table, apply_standard_column_widths, create_title_cell, freeze_panes_standard
 from utils.column_mapping import standardize_column_name, get_rel_area_columns, extract_element_names, validate_required_columns
-from utils.data_processing import create_summary_table1, create_summary_table2, sort_data_by_time, create_relative_area_summary, process_injection_times, validate_data_availability, calculate_mean_retention_time
-from utils.chart_creation import create_chart_configuration, calculate_chart_positions
+from utils.data_processing import create_summary_table1, create_summary_table2, sort_data_by_time, create_relative_area_summary, process_injection_times, validate_data_availability, calculate_mean_retention_time, build_injection_rows, filter_data_by_injections
+from utils.chart_creation import create_chart_configuration, calculate_chart_positions, format_window_suffix
 from utils.file_operations import get_first_excel_file, read_excel_summary, extract_experience_number_adaptive
 from utils.chart_styles import apply_line_chart_styles
+from profiling import span
+from protocol import report_progress
 
 
 class ChromeleonOnlinePermanent:
@@ -33,6 +36,12 @@ class ChromeleonOnlinePermanent:
             self.detected_structure = "Unknown"
         
         self.compounds = self._detect_compounds()
+        # Sous-tableaux et injections triées, extraits une seule fois par fichier ;
+        # l'instance est partagée entre threads (cache de main.get_source)
+        self._lock = threading.RLock()
+        self._compound_data = None
+        self._injection_rows = None
+        self._injection_index = None
     
     
     def _detect_compounds(self):
@@ -49,29 +58,35 @@ class ChromeleonOnlinePermanent:
         
         return compounds
     
-    def get_relative_area_by_injection(self) -> pd.DataFrame:
-        data_by_elements = self._extract_compound_data()
-        
-        if not data_by_elements:
-            raise ValueError("Aucun élément chimique trouvé dans les sous-tableaux")
-
-        first_element_df = list(data_by_elements.values())[0]
-
-        required_cols = ['Injection Name', 'Injection Time']
-        is_valid, missing = validate_required_columns(first_element_df, required_cols)
-        if not is_valid:
-            raise ValueError(f"Colonnes manquantes: {missing}. "
-                             "Vérifiez que les colonnes 'Inject Time' sont présentes dans les données.")
-        
-        result = first_element_df[required_cols].copy()
-        result = process_injection_times(result)
+    def _get_injection_rows(self) -> pd.DataFrame:
+        """Injections triées par temps avec horodatage complet, sans "Moyennes" (en cache)."""
+        if self._injection_rows is None:
+            with self._lock:
+                if self._injection_rows is None:
+                    with span("numeric_conversion"):
+                        rows = build_injection_rows(self._extract_compound_data())
+                    # Index publié avant les lignes : un lecteur sans verrou qui
+                    # voit les lignes trouve aussi l'index
+                    self._injection_index = injection_time_index(rows['Timestamp'])
+                    self._injection_rows = rows
+        return self._injection_rows
+
+    def get_relative_area_by_injection(self, start_time=None, end_time=None) -> pd.DataFrame:
+        """
+        Aires relatives par injection suivies de la ligne "Moyennes".
 
-        for element, df in data_by_elements.items():
-            col = f'Rel. Area (%) : {element}'
-            if col in df.columns:
-                result[col] = pd.to_numeric(df[col], errors='coerce').values
+        Args:
+            start_time, end_time: Fenêtre de temps optionnelle ("HH:MM[:SS]" ou
+                                  date et heure) ; les moyennes ne portent que
+                                  sur les injections de la fenêtre
 
-        result = sort_data_by_time(result)
+        Raises:
+            ValueError: Si aucun composé n'est trouvé ou si une borne est illisible
+        """
+        rows = self._get_injection_rows()
+        positions = select_injection_window(self._injection_index, start_time, end_time)
+        result = rows if positions is None else rows.iloc[positions].reset_index(drop=True)
+        result = result.drop(columns='Timestamp')
 
         first_time = str(result['Injection Time'].iloc[0]) if len(result) > 0 else None
         last_time = str(result['Injection Time'].iloc[-1]) if len(result) > 0 else None
@@ -81,6 +96,14 @@ class ChromeleonOnlinePermanent:
         return result
     
     def _extract_compound_data(self):
+        if self._compound_data is None:
+            with self._lock:
+                if self._compound_data is None:
+                    self._compound_data = self._parse_compound_data()
+        return self._compound_data
+
+    @span("block_extraction")
+    def _parse_compound_data(self):
         data_by_compound = {}
         
         for comp_info in self.compounds:
@@ -118,9 +141,13 @@ class ChromeleonOnlinePermanent:
         
         return data_by_compound
     
-    def make_summary_tables(self):
-        rel_df = self.get_relative_area_by_injection()
+    @span("summary_tables")
+    def make_summary_tables(self, start_time=None, end_time=None):
+        rel_df = self.get_relative_area_by_injection(start_time, end_time)
         data_by_elements = self._extract_compound_data()
+        if start_time is not None or end_time is not None:
+            data_by_elements = filter_data_by_injections(
+                data_by_elements, rel_df['Injection Name'].iloc[:-1])
         elements_list = [comp['name'] for comp in self.compounds]
         
         table1 = create_summary_table1(rel_df, data_by_elements, elements_list)
@@ -355,14 +382,15 @@ class ChromeleonOnlinePermanent:
             "Permanent Gas mass fractions"
         ])
         
-        rel_df = self.get_relative_area_by_injection()
-        table1, table2 = self.make_summary_tables()
+        start_time, end_time = chart_config['start_time'], chart_config['end_time']
+        rel_df = self.get_relative_area_by_injection(start_time, end_time)
+        table1, table2 = self.make_summary_tables(start_time, end_time)
         ws = wb.create_sheet(title=sheet_name[:31])
         
         styles = get_standard_styles()
         styles['border'] = get_border(styles['black_thin'])
         
-        create_title_cell(ws, 1, 1, "%Rel Area par injection (Permanent)", styles)
+        create_title_cell(ws, 1, 1, "%Rel Area par injection (Permanent)" + format_window_suffix(start_time, end_time), styles)
         headers = list(rel_df.columns)
         start_row = 2
         format_table_headers(ws, headers, start_row, styles=styles)
@@ -378,6 +406,7 @@ class ChromeleonOnlinePermanent:
         format_table_headers(ws, headers1, table1_row + 1, styles=styles)
         format_data_table(ws, table1, table1_row + 2, special_row_identifier="Total:", styles=styles)
         apply_standard_column_widths(ws, "summary")
+        report_progress("sheet", ws.title, rows=ws.max_row)
 
         # Adapter la colonne du graphique selon la largeur du tableau rel_df
         from openpyxl.utils import get_column_letter
@@ -492,6 +521,7 @@ class ChromeleonOnlinePermanent:
                 apply_line_chart_styles(line_chart, "Permanent Gas mass fractions", legend_position='b', preserve_legend_layout=True)
 
                 ws.add_chart(line_chart, line_position)
+                report_progress("chart", "Permanent Gas mass fractions")
 
         return wb
 
@@ -0,0 +1,292 @@
+"""
+Comparaison des KPI du Résumé entre plusieurs expériences.
+
+Usage:
+    python main.py --compare <racines ou globs...> --out comparaison.xlsx
+                   [--workers N] [--cache FICHIER]
+
+Les KPI de chaque expérience (summary + bilan matière du Résumé, conditions
+opératoires du contexte) sont mis en cache par empreinte du dossier
+Bobine_data : seules les expériences nouvelles ou modifiées sont recalculées,
+dans un pool de processus.
+"""
+import argparse
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.chart import ScatterChart, Reference, Series
+from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
+
+from batch import expand_experiment_roots
+from utils.chart_styles import get_table_title_font, get_table_header_font, get_table_data_font, apply_line_chart_styles
+from utils.fingerprint import directory_fingerprint
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".bobine", "kpi_cache.json")
+
+# Version du format des KPI en cache (à incrémenter si le calcul change)
+CACHE_VERSION = 2
+
+CONDITION_COLUMNS = ["date", "feedstock", "debit_kgh", "nb_inducteurs", "temperature_max", "temperature_mean"]
+KPI_COLUMNS = [
+    "Light olefin", "Aromatics", "Other Hydrocarbons gas", "Other Hydrocarbons liquid", "Residue", "HVC",
+    "Ethylene", "Propylene", "C4=", "Benzene", "Toluene", "Xylene",
+    "Liquide (%)", "Gas (%)", "Residue (%)",
+]
+
+# Masses du contexte (clés de ExcelContextData.get_masses)
+MASS_COLUMNS = ["masse recette 1 (kg)", "masse recette 2 (kg)", "masse cendrier (kg)", "masse injectée (kg)"]
+
+# (KPI en ordonnée, condition en abscisse, titre de l'axe X)
+COMPARISON_CHARTS = [
+    ("HVC", "temperature_max", "Température inducteur max (°C)"),
+    ("HVC", "debit_kgh", "Débit plastique (kg/h)"),
+    ("Light olefin", "temperature_max", "Température inducteur max (°C)"),
+    ("Aromatics", "temperature_max", "Température inducteur max (°C)"),
+]
+
+
+def compute_experiment_kpis(root: str) -> dict:
+    """
+    Calcule les conditions opératoires et les KPI du Résumé d'une expérience
+    (exécuté dans un processus du pool).
+
+    Returns:
+        Dictionnaire plat {"root", "experience", CONDITION_COLUMNS..., "temperatures",
+        MASS_COLUMNS..., KPI_COLUMNS..., "error"}
+    """
+    record = {"root": root, "experience": os.path.basename(root), "error": None}
+    try:
+        import main
+        from context import ExcelContextData
+        from resume import Resume
+
+        dirs = main.getDirectories(root)
+        context = ExcelContextData(dirs[main.CONTEXT])
+        conditions = context.get_operating_conditions()
+        active_temperatures = [t for t in conditions["temperatures"] if t > 0]
+
+        record.update({
+            "experience": context.get_experience_name(),
+            "date": conditions["date"],
+            "feedstock": conditions["feedstock"],
+            "debit_kgh": conditions["debit_kgh"],
+            "nb_inducteurs": conditions["nb_inducteurs"],
+            "temperature_max": max(active_temperatures) if active_temperatures else None,
+            "temperature_mean": (sum(active_temperatures) / len(active_temperatures)) if active_temperatures else None,
+            "temperatures": conditions["temperatures"],
+        })
+        record.update({k: v for k, v in context.get_masses().items() if k in MASS_COLUMNS})
+
+        resume = Resume(dirs[main.CHROMELEON_ONLINE], dirs[main.CHROMELEON_OFFLINE], dirs[main.CONTEXT])
+        tables = resume.get_summary_and_mass_balance()
+        for df in (tables["summary"], tables["mass_balance"]):
+            if df.empty:
+                continue
+            for col in KPI_COLUMNS:
+                if col in df.columns and pd.notna(df[col].iloc[0]):
+                    record[col] = float(df[col].iloc[0])
+    except Exception as e:
+        print(f"[COMPARE] {root}: {e}", file=sys.stderr)
+        print(traceback.format_exc(), file=sys.stderr)
+        record["error"] = str(e)
+
+    return record
+
+
+def _load_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {"version": CACHE_VERSION, "experiments": {}}
+
+
+def _save_cache(cache: dict, cache_path: str) -> None:
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = cache_path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+def compare_experiments(
+    roots: list[str],
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+) -> pd.DataFrame:
+    """
+    Construit le tableau des KPI de plusieurs expériences.
+
+    Args:
+        roots: Racines d'expérience (dossiers contenant Bobine_data)
+        workers: Nombre de processus pour les expériences à recalculer
+        cache_path: Fichier cache JSON (None pour désactiver le cache)
+
+    Returns:
+        DataFrame indexé par racine, colonnes experience + CONDITION_COLUMNS + KPI_COLUMNS + error
+    """
+    cache = _load_cache(cache_path) if cache_path else {"version": CACHE_VERSION, "experiments": {}}
+    cached = cache["experiments"]
+
+    records = {}
+    fingerprints = {}
+    todo = []
+    for root in roots:
+        try:
+            fingerprints[root] = directory_fingerprint(os.path.join(root, "Bobine_data"))
+        except FileNotFoundError as e:
+            records[root] = {"root": root, "experience": os.path.basename(root), "error": str(e)}
+            continue
+        entry = cached.get(root)
+        if entry and entry.get("fingerprint") == fingerprints[root]:
+            records[root] = entry["kpis"]
+        else:
+            todo.append(root)
+
+    if len(todo) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = list(pool.map(compute_experiment_kpis, todo))
+    else:
+        computed = [compute_experiment_kpis(root) for root in todo]
+
+    for record in computed:
+        root = record["root"]
+        records[root] = record
+        if record["error"] is None:
+            cached[root] = {"fingerprint": fingerprints[root], "kpis": record}
+
+    if cache_path and computed:
+        _save_cache(cache, cache_path)
+
+    columns = ["experience"] + CONDITION_COLUMNS + KPI_COLUMNS + ["error"]
+    df = pd.DataFrame.from_records([records[root] for root in roots], index=roots, columns=["root"] + columns)
+    df.index.name = "root"
+    return df[columns]
+
+
+def generate_comparison_workbook(
+    kpi_df: pd.DataFrame,
+    wb: Optional[Workbook] = None,
+    sheet_name: str = "Comparaison",
+) -> Workbook:
+    """
+    Ajoute une feuille de comparaison (tableau des KPI + nuages de points).
+
+    Args:
+        kpi_df: Résultat de compare_experiments
+        wb: Classeur cible (nouveau classeur si None)
+        sheet_name: Nom de la feuille
+
+    Returns:
+        Le Workbook modifié
+    """
+    if wb is None:
+        wb = Workbook()
+        if 'Sheet' in wb.sheetnames:
+            wb.remove(wb['Sheet'])
+
+    ws = wb.create_sheet(title=sheet_name[:31])
+    table = kpi_df.drop(columns=["error"]).reset_index(drop=True)
+    headers = list(table.columns)
+
+    title_cell = ws.cell(row=1, column=1, value="Comparaison des essais")
+    title_cell.font = get_table_title_font()
+    title_cell.alignment = Alignment(horizontal="center", vertical="center")
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(headers))
+
+    header_row = 2
+    for c_idx, header in enumerate(headers, start=1):
+        cell = ws.cell(row=header_row, column=c_idx, value=header)
+        cell.font = get_table_header_font()
+        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        ws.column_dimensions[get_column_letter(c_idx)].width = 30 if header == "experience" else 14
+
+    data_font = get_table_data_font()
+    for r_idx, row in enumerate(table.itertuples(index=False), start=header_row + 1):
+        for c_idx, value in enumerate(row, start=1):
+            if isinstance(value, float) and pd.isna(value):
+                value = None
+            cell = ws.cell(row=r_idx, column=c_idx, value=value)
+            cell.font = data_font
+            if isinstance(value, float):
+                cell.number_format = '0.00'
+
+    last_row = header_row + len(table)
+    ws.freeze_panes = ws.cell(row=header_row + 1, column=2)
+
+    if len(table) == 0:
+        return wb
+
+    chart_col = len(headers) + 2
+    for i, (y_name, x_name, x_title) in enumerate(COMPARISON_CHARTS):
+        x_col = headers.index(x_name) + 1
+        y_col = headers.index(y_name) + 1
+
+        chart = ScatterChart()
+        chart.style = 2
+        chart.width = 16
+        chart.height = 8
+        chart.x_axis.title = x_title
+        chart.y_axis.title = "mass %"
+        chart.x_axis.delete = False
+        chart.y_axis.delete = False
+        chart.legend = None
+
+        x_ref = Reference(ws, min_col=x_col, min_row=header_row + 1, max_row=last_row)
+        y_ref = Reference(ws, min_col=y_col, min_row=header_row, max_row=last_row)
+        series = Series(y_ref, x_ref, title_from_data=True)
+        series.marker.symbol = "circle"
+        series.marker.size = 7
+        series.graphicalProperties.line.noFill = True
+        chart.series.append(series)
+
+        apply_line_chart_styles(chart, f"{y_name} vs {x_title}")
+        chart.legend = None
+
+        ws.add_chart(chart, ws.cell(row=1 + i * 17, column=chart_col).coordinate)
+
+    return wb
+
+
+def run_comparison(
+    patterns: list[str],
+    out_path: str,
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+) -> dict:
+    """
+    Compare les expériences désignées par `patterns` et écrit le classeur.
+
+    Returns:
+        {"out_path", "experiments", "errors": {racine: message}}
+    """
+    roots = expand_experiment_roots(patterns)
+    if not roots:
+        raise FileNotFoundError("Aucune racine d'expérience (dossier contenant Bobine_data) trouvée")
+
+    kpi_df = compare_experiments(roots, workers=workers, cache_path=cache_path)
+    generate_comparison_workbook(kpi_df).save(out_path)
+
+    errors = kpi_df["error"].dropna()
+    return {"out_path": out_path, "experiments": len(kpi_df), "errors": errors.to_dict()}
+
+
+def main(argv: list[str]) -> dict:
+    parser = argparse.ArgumentParser(prog="main.py --compare", description="Comparaison des KPI entre essais")
+    parser.add_argument("roots", nargs="+", help="Racines d'expérience ou motifs glob")
+    parser.add_argument("--out", required=True, help="Chemin du classeur de comparaison (.xlsx)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Fichier cache des KPI")
+    args = parser.parse_args(argv)
+
+    return run_comparison(args.roots, args.out, workers=args.workers, cache_path=args.cache)
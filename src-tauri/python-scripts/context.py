@@ -1,42 +1,146 @@
+import atexit
 import base64
 import io
 import os
 import re
+import sys
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
 from datetime import datetime
-from typing import Union, Optional
+from typing import TYPE_CHECKING, Union, Optional
 from copy import copy
-import pandas as pd
 from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.utils import get_column_letter
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
 from utils.text_utils import normalize_text, parse_date_value, sanitize_for_filename
+from profiling import span
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PAYLOAD_BASE64 = "base64"
+PAYLOAD_FILE = "file"
+
+# Cache LRU des payloads encodés, clé: (empreinte du fichier, mode). Chaque
+# entrée base64 est une copie complète du classeur : peu d'entrées suffisent
+MAX_CACHED_PAYLOADS = 4
+_PAYLOAD_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_payload_lock = threading.Lock()
+
+# (attribut du StyleArray, collection partagée du Workbook)
+_STYLE_COLLECTIONS = (
+    ("fontId", "_fonts"),
+    ("fillId", "_fills"),
+    ("borderId", "_borders"),
+    ("protectionId", "_protections"),
+    ("alignmentId", "_alignments"),
+)
+
+
+def _file_fingerprint(file_path: str) -> tuple:
+    """Empreinte d'un fichier: chemin absolu, taille et date de modification."""
+    st = os.stat(file_path)
+    return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+
+def _discard_payload(key: tuple, payload: str) -> None:
+    """Supprime le fichier temporaire d'une entrée PAYLOAD_FILE retirée du cache."""
+    if key[1] != PAYLOAD_FILE:
+        return
+    try:
+        os.remove(payload)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"[CONTEXT] Impossible de supprimer {payload}: {e}", file=sys.stderr)
+
+
+def _store_payload(key: tuple, payload: str) -> None:
+    """
+    Ajoute un payload au cache : l'entrée du même fichier et du même mode dont
+    l'empreinte a changé est remplacée, puis les plus anciennes au-delà de
+    MAX_CACHED_PAYLOADS sont évincées (fichiers temporaires supprimés).
+    """
+    (path, _, _), mode = key
+    with _payload_lock:
+        stale = [k for k in _PAYLOAD_CACHE if k != key and k[0][0] == path and k[1] == mode]
+        removed = [(k, _PAYLOAD_CACHE.pop(k)) for k in stale]
+        previous = _PAYLOAD_CACHE.pop(key, None)
+        if previous is not None and previous != payload:
+            removed.append((key, previous))
+        _PAYLOAD_CACHE[key] = payload
+        while len(_PAYLOAD_CACHE) > MAX_CACHED_PAYLOADS:
+            removed.append(_PAYLOAD_CACHE.popitem(last=False))
+    for k, old in removed:
+        _discard_payload(k, old)
+
+
+@atexit.register
+def clear_payload_cache() -> None:
+    """Vide le cache des payloads et supprime ses fichiers temporaires (appelé à la sortie)."""
+    with _payload_lock:
+        removed = list(_PAYLOAD_CACHE.items())
+        _PAYLOAD_CACHE.clear()
+    for key, payload in removed:
+        _discard_payload(key, payload)
+
+
+def _count_sheets(file_path: str) -> int:
+    """Compte les feuilles d'un .xlsx en lisant uniquement xl/workbook.xml (-1 si illisible)."""
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            xml = zf.read("xl/workbook.xml").decode("utf-8", errors="ignore")
+    except (KeyError, OSError, zipfile.BadZipFile):
+        return -1
+    return len(re.findall(r"<(?:\w+:)?sheet\s", xml))
+
+
+def _has_formulas(file_path: str) -> bool:
+    """Vrai si une feuille du .xlsx contient une formule (<f>), ou si le fichier est illisible."""
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            for name in zf.namelist():
+                if name.startswith("xl/worksheets/") and name.endswith(".xml"):
+                    if re.search(rb"<(?:\w+:)?f[\s>/]", zf.read(name)):
+                        return True
+    except (KeyError, OSError, zipfile.BadZipFile):
+        return True
+    return False
 
 
 class ExcelContextData:
     def __init__(self, dir_root: str):
-        self.first_file = ""
-        if os.path.exists(dir_root):
-            files = [
-                f for f in os.listdir(dir_root)
-                if os.path.isfile(os.path.join(dir_root, f))
-                and not f.startswith('.')  
-                and not f.startswith('~')
-                and not f.startswith('.~lock')
-                and f.lower().endswith('.xlsx')
-            ]
-
-            if not files:
-                raise FileNotFoundError(f"Aucun fichier Excel (.xlsx) valide trouvé dans {dir_root}")
-
-            files.sort()
-            self.first_file = os.path.join(dir_root, files[0])
-        else:
-            raise FileNotFoundError(f"Le répertoire {dir_root} n'existe pas")
-
+        self.first_file = self._find_context_file(dir_root)
         self.file_path = self.first_file
-        self.workbook = load_workbook(self.file_path, data_only=True)  # Read calculated values, not formulas
+        with span("file_read"):
+            self.workbook = load_workbook(self.file_path, data_only=True)  # Read calculated values, not formulas
         self.sheet_name = self.workbook.sheetnames[0]
         self.sheet: Worksheet = self.workbook[self.sheet_name]
+
+    @staticmethod
+    def _find_context_file(dir_root: str) -> str:
+        """Retourne le premier fichier .xlsx valide (ordre alphabétique) du répertoire."""
+        if not os.path.exists(dir_root):
+            raise FileNotFoundError(f"Le répertoire {dir_root} n'existe pas")
+
+        files = [
+            f for f in os.listdir(dir_root)
+            if os.path.isfile(os.path.join(dir_root, f))
+            and not f.startswith('.')  
+            and not f.startswith('~')
+            and not f.startswith('.~lock')
+            and f.lower().endswith('.xlsx')
+        ]
+
+        if not files:
+            raise FileNotFoundError(f"Aucun fichier Excel (.xlsx) valide trouvé dans {dir_root}")
+
+        files.sort()
+        return os.path.join(dir_root, files[0])
     
     def get_masses(self) -> dict[str, Optional[float]]:
         target_labels = {
@@ -53,18 +157,17 @@ class ExcelContextData:
             "masse injectee": "masse injectée (kg)",
         }
 
-        data = list(self.sheet.values)
-        df = pd.DataFrame(data)
+        grid, nrows, ncols = self._sheet_grid()
 
-        for i in range(df.shape[0]):
-            for j in range(df.shape[1]):
-                val = df.iat[i, j]
+        for i in range(nrows):
+            for j in range(ncols):
+                val = grid[i][j]
                 if isinstance(val, str):
                     normalized_val = normalize_text(val)
 
                     for pattern, label_key in search_patterns.items():
                         if pattern in normalized_val and target_labels[label_key] is None:
-                            cell_value = df.iat[i, j+1]
+                            cell_value = grid[i][j+1]
                             try:
                                 if cell_value is not None and str(cell_value).strip():
                                     target_labels[label_key] = float(str(cell_value).replace(',', '.'))
@@ -133,19 +236,18 @@ class ExcelContextData:
                 "heure fin": None
             }
 
-            data = list(self.sheet.values)
-            df = pd.DataFrame(data)
+            grid, nrows, ncols = self._sheet_grid()
 
-            for i in range(df.shape[0]):
-                for j in range(df.shape[1]):
-                    val = df.iat[i, j]
+            for i in range(nrows):
+                for j in range(ncols):
+                    val = grid[i][j]
                     if isinstance(val, str):
                         val_clean = val.lower().strip()
 
                         for key in target_labels.keys():
                             if key in val_clean and target_labels[key] is None:
-                                if j + 1 < df.shape[1]:
-                                    next_val = df.iat[i, j + 1]
+                                if j + 1 < ncols:
+                                    next_val = grid[i][j + 1]
                                     if next_val is not None and str(next_val).strip():
                                         target_labels[key] = str(next_val).strip()
                                         break
@@ -184,11 +286,55 @@ class ExcelContextData:
             "temperatures": "450450450"
           }
         """
-        sheet_to_use = self.sheet
+        target_info = self._extract_run_info()
+
+        temps_concat = "".join(str(int(t)) for t in target_info["temperatures"]) if target_info["temperatures"] else "0"
+
+        result = {
+            "date": target_info["date"],
+            "feedstock": target_info["feedstock"],
+            "debit": target_info["debit"],
+            "nb_inducteurs": target_info["nb_inducteurs"],
+            "temperatures": temps_concat
+        }
+
+        return result
+
+    def get_operating_conditions(self) -> dict:
+        """
+        Conditions opératoires sous forme numérique (comparaison entre essais).
+        Format retourné:
+          {
+            "date": "DDMMYYYY",
+            "feedstock": "LDPE" | "Unknown",
+            "debit_kgh": 0.73,
+            "nb_inducteurs": 3,
+            "temperatures": [450, 450, 450]
+          }
+        """
+        target_info = self._extract_run_info()
+
+        try:
+            debit_kgh = float(target_info["debit"].replace("kgh", ""))
+        except ValueError:
+            debit_kgh = 0.0
+
+        try:
+            nb_inducteurs = int(target_info["nb_inducteurs"])
+        except ValueError:
+            nb_inducteurs = len(target_info["temperatures"])
+
+        return {
+            "date": target_info["date"],
+            "feedstock": target_info["feedstock"],
+            "debit_kgh": debit_kgh,
+            "nb_inducteurs": nb_inducteurs,
+            "temperatures": list(target_info["temperatures"]),
+        }
 
-        data = list(sheet_to_use.values)
-        df = pd.DataFrame(data)
-        nrows, ncols = df.shape
+    def _extract_run_info(self) -> dict:
+        """Parcourt la feuille de contexte et extrait date, feedstock, débit, inducteurs et températures."""
+        grid, nrows, ncols = self._sheet_grid()
 
         target_info = {
             "date": None,
@@ -200,7 +346,7 @@ class ExcelContextData:
 
         for r in range(nrows):
             for c in range(ncols):
-                val = df.iat[r, c]
+                val = grid[r][c]
                 if val is None:
                     continue
 
@@ -208,21 +354,21 @@ class ExcelContextData:
 
                 if target_info["date"] is None and 'date' in norm:
                     if c + 1 < ncols:
-                        candidate = df.iat[r, c + 1]
+                        candidate = grid[r][c + 1]
                         parsed = parse_date_value(candidate)
                         if parsed:
                             target_info["date"] = parsed
 
                 if target_info["feedstock"] is None and ('feedstock' in norm or 'matiere' in norm):
                     if c + 1 < ncols:
-                        candidate = df.iat[r, c + 1]
+                        candidate = grid[r][c + 1]
                         if candidate is not None and str(candidate).strip():
                             feedstock_str = str(candidate).strip()
                             target_info["feedstock"] = sanitize_for_filename(feedstock_str).upper()
 
                 if target_info["debit"] is None and ('debit' in norm and 'plast' in norm):
                     if c + 1 < ncols:
-                        candidate = df.iat[r, c + 1]
+                        candidate = grid[r][c + 1]
                         if candidate is not None:
                             s = str(candidate)
                             m = re.search(r'(\d+[,.]?\d*)', s)
@@ -232,7 +378,7 @@ class ExcelContextData:
 
                 if target_info["nb_inducteurs"] is None and ('nombre' in norm and 'inducteur' in norm):
                     if c + 1 < ncols:
-                        candidate = df.iat[r, c + 1]
+                        candidate = grid[r][c + 1]
                         if candidate is not None:
                             try:
                                 num = int(float(str(candidate).replace(',', '.')))
@@ -243,7 +389,7 @@ class ExcelContextData:
         if nrows > 27:
             for col_idx in [1, 2, 3]:
                 if col_idx < ncols:
-                    cell = df.iat[27, col_idx]
+                    cell = grid[27][col_idx]
                     if cell is not None:
                         try:
                             val_float = float(str(cell).replace(',', '.'))
@@ -264,17 +410,7 @@ class ExcelContextData:
         if target_info["debit"] is None:
             target_info["debit"] = "0kgh"
 
-        temps_concat = "".join(str(int(t)) for t in target_info["temperatures"]) if target_info["temperatures"] else "0"
-
-        result = {
-            "date": target_info["date"],
-            "feedstock": target_info["feedstock"],
-            "debit": target_info["debit"],
-            "nb_inducteurs": target_info["nb_inducteurs"],
-            "temperatures": temps_concat
-        }
-
-        return result
+        return target_info
 
     def get_experience_name(self) -> str:
         """
@@ -307,19 +443,18 @@ class ExcelContextData:
             "heure fin": None
         }
 
-        data = list(self.sheet.values)
-        df = pd.DataFrame(data)
+        grid, nrows, ncols = self._sheet_grid()
 
-        for i in range(df.shape[0]):
-            for j in range(df.shape[1]):
-                val = df.iat[i, j]
+        for i in range(nrows):
+            for j in range(ncols):
+                val = grid[i][j]
                 if isinstance(val, str):
                     val_clean = val.lower().strip()
 
                     for key in target_labels.keys():
                         if key in val_clean and target_labels[key] is None:
-                            if j + 1 < df.shape[1]:
-                                next_val = df.iat[i, j + 1]
+                            if j + 1 < ncols:
+                                next_val = grid[i][j + 1]
                                 if next_val is not None and str(next_val).strip():
                                     target_labels[key] = str(next_val).strip()
                                     break
@@ -368,21 +503,105 @@ class ExcelContextData:
         self._copy_sheet(self.sheet, dst_ws)
         return target_wb
 
-    def get_as_dataframe(self) -> pd.DataFrame:
+    def get_as_dataframe(self) -> "pd.DataFrame":
+        import pandas as pd
         return pd.DataFrame(self.sheet.values)
 
+    def _sheet_grid(self) -> tuple[list[list], int, int]:
+        """Valeurs de la feuille en grille rectangulaire (lignes, nb lignes, nb colonnes)."""
+        grid = [list(row) for row in self.sheet.values]
+        ncols = max((len(row) for row in grid), default=0)
+        for row in grid:
+            row.extend([None] * (ncols - len(row)))
+        return grid, len(grid), ncols
+
     def get_as_base64(self) -> str:
-        """Encode uniquement la première feuille (copiée dans un mini-workbook) en base64."""
+        """Encode uniquement la première feuille en base64 (voir `get_payload_bytes`)."""
+        return self.encode_payload(self.file_path, mode=PAYLOAD_BASE64, workbook=self.workbook)
+
+    def get_as_file(self) -> str:
+        """Écrit la feuille de contexte dans un fichier temporaire et retourne son chemin."""
+        return self.encode_payload(self.file_path, mode=PAYLOAD_FILE, workbook=self.workbook)
+
+    @classmethod
+    def get_context_payload(cls, dir_root: str, mode: str = PAYLOAD_BASE64) -> str:
+        """
+        Retourne la feuille de contexte du répertoire sans recharger le classeur
+        si le fichier n'a pas changé depuis le dernier appel.
+
+        Args:
+            dir_root: Répertoire contenant le fichier de contexte
+            mode: PAYLOAD_BASE64 (chaîne base64) ou PAYLOAD_FILE (chemin d'un .xlsx temporaire)
+
+        Returns:
+            Chaîne base64 ou chemin de fichier selon `mode`
+        """
+        return cls.encode_payload(cls._find_context_file(dir_root), mode=mode)
+
+    @classmethod
+    def encode_payload(cls, file_path: str, mode: str = PAYLOAD_BASE64, workbook: Optional[Workbook] = None) -> str:
+        """
+        Encode le fichier de contexte selon `mode`, avec un cache LRU par
+        empreinte de fichier (chemin, taille, date de modification) ; les
+        fichiers temporaires évincés ou remplacés sont supprimés.
+
+        Args:
+            file_path: Chemin du fichier .xlsx de contexte
+            mode: PAYLOAD_BASE64 ou PAYLOAD_FILE
+            workbook: Classeur déjà chargé (évite un rechargement si la copie est nécessaire)
+
+        Returns:
+            Chaîne base64 ou chemin de fichier selon `mode`
+        """
+        if mode not in (PAYLOAD_BASE64, PAYLOAD_FILE):
+            raise ValueError(f"Mode de transfert inconnu: {mode} (attendu: {PAYLOAD_BASE64} ou {PAYLOAD_FILE})")
+
+        key = (_file_fingerprint(file_path), mode)
+        with _payload_lock:
+            cached = _PAYLOAD_CACHE.get(key)
+            if cached is not None:
+                _PAYLOAD_CACHE.move_to_end(key)
+        if cached is not None and (mode != PAYLOAD_FILE or os.path.exists(cached)):
+            return cached
+
+        raw = cls.get_payload_bytes(file_path, workbook)
+        if mode == PAYLOAD_BASE64:
+            payload = base64.b64encode(raw).decode("utf-8")
+        else:
+            fd, payload = tempfile.mkstemp(prefix="bobine_context_", suffix=".xlsx")
+            with os.fdopen(fd, "wb") as f:
+                f.write(raw)
+
+        _store_payload(key, payload)
+        return payload
+
+    @classmethod
+    def get_payload_bytes(cls, file_path: str, workbook: Optional[Workbook] = None) -> bytes:
+        """
+        Octets d'un .xlsx ne contenant que la première feuille du contexte.
+
+        Si le fichier source n'a qu'une feuille et aucune formule, ses octets
+        sont renvoyés tels quels ; sinon la feuille est copiée dans un
+        mini-workbook, avec les valeurs calculées (data_only) à la place des
+        formules.
+        """
+        if _count_sheets(file_path) == 1 and not _has_formulas(file_path):
+            with open(file_path, "rb") as f:
+                return f.read()
+
+        if workbook is None:
+            workbook = load_workbook(file_path, data_only=True)
+        sheet = workbook[workbook.sheetnames[0]]
+
         out_wb = Workbook()
         if "Sheet" in out_wb.sheetnames and len(out_wb.sheetnames) == 1:
             out_wb.remove(out_wb["Sheet"])
-        dst = out_wb.create_sheet(title=self.sheet_name[:31])
-        self._copy_sheet(self.sheet, dst)
+        dst = out_wb.create_sheet(title=sheet.title[:31])
+        cls._copy_sheet(sheet, dst)
 
         bio = io.BytesIO()
         out_wb.save(bio)
-        bio.seek(0)
-        return base64.b64encode(bio.getvalue()).decode("utf-8")
+        return bio.getvalue()
 
     @staticmethod
     def inject_base64_sheet(
@@ -429,26 +648,77 @@ class ExcelContextData:
 
     @staticmethod
     def _copy_sheet(source_ws: Worksheet, target_ws: Worksheet) -> None:
-        """Copie valeurs, styles, merges, dimensions, freeze panes d'une feuille à l'autre."""
-        for r_idx, row in enumerate(source_ws.iter_rows(values_only=False), start=1):
-            for c_idx, cell in enumerate(row, start=1):
-                t = target_ws.cell(row=r_idx, column=c_idx, value=cell.value)
-                try:
-                    if getattr(cell, "has_style", False):
-                        if cell.number_format is not None:
-                            t.number_format = cell.number_format
-                        if cell.font is not None:
-                            t.font = copy(cell.font)
-                        if cell.fill is not None:
-                            t.fill = copy(cell.fill)
-                        if cell.alignment is not None:
-                            t.alignment = copy(cell.alignment)
-                        if cell.border is not None:
-                            t.border = copy(cell.border)
-                        if cell.protection is not None:
-                            t.protection = copy(cell.protection)
-                except Exception:
-                    pass
+        """
+        Copie valeurs, styles, merges, dimensions, freeze panes d'une feuille à l'autre.
+
+        Les styles sont copiés par index : chaque police, remplissage, bordure,
+        alignement, protection, format numérique ou style nommé distinct de la
+        source n'est enregistré qu'une fois dans le classeur cible (cache id
+        source -> id cible). Le coût suit le nombre de styles distincts, pas le
+        nombre de cellules.
+        """
+        src_wb = source_ws.parent
+        tgt_wb = target_ws.parent
+        id_cache: dict[tuple[str, int], int] = {}
+        style_cache: dict[StyleArray, StyleArray] = {}
+
+        def remap(collection: str, idx: int) -> int:
+            key = (collection, idx)
+            if key not in id_cache:
+                obj = getattr(src_wb, collection)[idx]
+                id_cache[key] = getattr(tgt_wb, collection).add(copy(obj))
+            return id_cache[key]
+
+        def remap_named_style(xf_id: int) -> int:
+            # Styles nommés repérés par leur nom : "Normal" existe déjà dans la cible
+            if xf_id >= len(src_wb._named_styles):
+                return 0
+            named = src_wb._named_styles[xf_id]
+            names = tgt_wb._named_styles.names
+            if named.name not in names:
+                tgt_wb.add_named_style(copy(named))
+                names = tgt_wb._named_styles.names
+            return names.index(named.name)
+
+        def target_style(style: StyleArray) -> StyleArray:
+            new_style = StyleArray()
+            for attr, collection in _STYLE_COLLECTIONS:
+                setattr(new_style, attr, remap(collection, getattr(style, attr)))
+            num_fmt_id = style.numFmtId
+            if num_fmt_id >= BUILTIN_FORMATS_MAX_SIZE:
+                num_fmt_id = remap("_number_formats", num_fmt_id - BUILTIN_FORMATS_MAX_SIZE) + BUILTIN_FORMATS_MAX_SIZE
+            new_style.numFmtId = num_fmt_id
+            new_style.xfId = remap_named_style(style.xfId)
+            new_style.quotePrefix = style.quotePrefix
+            new_style.pivotButton = style.pivotButton
+            return new_style
+
+        style_errors = 0
+        for (r_idx, c_idx), cell in source_ws._cells.items():
+            t = target_ws.cell(row=r_idx, column=c_idx)
+            t._value = cell._value
+            t.data_type = cell.data_type
+
+            if not cell.has_style:
+                continue
+
+            try:
+                style = style_cache.get(cell._style)
+                if style is None:
+                    style = target_style(cell._style)
+                    style_cache[copy(cell._style)] = style
+                t._style = copy(style)
+            except (KeyError, IndexError):
+                # Identifiant de style absent des collections du classeur source
+                # (fichier incohérent) : cellule copiée sans style
+                pass
+            except Exception as e:
+                style_errors += 1
+                if style_errors == 1:
+                    print(f"[CONTEXT] Style non copié ({source_ws.title}!{t.coordinate}): {e!r}", file=sys.stderr)
+
+        if style_errors > 1:
+            print(f"[CONTEXT] {style_errors} cellules copiées sans style dans {source_ws.title}", file=sys.stderr)
 
         for mrange in getattr(source_ws.merged_cells, "ranges", []):
             target_ws.merge_cells(str(mrange))
@@ -0,0 +1,176 @@
+"""
+InjectionConditions - Conditions opératoires Pignat rattachées aux injections GC-Online
+"""
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.chart import LineChart, Reference
+from openpyxl.styles import Border, Side
+from openpyxl.utils import get_column_letter
+
+from chromeleon_online import ChromeleonOnline
+from pignat import PignatData
+from utils.column_mapping import get_rel_area_columns
+from utils.chart_styles import get_table_title_font, get_table_header_font, get_table_data_font, apply_line_chart_styles
+from utils.pignat.pignat_constants import INJECTION_LOOKBACK_S, INJECTION_CONDITIONS_SHEET_TITLE
+from profiling import span
+from protocol import report_progress
+
+REL_AREA_PREFIX = 'Rel. Area (%) : '
+
+
+class InjectionConditions:
+    def __init__(self, pignat: PignatData, chromeleon_online: ChromeleonOnline):
+        """
+        Args:
+            pignat, chromeleon_online: Instances déjà parsées des deux sources
+        """
+        self.pignat = pignat
+        self.chromeleon_online = chromeleon_online
+
+    def get_aligned_table(self, lookback_s: float = INJECTION_LOOKBACK_S,
+                          channels: list[str] | None = None) -> tuple[pd.DataFrame, dict]:
+        """
+        Une ligne par injection : composition (aires relatives) et moyenne des
+        voies Pignat sur les lookback_s secondes précédant l'injection.
+
+        Args:
+            lookback_s: Durée (s) de la fenêtre de moyenne avant chaque injection
+            channels: Voies Pignat voulues (défaut: CONDITION_CHANNELS)
+
+        Returns:
+            (DataFrame ['Injection Name', 'Injection Time', 'Timestamp', 'Pignat
+            samples', voies..., composés...], {"mode", "channels", "missing",
+            "elements"})
+
+        Raises:
+            ValueError: Si les injections ne correspondent pas aux aires relatives
+        """
+        rel_df = self.chromeleon_online.get_relative_area_by_injection()
+        rel_df = rel_df[rel_df['Injection Name'] != 'Moyennes'].reset_index(drop=True)
+        injections = self.chromeleon_online.get_injection_timestamps()
+        if not rel_df['Injection Name'].astype(str).equals(injections['Injection Name'].astype(str)):
+            raise ValueError("Les injections horodatées ne correspondent pas aux aires relatives")
+
+        with span("injection_conditions"):
+            conditions = self.pignat.get_conditions_at(
+                injections['Timestamp'].to_numpy(dtype="datetime64[ns]"), lookback_s, channels)
+
+        # Sans correspondance de dates, seule l'heure de l'injection a servi
+        timestamps = injections['Timestamp']
+        fmt = '%Y-%m-%d %H:%M:%S' if conditions["mode"] == "datetime" else '%H:%M:%S'
+        table = {
+            'Injection Name': rel_df['Injection Name'],
+            'Injection Time': rel_df['Injection Time'],
+            'Timestamp': timestamps.dt.strftime(fmt).where(timestamps.notna(), None),
+            'Pignat samples': conditions["samples"],
+        }
+        # Arrondi bien en deçà de la résolution des capteurs (restes d'arrondi des sommes cumulées)
+        values = np.round(conditions["values"], 9)
+        for j, channel in enumerate(conditions["channels"]):
+            table[channel] = values[:, j]
+        elements = []
+        for col in get_rel_area_columns(rel_df):
+            element = col.replace(REL_AREA_PREFIX, '')
+            elements.append(element)
+            table[element] = pd.to_numeric(rel_df[col], errors='coerce').to_numpy(dtype="float64")
+
+        meta = {
+            "mode": conditions["mode"],
+            "channels": conditions["channels"],
+            "missing": conditions["missing"],
+            "elements": elements,
+        }
+        return pd.DataFrame(table), meta
+
+    def get_injection_conditions(self, lookback_s: float = INJECTION_LOOKBACK_S,
+                                 channels: list[str] | None = None) -> dict:
+        """
+        Vue alignée GC + Pignat au format JSON (commande INJECTION_CONDITIONS).
+
+        Returns:
+            {"mode": "datetime" ou "time_of_day", "lookback_s", "channels",
+            "missing", "matched": injections ayant des données Pignat,
+            "injections": [{"name", "time", "timestamp", "samples",
+            "conditions": {voie: valeur}, "composition": {composé: valeur}}]}
+        """
+        table, meta = self.get_aligned_table(lookback_s, channels)
+
+        def column(name):
+            return [None if v != v else v for v in table[name].tolist()]
+
+        conditions = {c: column(c) for c in meta["channels"]}
+        composition = {e: column(e) for e in meta["elements"]}
+        injections = []
+        for i in range(len(table)):
+            injections.append({
+                "name": str(table['Injection Name'].iloc[i]),
+                "time": str(table['Injection Time'].iloc[i]),
+                "timestamp": table['Timestamp'].iloc[i],
+                "samples": int(table['Pignat samples'].iloc[i]),
+                "conditions": {c: values[i] for c, values in conditions.items()},
+                "composition": {e: values[i] for e, values in composition.items()},
+            })
+        return {
+            "mode": meta["mode"],
+            "lookback_s": lookback_s,
+            "channels": meta["channels"],
+            "missing": meta["missing"],
+            "matched": int((table['Pignat samples'] > 0).sum()),
+            "injections": injections,
+        }
+
+    def generate_workbook_with_charts(self, wb: Workbook, lookback_s: float = INJECTION_LOOKBACK_S,
+                                      channels: list[str] | None = None,
+                                      sheet_name: str = INJECTION_CONDITIONS_SHEET_TITLE) -> Workbook:
+        """Ajoute la feuille "GC + Pignat" (tableau aligné et graphique des conditions)."""
+        table, meta = self.get_aligned_table(lookback_s, channels)
+
+        ws = wb.create_sheet(title=sheet_name)
+        title_font = get_table_title_font()
+        header_font = get_table_header_font()
+        data_font = get_table_data_font()
+        thin_border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+
+        title = f"Conditions Pignat à l'injection (moyenne sur {lookback_s:g} s)"
+        ws.cell(row=1, column=1, value=title).font = title_font
+        for j, col_name in enumerate(table.columns, start=1):
+            cell = ws.cell(row=2, column=j, value=col_name)
+            cell.font = header_font
+            cell.border = thin_border
+        for i, row_data in enumerate(table.itertuples(index=False), start=3):
+            for j, value in enumerate(row_data, start=1):
+                if isinstance(value, float) and value != value:
+                    value = None
+                cell = ws.cell(row=i, column=j, value=value)
+                cell.font = data_font
+                cell.border = thin_border
+        ws.column_dimensions['A'].width = 24
+        for j in range(2, len(table.columns) + 1):
+            ws.column_dimensions[get_column_letter(j)].width = 14
+        report_progress("sheet", ws.title, rows=len(table))
+
+        # Graphique des températures (toutes les voies si aucune en °C)
+        plotted = [c for c in meta["channels"] if c.endswith('°C')] or meta["channels"]
+        if plotted and len(table):
+            chart_title = "Conditions Pignat par injection"
+            chart = LineChart()
+            chart.title = chart_title
+            chart.y_axis.title = ', '.join(plotted)
+            chart.x_axis.title = 'Injection Time'
+            chart.width = 23
+            chart.height = 13
+            max_row = 2 + len(table)
+            for channel in plotted:
+                col = list(table.columns).index(channel) + 1
+                chart.add_data(Reference(ws, min_col=col, min_row=2, max_row=max_row), titles_from_data=True)
+            chart.set_categories(Reference(ws, min_col=2, min_row=3, max_row=max_row))
+            apply_line_chart_styles(chart, chart_title, legend_position='r')
+            ws.add_chart(chart, f"{get_column_letter(len(table.columns) + 2)}2")
+            report_progress("chart", chart_title)
+        return wb
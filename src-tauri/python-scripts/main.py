@@ -1,22 +1,27 @@
 import base64
+import functools
+import importlib
 import sys
 import os
 import json
 import io
+import threading
 import traceback
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.chart import LineChart, Series, Reference
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-from context import ExcelContextData
-from pignat import PignatData
-from chromeleon_online import ChromeleonOnline
-from chromeleon_offline import ChromeleonOffline
-from chromeleon_online_permanent import ChromeleonOnlinePermanent
-from resume import Resume
+from profiling import get_stats, increment, profile_command, span
+from protocol import PROTOCOL_VERSION, InteractiveServer, RequestContext, check_cancelled, report_progress, request_scope
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', line_buffering=True)
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
+# Idempotent: le module peut être réimporté par les processus du mode --batch
+if not (sys.stdout.encoding.lower() == 'utf-8' and sys.stdout.line_buffering):
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+if not (sys.stderr.encoding.lower() == 'utf-8' and sys.stderr.line_buffering):
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', line_buffering=True)
 
 CHROMELEON_ONLINE = "chromeleon_online"
 CHROMELEON_OFFLINE = "chromeleon_offline"
@@ -24,6 +29,163 @@ CHROMELEON_ONLINE_PERMANENT_GAS = "chromeleon_online_permanent_gas"
 PIGNAT = "pignat"
 RESUME = "resume"
 CONTEXT = "context"
+# Clé optionnelle de metrics_wanted: ajoute la feuille "Data quality" du journal Pignat
+DATA_QUALITY = "data_quality"
+# Clé optionnelle de metrics_wanted (true ou {"lookbackS", "channels"}): ajoute
+# la feuille "GC + Pignat" des conditions opératoires à chaque injection
+INJECTION_CONDITIONS = "injection_conditions"
+
+# Registre des sources: (module, classe). Le module du processeur et ses
+# dépendances (pandas, graphiques openpyxl...) ne sont importés qu'au premier
+# usage, pour que les commandes simples démarrent vite.
+SOURCE_CLASSES = {
+    CONTEXT:            ("context", "ExcelContextData"),
+    PIGNAT:             ("pignat", "PignatData"),
+    CHROMELEON_ONLINE:  ("chromeleon_online", "ChromeleonOnline"),
+    CHROMELEON_OFFLINE: ("chromeleon_offline", "ChromeleonOffline"),
+    CHROMELEON_ONLINE_PERMANENT_GAS: ("chromeleon_online_permanent", "ChromeleonOnlinePermanent"),
+    RESUME:             ("resume", "Resume"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_source_class(source: str):
+    """Importe (une seule fois) et retourne la classe de traitement d'une source."""
+    module_name, class_name = SOURCE_CLASSES[source]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# Instances de processeurs réutilisées entre commandes (mode interactif),
+# clé: (source, répertoires, empreintes des répertoires) -> Future de l'instance
+MAX_CACHED_SOURCES = 12
+_source_instances: "OrderedDict[tuple, Future]" = OrderedDict()
+_source_lock = threading.Lock()
+_preload_executor: "ThreadPoolExecutor | None" = None
+
+
+def _source_key(source: str, dirs: tuple) -> tuple:
+    from utils.fingerprint import directory_fingerprint
+
+    fingerprints = []
+    for d in dirs:
+        try:
+            fingerprints.append(directory_fingerprint(d))
+        except FileNotFoundError:
+            fingerprints.append(None)
+    return (source, dirs, tuple(fingerprints))
+
+
+def _build_source(source: str, dirs: tuple):
+    cls = get_source_class(source)
+    if source != RESUME:
+        return cls(*dirs)
+
+    # Le Résumé réutilise les instances GC et contexte déjà parsées
+    dir_online, dir_offline, dir_context = dirs
+    parts = {}
+    for name, sub_source, sub_dir in (
+        ("chromeleon_online", CHROMELEON_ONLINE, dir_online),
+        ("chromeleon_offline", CHROMELEON_OFFLINE, dir_offline),
+        ("context_data", CONTEXT, dir_context),
+    ):
+        try:
+            parts[name] = get_source(sub_source, sub_dir)
+        except Exception:
+            pass
+    return cls(dir_online, dir_offline, dir_context, **parts)
+
+
+def get_source(source: str, *dirs: str):
+    """
+    Instance de la classe de traitement de `source` pour `dirs`.
+
+    Une instance déjà construite (ou en cours de construction par PRELOAD) est
+    réutilisée tant que les fichiers des répertoires n'ont pas changé ; sinon
+    elle est construite dans le thread appelant.
+    """
+    key = _source_key(source, dirs)
+    with _source_lock:
+        future = _source_instances.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _source_instances[key] = future
+            while len(_source_instances) > MAX_CACHED_SOURCES:
+                _source_instances.popitem(last=False)
+        else:
+            _source_instances.move_to_end(key)
+
+    if owner:
+        try:
+            future.set_result(_build_source(source, dirs))
+        except Exception as e:
+            future.set_exception(e)
+
+    try:
+        instance = future.result()
+    except Exception:
+        # Pas de mise en cache des échecs: la prochaine commande réessaie
+        with _source_lock:
+            if _source_instances.get(key) is future:
+                del _source_instances[key]
+        raise
+
+    increment("source_cache_misses" if owner else "source_cache_hits")
+    report_progress("parse", source, rows=_source_rows(instance), cached=not owner)
+    return instance
+
+
+def clear_source_cache() -> None:
+    """Oublie les instances de processeurs en cache (benchmarks à froid, libération mémoire)."""
+    with _source_lock:
+        _source_instances.clear()
+
+
+def _source_rows(instance) -> "int | None":
+    """Nombre de lignes des tables brutes d'une instance de processeur (événements d'avancement)."""
+    frames = [getattr(instance, attr, None) for attr in ("data_frame", "df", "summary_df", "df_r1", "df_r2")]
+    lengths = [len(df) for df in frames if df is not None]
+    return sum(lengths) if lengths else None
+
+
+def _resume_dirs(dir_path: str) -> tuple[str, str, str]:
+    directories = getDirectories(dir_path)
+    return directories[CHROMELEON_ONLINE], directories[CHROMELEON_OFFLINE], directories[CONTEXT]
+
+
+def preload(dir_path: str) -> list[str]:
+    """
+    Lance en arrière-plan le parsing de toutes les sources présentes de `dir_path`.
+
+    Returns:
+        Liste des sources dont le chargement a été lancé
+    """
+    global _preload_executor
+    if _preload_executor is None:
+        _preload_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="preload")
+
+    directories = getDirectories(dir_path)
+    started = []
+    for source in (CONTEXT, PIGNAT, CHROMELEON_ONLINE, CHROMELEON_OFFLINE, CHROMELEON_ONLINE_PERMANENT_GAS):
+        if os.path.exists(directories[source]):
+            _preload_executor.submit(_preload_one, source, (directories[source],))
+            started.append(source)
+
+    resume_dirs = _resume_dirs(dir_path)
+    if all(os.path.exists(d) for d in resume_dirs):
+        # Soumis en dernier: ses dépendances sont déjà en file ou en cours
+        _preload_executor.submit(_preload_one, RESUME, resume_dirs)
+        started.append(RESUME)
+
+    return started
+
+
+def _preload_one(source: str, dirs: tuple) -> None:
+    try:
+        get_source(source, *dirs)
+    except Exception as e:
+        print(f"[PRELOAD] {source}: {e}", file=sys.stderr)
+
 
 dataFromMetricsSensor = {
     CHROMELEON_ONLINE:  [],
@@ -51,31 +213,32 @@ def get_context_masses(dir_path):
     if not os.path.exists(DIR):
         raise FileNotFoundError(
             f"Le fichier de contexte n'existe pas dans {DIR}")
-    contextData = ExcelContextData(DIR)
+    contextData = get_source(CONTEXT, DIR)
 
     return contextData.get_masses()
 
 
-def get_context_workbook(dir_path: str, wb: Workbook):
+def get_context_workbook(dir_path: str, wb: "Workbook"):
     DIR = getDirectories(dir_path)[CONTEXT]
 
     if not os.path.exists(DIR):
         raise FileNotFoundError(
             f"Le fichier de contexte n'existe pas dans {DIR}")
-    contextData = ExcelContextData(DIR)
+    contextData = get_source(CONTEXT, DIR)
 
     return contextData.add_self_sheet_to(wb)
 
 
-def get_context_b64(dir_path):
+def get_context_b64(dir_path, mode=None):
     DIR = getDirectories(dir_path)[CONTEXT]
 
     if not os.path.exists(DIR):
         raise FileNotFoundError(
             f"Le fichier de contexte n'existe pas dans {DIR}")
-    contextData = ExcelContextData(DIR)
 
-    return contextData.get_as_base64()
+    # mode: "base64" (défaut, compatible) ou "file" (chemin d'un .xlsx temporaire)
+    context_class = get_source_class(CONTEXT)
+    return context_class.get_context_payload(DIR, mode) if mode else context_class.get_context_payload(DIR)
 
 
 def get_context_experience_name(dir_path):
@@ -84,11 +247,35 @@ def get_context_experience_name(dir_path):
     if not os.path.exists(DIR):
         raise FileNotFoundError(
             f"Le fichier de contexte n'existe pas dans {DIR}")
-    contextData = ExcelContextData(DIR)
+    contextData = get_source(CONTEXT, DIR)
 
     return contextData.get_experience_name()
 
 
+def get_injection_conditions(dir_root: str):
+    """Vue alignée GC-Online + Pignat, à partir des instances en cache des deux sources."""
+    from injection_conditions import InjectionConditions
+
+    directories = getDirectories(dir_root)
+    for source in (PIGNAT, CHROMELEON_ONLINE):
+        if not os.path.exists(directories[source]):
+            raise FileNotFoundError(f"{source} directory not found: {directories[source]}")
+    return InjectionConditions(
+        get_source(PIGNAT, directories[PIGNAT]),
+        get_source(CHROMELEON_ONLINE, directories[CHROMELEON_ONLINE]),
+    )
+
+
+def _injection_conditions_kwargs(options: dict) -> dict:
+    """Arguments de InjectionConditions depuis {"lookbackS", "channels"}."""
+    kwargs = {}
+    if options.get("lookbackS") is not None:
+        kwargs["lookback_s"] = float(options["lookbackS"])
+    if options.get("channels"):
+        kwargs["channels"] = list(options["channels"])
+    return kwargs
+
+
 def get_graphs_available(dir_path):
     metrics_available = {
         PIGNAT:             [],
@@ -103,7 +290,7 @@ def get_graphs_available(dir_path):
     pignat_dir = directories[PIGNAT]
     if os.path.exists(pignat_dir):
         try:
-            pignat_data = PignatData(pignat_dir)
+            pignat_data = get_source(PIGNAT, pignat_dir)
             metrics_available[PIGNAT] = pignat_data.get_available_graphs()
         except Exception:
             metrics_available[PIGNAT] = {"error": "Le fichier Pignat ne possède pas les données attendues"}
@@ -112,7 +299,7 @@ def get_graphs_available(dir_path):
     chromeleon_online_dir = directories[CHROMELEON_ONLINE]
     if os.path.exists(chromeleon_online_dir):
         try:
-            chromeleon_online_data = ChromeleonOnline(chromeleon_online_dir)
+            chromeleon_online_data = get_source(CHROMELEON_ONLINE, chromeleon_online_dir)
             metrics_available[CHROMELEON_ONLINE] = chromeleon_online_data.get_graphs_available()
         except Exception:
             metrics_available[CHROMELEON_ONLINE] = {"error": "Le fichier GC-Online ne possède pas les données attendues"}
@@ -121,7 +308,7 @@ def get_graphs_available(dir_path):
     chromeleon_offline_dir = directories[CHROMELEON_OFFLINE]
     if os.path.exists(chromeleon_offline_dir):
         try:
-            chromeleon_offline_data = ChromeleonOffline(chromeleon_offline_dir)
+            chromeleon_offline_data = get_source(CHROMELEON_OFFLINE, chromeleon_offline_dir)
             metrics_available[CHROMELEON_OFFLINE] = chromeleon_offline_data.get_graphs_available()
         except Exception:
             metrics_available[CHROMELEON_OFFLINE] = {"error": "Le fichier GC-Offline ne possède pas les données attendues"}
@@ -130,7 +317,7 @@ def get_graphs_available(dir_path):
     chromeleon_online_permanent_gas_dir = directories[CHROMELEON_ONLINE_PERMANENT_GAS]
     if os.path.exists(chromeleon_online_permanent_gas_dir):
         try:
-            chromeleon_online_permanent_gas_data = ChromeleonOnlinePermanent(chromeleon_online_permanent_gas_dir)
+            chromeleon_online_permanent_gas_data = get_source(CHROMELEON_ONLINE_PERMANENT_GAS, chromeleon_online_permanent_gas_dir)
             metrics_available[CHROMELEON_ONLINE_PERMANENT_GAS] = chromeleon_online_permanent_gas_data.get_graphs_available()
         except Exception:
             metrics_available[CHROMELEON_ONLINE_PERMANENT_GAS] = {"error": "Le fichier GC-Online Permanent Gas ne possède pas les données attendues"}
@@ -144,7 +331,7 @@ def get_graphs_available(dir_path):
         
         # Check if required directories exist
         if os.path.exists(dir_online) and os.path.exists(dir_offline) and os.path.exists(dir_context):
-            resume_data = Resume(dir_online, dir_offline, dir_context)
+            resume_data = get_source(RESUME, dir_online, dir_offline, dir_context)
             metrics_available[RESUME] = resume_data.get_all_graphs_available()
     except Exception:
         metrics_available[RESUME] = {"error": "Le fichier Résumé ne possède pas les données attendues"}
@@ -156,38 +343,60 @@ def save_to_excel_with_charts(
     dir_root: str,
     metrics_wanted: dict,
     masses: dict[str, float]
-) -> Workbook:
-    
+) -> "Workbook":
+    from openpyxl import Workbook
+
     wb = Workbook()
     if 'Sheet' in wb.sheetnames:
         wb.remove(wb['Sheet'])
 
     wb = get_context_workbook(dir_root, wb)
+    report_progress("context", rows=sum(ws.max_row for ws in wb.worksheets))
 
+    check_cancelled()
     if metrics_wanted.get(PIGNAT):
         pignat_dir = getDirectories(dir_root)[PIGNAT]
-        wb = PignatData(pignat_dir) \
+        wb = get_source(PIGNAT, pignat_dir) \
             .generate_workbook_with_charts(wb, metrics_wanted[PIGNAT])
 
+    check_cancelled()
+    if metrics_wanted.get(DATA_QUALITY):
+        pignat_dir = getDirectories(dir_root)[PIGNAT]
+        if os.path.exists(pignat_dir):
+            wb = get_source(PIGNAT, pignat_dir).generate_data_quality_sheet(wb)
+
+    check_cancelled()
     if metrics_wanted.get(CHROMELEON_ONLINE):
         chromo_online_dir = getDirectories(dir_root)[CHROMELEON_ONLINE]
-        wb = ChromeleonOnline(chromo_online_dir) \
+        wb = get_source(CHROMELEON_ONLINE, chromo_online_dir) \
             .generate_workbook_with_charts(wb, metrics_wanted[CHROMELEON_ONLINE])
 
+    check_cancelled()
+    if metrics_wanted.get(INJECTION_CONDITIONS):
+        options = metrics_wanted[INJECTION_CONDITIONS]
+        try:
+            wb = get_injection_conditions(dir_root).generate_workbook_with_charts(
+                wb, **_injection_conditions_kwargs(options if isinstance(options, dict) else {}))
+        except Exception as e:
+            print(f"[INJECTION_CONDITIONS] {e}", file=sys.stderr)
+
+    check_cancelled()
     if metrics_wanted.get(CHROMELEON_OFFLINE):
         chromo_offline_dir = getDirectories(dir_root)[CHROMELEON_OFFLINE]
-        wb = ChromeleonOffline(chromo_offline_dir) \
+        wb = get_source(CHROMELEON_OFFLINE, chromo_offline_dir) \
             .generate_workbook_with_charts(
             wb,
             metrics_wanted[CHROMELEON_OFFLINE],
             masses
         )
 
+    check_cancelled()
     if metrics_wanted.get(CHROMELEON_ONLINE_PERMANENT_GAS):
         chromo_online_permanent_gas_dir = getDirectories(dir_root)[CHROMELEON_ONLINE_PERMANENT_GAS]
-        wb = ChromeleonOnlinePermanent(chromo_online_permanent_gas_dir) \
+        wb = get_source(CHROMELEON_ONLINE_PERMANENT_GAS, chromo_online_permanent_gas_dir) \
             .generate_workbook_with_charts(wb, metrics_wanted[CHROMELEON_ONLINE_PERMANENT_GAS])
 
+    check_cancelled()
     if metrics_wanted.get(RESUME):
         try:
             resume_root_dir = getDirectories(dir_root)[RESUME]
@@ -197,12 +406,13 @@ def save_to_excel_with_charts(
             
             # Check if required directories exist
             if os.path.exists(dir_online) and os.path.exists(dir_offline) and os.path.exists(dir_context):
-                resume_data = Resume(dir_online, dir_offline, dir_context)
+                resume_data = get_source(RESUME, dir_online, dir_offline, dir_context)
                 wb = resume_data.generate_workbook_with_charts(wb, metrics_wanted[RESUME])
         except Exception:
             # If resume generation fails, continue without it
             pass
 
+    check_cancelled()
     return wb
 
 
@@ -231,9 +441,37 @@ def process_command(args):
                 print(f"[GET_CONTEXT_MASSES] {e}", file=sys.stderr)
                 response = {"error": str(e)}
 
+        elif action == "PROTOCOL":
+            # Version la plus récente comprise par ce processus (v1 toujours acceptée)
+            response = {"result": {"version": PROTOCOL_VERSION, "supported": [1, PROTOCOL_VERSION]}}
+
+        elif action == "STATS":
+            # STATS [reset]
+            response = {"result": get_stats(reset=(arg2 == "reset"))}
+
+        elif action == "PROFILE":
+            # PROFILE <cprofile|tracemalloc|trace> <COMMANDE> <args...>
+            try:
+                if not arg3 or arg3 == "PROFILE":
+                    raise ValueError("Command to profile is required")
+                result = profile_command(lambda: process_command(args[2:]), arg2)
+                response = {"result": result}
+            except Exception as e:
+                print(f"[PROFILE] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
+        elif action == "PRELOAD":
+            try:
+                if not arg2:
+                    raise ValueError("Directory path is required")
+                response = {"result": {"preloading": preload(arg2)}}
+            except Exception as e:
+                print(f"[PRELOAD] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
         elif action == "GET_CONTEXT_B64":
             try:
-                result = get_context_b64(arg2)
+                result = get_context_b64(arg2, arg3)
                 response = {"result": result}
             except Exception as e:
                 print(f"[GET_CONTEXT_B64] {e}", file=sys.stderr)
@@ -259,7 +497,7 @@ def process_command(args):
                         }
                     }
                 else:
-                    contextData = ExcelContextData(DIR)
+                    contextData = get_source(CONTEXT, DIR)
                     result = contextData.validate()
                     response = {"result": result}
             except Exception as e:
@@ -289,7 +527,7 @@ def process_command(args):
                 # Time range is only available for PIGNAT data
                 pignat_dir = getDirectories(dir_root)[PIGNAT]
                 if os.path.exists(pignat_dir):
-                    pignat_data = PignatData(pignat_dir)
+                    pignat_data = get_source(PIGNAT, pignat_dir)
                     result = pignat_data.get_time_range()
                     response = {"result": result}
                 else:
@@ -298,6 +536,175 @@ def process_command(args):
                 print(f"[GET_TIME_RANGE] {e}", file=sys.stderr)
                 response = {"error": str(e)}
 
+        elif action == "GET_TIME_SERIES":
+            # GET_TIME_SERIES <racine> {"metrics": [...], "startTime", "endTime", "maxPoints"}
+            try:
+                dir_root = arg2
+                if not dir_root:
+                    raise ValueError("Directory path is required")
+                request = json.loads(arg3) if arg3 else {}
+                metrics = request.get("metrics") or []
+                if not metrics:
+                    raise ValueError("At least one metric is required")
+
+                pignat_dir = getDirectories(dir_root)[PIGNAT]
+                if os.path.exists(pignat_dir):
+                    pignat_data = get_source(PIGNAT, pignat_dir)
+                    kwargs = {}
+                    if request.get("maxPoints") is not None:
+                        kwargs["max_points"] = int(request["maxPoints"])
+                    result = pignat_data.get_time_series(
+                        metrics, request.get("startTime"), request.get("endTime"), **kwargs)
+                    response = {"result": result}
+                else:
+                    response = {"error": f"Pignat directory not found: {pignat_dir}"}
+            except Exception as e:
+                print(f"[GET_TIME_SERIES] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
+        elif action == "DATA_QUALITY":
+            # DATA_QUALITY <racine> [{"nominalPeriodS", "flatMinDurationS", "outPath"}]
+            try:
+                dir_root = arg2
+                if not dir_root:
+                    raise ValueError("Directory path is required")
+                options = json.loads(arg3) if arg3 else {}
+
+                pignat_dir = getDirectories(dir_root)[PIGNAT]
+                if os.path.exists(pignat_dir):
+                    pignat_data = get_source(PIGNAT, pignat_dir)
+                    kwargs = {}
+                    if options.get("nominalPeriodS") is not None:
+                        kwargs["nominal_period_s"] = float(options["nominalPeriodS"])
+                    if options.get("flatMinDurationS") is not None:
+                        kwargs["flat_min_duration_s"] = float(options["flatMinDurationS"])
+                    result = pignat_data.get_data_quality(**kwargs)
+
+                    out_path = options.get("outPath")
+                    if out_path:
+                        from openpyxl import Workbook
+                        wb = Workbook()
+                        wb.remove(wb.active)
+                        pignat_data.generate_data_quality_sheet(wb, result)
+                        wb.save(out_path)
+                        result["out_path"] = out_path
+                    response = {"result": result}
+                else:
+                    response = {"error": f"Pignat directory not found: {pignat_dir}"}
+            except Exception as e:
+                print(f"[DATA_QUALITY] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
+        elif action == "INTEGRATED_TOTALS":
+            # INTEGRATED_TOTALS <racine> [{"startTime", "endTime", "nominalPeriodS"}]
+            try:
+                dir_root = arg2
+                if not dir_root:
+                    raise ValueError("Directory path is required")
+                request = json.loads(arg3) if arg3 else {}
+
+                pignat_dir = getDirectories(dir_root)[PIGNAT]
+                if os.path.exists(pignat_dir):
+                    pignat_data = get_source(PIGNAT, pignat_dir)
+                    kwargs = {}
+                    if request.get("nominalPeriodS") is not None:
+                        kwargs["nominal_period_s"] = float(request["nominalPeriodS"])
+                    result = pignat_data.get_integrated_totals(
+                        request.get("startTime"), request.get("endTime"), **kwargs)
+                    response = {"result": result}
+                else:
+                    response = {"error": f"Pignat directory not found: {pignat_dir}"}
+            except Exception as e:
+                print(f"[INTEGRATED_TOTALS] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
+        elif action == "STEADY_STATE":
+            # STEADY_STATE <racine> [{"windowS", "minDurationS", "channels", "maxWindows"}]
+            try:
+                dir_root = arg2
+                if not dir_root:
+                    raise ValueError("Directory path is required")
+                request = json.loads(arg3) if arg3 else {}
+
+                pignat_dir = getDirectories(dir_root)[PIGNAT]
+                if os.path.exists(pignat_dir):
+                    pignat_data = get_source(PIGNAT, pignat_dir)
+                    kwargs = {}
+                    if request.get("windowS") is not None:
+                        kwargs["window_s"] = float(request["windowS"])
+                    if request.get("minDurationS") is not None:
+                        kwargs["min_duration_s"] = float(request["minDurationS"])
+                    if request.get("channels"):
+                        kwargs["channels"] = list(request["channels"])
+                    if request.get("maxWindows") is not None:
+                        kwargs["max_windows"] = int(request["maxWindows"])
+                    result = pignat_data.get_steady_states(**kwargs)
+                    response = {"result": result}
+                else:
+                    response = {"error": f"Pignat directory not found: {pignat_dir}"}
+            except Exception as e:
+                print(f"[STEADY_STATE] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
+        elif action == "INJECTION_CONDITIONS":
+            # INJECTION_CONDITIONS <racine> [{"lookbackS", "channels"}]
+            try:
+                dir_root = arg2
+                if not dir_root:
+                    raise ValueError("Directory path is required")
+                options = json.loads(arg3) if arg3 else {}
+                result = get_injection_conditions(dir_root) \
+                    .get_injection_conditions(**_injection_conditions_kwargs(options))
+                response = {"result": result}
+            except Exception as e:
+                print(f"[INJECTION_CONDITIONS] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
+        elif action == "GET_GC_SERIES":
+            # GET_GC_SERIES <racine> {"chimicalElements": [...], "maxPoints", "maxElements"}
+            try:
+                dir_root = arg2
+                if not dir_root:
+                    raise ValueError("Directory path is required")
+                request = json.loads(arg3) if arg3 else {}
+
+                chromo_online_dir = getDirectories(dir_root)[CHROMELEON_ONLINE]
+                if os.path.exists(chromo_online_dir):
+                    kwargs = {}
+                    if request.get("maxPoints") is not None:
+                        kwargs["max_points"] = int(request["maxPoints"])
+                    if request.get("maxElements") is not None:
+                        kwargs["max_elements"] = int(request["maxElements"])
+                    result = get_source(CHROMELEON_ONLINE, chromo_online_dir) \
+                        .get_relative_area_series(request.get("chimicalElements"), **kwargs)
+                    response = {"result": result}
+                else:
+                    response = {"error": f"GC-Online directory not found: {chromo_online_dir}"}
+            except Exception as e:
+                print(f"[GET_GC_SERIES] {e}", file=sys.stderr)
+                response = {"error": str(e)}
+
+        elif action == "COMPARE_EXPERIMENTS":
+            try:
+                import comparison
+                roots = json.loads(arg2) if arg2 else []
+                if not arg3:
+                    raise ValueError("Output path is required")
+                result = comparison.run_comparison(roots, arg3)
+                response = {"result": result}
+            except Exception as e:
+                print(f"[COMPARE_EXPERIMENTS] {e}", file=sys.stderr)
+                response = {"error": str(e), "traceback": traceback.format_exc()}
+
+        elif action in ("CATALOG_INDEX", "CATALOG_QUERY"):
+            try:
+                import catalog
+                result = catalog.handle_command(action, arg2)
+                response = {"result": result}
+            except Exception as e:
+                print(f"[{action}] {e}", file=sys.stderr)
+                response = {"error": str(e), "traceback": traceback.format_exc()}
+
         elif action == "GENERATE_EXCEL_TO_FILE":
             try:
                 metrics_wanted = json.loads(arg2)
@@ -309,7 +716,10 @@ def process_command(args):
                 masses = get_context_masses(dir_root)
                 wb = save_to_excel_with_charts(
                     dir_root, metrics_wanted, masses)
-                wb.save(out_path)
+                check_cancelled()
+                with span("wb_save"):
+                    wb.save(out_path)
+                report_progress("save", out_path)
                 response = {"result": out_path}
             except Exception as e:
                 response = {"error": str(e), "traceback": traceback.format_exc()}
@@ -323,45 +733,37 @@ def process_command(args):
 
 
 def run_interactive_mode():
-    """Run in interactive mode, processing commands from stdin"""
+    """Run in interactive mode, processing commands from stdin (voir protocol.py)"""
     print("Python data processor started in interactive mode", file=sys.stderr)
     sys.stderr.flush()
-    
-    while True:
-        try:
-            # Lire une ligne de commande
-            line = sys.stdin.readline().strip()
-            
-            if not line:
-                # EOF, sortir proprement
-                break
-                
-            # Diviser par tabulations (comme dans le code Rust)
-            args = line.split('\t')
-            
-            # Traiter la commande
-            response = process_command(args)
-            
-            # Renvoyer la réponse
-            print(json.dumps(response, ensure_ascii=False, default=str), flush=True)
-            print("<<<END_RESPONSE>>>", flush=True)
-            
-        except EOFError:
-            break
-        except Exception as e:
-            print(f"[INTERACTIVE] Error: {e}", file=sys.stderr)
-            print(traceback.format_exc(), file=sys.stderr)
-            error_response = {"error": str(e), "traceback": traceback.format_exc()}
-            print(json.dumps(error_response, ensure_ascii=False, default=str), flush=True)
-            print("<<<END_RESPONSE>>>", flush=True)
+
+    InteractiveServer(process_command, out=sys.stdout).serve(sys.stdin)
 
 
 if __name__ == "__main__":
+    # Nécessaire pour le pool de processus du mode --batch dans l'exécutable PyInstaller
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # Vérifier si on est en mode interactif
     if len(sys.argv) > 1 and sys.argv[1] == "--interactive":
         run_interactive_mode()
+    elif len(sys.argv) > 1 and sys.argv[1] in ("--batch", "--compare", "--catalog"):
+        if sys.argv[1] == "--batch":
+            import batch as cli
+        elif sys.argv[1] == "--compare":
+            import comparison as cli
+        else:
+            import catalog as cli
+        try:
+            response = {"result": cli.main(sys.argv[2:])}
+        except Exception as e:
+            print(f"[{sys.argv[1][2:].upper()}] {e}", file=sys.stderr)
+            response = {"error": str(e), "traceback": traceback.format_exc()}
+        print(json.dumps(response, ensure_ascii=False, default=str), flush=True)
     else:
         # Mode traditionnel (backward compatibility)
         args = sys.argv[1:] if len(sys.argv) > 1 else []
-        response = process_command(args)
+        with request_scope(RequestContext(None)):
+            response = process_command(args)
         print(json.dumps(response, ensure_ascii=False, default=str), flush=True)
@@ -116,6 +116,9 @@ hiddenimports += [
     'chromeleon_offline', 
     'chromeleon_online_permanent',
     'resume',
+    'batch',
+    'comparison',
+    'catalog',
     
     # Autres dépendances pandas souvent manquées
     'six',
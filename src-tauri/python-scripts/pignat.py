@@ -1,5 +1,7 @@
 import os
 import sys
+import threading
+import numpy as np
 import pandas as pd
 import traceback
 from openpyxl import Workbook
@@ -12,7 +14,11 @@ from openpyxl.chart.axis import ChartLines
 from openpyxl.chart.layout import Layout, ManualLayout
 
 from utils.pignat.pignat_constants import (
+    DATE,
     TIME,
+    MILLISECOND,
+    DATA_QUALITY_SHEET_TITLE,
+    FLAT_MIN_DURATION_S,
     TT301,
     TT302,
     TT303,
@@ -32,9 +38,35 @@ from utils.pignat.pignat_constants import (
     PRESSURE_PYROLYSEUR_DISPLAY_TITLE,
     PRESSURE_POMPE_DISPLAY_TITLE,
     DELTA_PRESSURE_DISPLAY_TITLE,
-    DISPLAY_NAME_MAPPING
+    DISPLAY_NAME_MAPPING,
+    DELTA_PRESSURE,
+    METRIC_SPECS,
+    DERIVED_CHANNELS,
+    INTEGRATED_TOTALS,
+    INTEGRATED_TOTALS_DISPLAY_TITLE,
+    INTEGRATED_CHANNELS,
+    GAP_TOLERANCE,
+    STEADY_STATE_CHANNELS,
+    STEADY_STATE_WINDOW_S,
+    MAX_STEADY_WINDOWS,
+    CONDITION_CHANNELS,
+    INJECTION_LOOKBACK_S,
+    RESAMPLE_PERIOD_S,
 )
+from utils.downsampling import min_max_indices
+from utils.time_utils import parse_injection_timestamp
+from utils.resampling import AGGREGATES, resample_bins
+from utils.integration import integrate
+from utils.alignment import lookback_means
+from utils.pignat.data_quality import compute_data_quality
+from utils.pignat.derived_channels import evaluate_channel
+from utils.pignat.steady_state import find_steady_windows
 from utils.chart_styles import get_table_title_font, get_table_header_font, get_table_data_font, apply_line_chart_styles
+from profiling import span
+from protocol import report_progress
+
+# Budget de points par défaut d'une série de GET_TIME_SERIES
+DEFAULT_MAX_POINTS = 2000
 
 
 class PignatData:
@@ -76,7 +108,8 @@ class PignatData:
 
         for encoding in encodings_to_try:
             try:
-                self.data_frame = pd.read_csv(self.first_file, sep=separator, encoding=encoding)
+                with span("file_read"):
+                    self.data_frame = pd.read_csv(self.first_file, sep=separator, encoding=encoding)
                 break
             except (UnicodeDecodeError, pd.errors.EmptyDataError, pd.errors.ParserError):
                 if encoding == encodings_to_try[-1]:
@@ -85,13 +118,126 @@ class PignatData:
 
         self.columns = self.data_frame.columns.tolist()
         self.missing_columns = set(DATA_REQUIRED) - set(self.columns)
+        # Caches remplis à la demande ; l'instance est partagée entre threads
+        # (cache de main.get_source), d'où le verrou des initialisations
+        self._lock = threading.RLock()
+        # Horodatages parsés à la demande (voir _parse_timestamps)
+        self._timestamps = None
+        self._timestamps_have_date = False
+        self._time_bounds = None
+        # Voies calculées déjà évaluées (voir _derived_channel)
+        self._derived = {}
 
     def _select_columns(self, columns: list[str]) -> pd.DataFrame:
-        missing_columns = [col for col in columns if col not in self.data_frame.columns]
+        """Colonnes du CSV ou voies calculées (DERIVED_CHANNELS), dans l'ordre demandé."""
+        raw_columns = [
+            source for col in columns
+            for source in (DERIVED_CHANNELS[col]['inputs'] if col in DERIVED_CHANNELS else [col])
+        ]
+        missing_columns = [col for col in dict.fromkeys(raw_columns) if col not in self.data_frame.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
 
-        return self.data_frame[columns]
+        if not any(col in DERIVED_CHANNELS for col in columns):
+            return self.data_frame[columns]
+        return pd.DataFrame({
+            col: (pd.Series(self._derived_channel(col), index=self.data_frame.index)
+                  if col in DERIVED_CHANNELS else self.data_frame[col])
+            for col in columns
+        })
+
+    def _derived_channel(self, name: str) -> np.ndarray:
+        """
+        Voie calculée sur tout le journal, évaluée au premier appel puis gardée
+        pour les métriques, séries et rééchantillonnages suivants.
+        """
+        values = self._derived.get(name)
+        if values is not None:
+            return values
+        with self._lock:
+            if name not in self._derived:
+                inputs = [self._channel_values(col) for col in DERIVED_CHANNELS[name]['inputs']]
+                seconds = None
+                if DERIVED_CHANNELS[name]['op'] == 'time_integral':
+                    timestamps, _ = self._parse_timestamps()
+                    if self._time_bounds is not None:
+                        seconds = (timestamps - self._time_bounds[0]) / np.timedelta64(1, 's')
+                with span("derived_channel"):
+                    self._derived[name] = evaluate_channel(name, inputs, seconds)
+            return self._derived[name]
+
+    def _has_channel(self, name: str) -> bool:
+        """Colonne du CSV, ou voie calculée dont toutes les entrées sont présentes."""
+        if name in DERIVED_CHANNELS:
+            return all(col in self.columns for col in DERIVED_CHANNELS[name]['inputs'])
+        return name in self.columns
+
+    def _channel_values(self, name: str) -> np.ndarray:
+        """Valeurs float64 d'une colonne ou d'une voie calculée (NaN si non numérique)."""
+        if name in DERIVED_CHANNELS:
+            return self._derived_channel(name)
+        return pd.to_numeric(self.data_frame[name], errors='coerce').to_numpy(dtype="float64", na_value=np.nan)
+
+    def _time_mask(self, start_time=None, end_time=None) -> np.ndarray:
+        """
+        Masque booléen des lignes du journal comprises dans la fenêtre
+        [start_time, end_time].
+
+        Les bornes datées sont comparées aux horodatages complets (fenêtres de
+        plusieurs jours) ; l'heure seule n'est comparée que si le journal n'a
+        pas de date ou si une borne n'en porte pas. Une fenêtre en heures
+        seules dont le début suit la fin traverse minuit.
+
+        Raises:
+            ValueError: Si une borne est illisible
+        """
+        n_rows = len(self.data_frame)
+        if start_time is None and end_time is None:
+            return np.ones(n_rows, dtype=bool)
+
+        timestamps, has_date = self._parse_timestamps()
+        if self._time_bounds is None:
+            # Aucune heure lisible : comparaison des libellés bruts
+            times = self.data_frame[TIME].astype(str)
+            mask = np.ones(n_rows, dtype=bool)
+            if start_time is not None:
+                mask &= (times >= str(start_time)).to_numpy()
+            if end_time is not None:
+                mask &= (times <= str(end_time)).to_numpy()
+            return mask
+
+        bounds = []
+        for value in (start_time, end_time):
+            parsed = None if value is None else parse_injection_timestamp(value)
+            if value is not None and pd.isna(parsed):
+                raise ValueError(f"Borne de fenêtre de temps illisible: {value}")
+            bounds.append(None if parsed is None else parsed.to_datetime64().astype("datetime64[ns]"))
+
+        # Une borne sans date est ancrée au 1970-01-01 (voir parse_injection_timestamp)
+        time_of_day = not has_date or any(
+            b is not None and b.astype("datetime64[D]") == np.datetime64(0, 'D') for b in bounds)
+        keys = timestamps
+        if time_of_day:
+            keys = timestamps - timestamps.astype("datetime64[D]")
+            bounds = [None if b is None else b - b.astype("datetime64[D]") for b in bounds]
+
+        valid = ~np.isnat(keys)
+        after = valid if bounds[0] is None else valid & (keys >= bounds[0])
+        before = valid if bounds[1] is None else valid & (keys <= bounds[1])
+        if time_of_day and bounds[0] is not None and bounds[1] is not None and bounds[0] > bounds[1]:
+            return after | before
+        return after & before
+
+    def _row_time_label(self, row: int) -> str:
+        """
+        Instant d'une ligne utilisable comme borne de timeRange : date et heure
+        si le journal est daté (sans ambiguïté sur plusieurs jours), sinon la
+        valeur brute de la colonne Time.
+        """
+        timestamps, has_date = self._parse_timestamps()
+        if has_date and not np.isnat(timestamps[row]):
+            return pd.Timestamp(timestamps[row]).strftime('%Y-%m-%d %H:%M:%S')
+        return str(self.data_frame[TIME].iloc[row])
 
     def _filter_by_time_range(self, df: pd.DataFrame, start_time=None, end_time=None) -> pd.DataFrame:
         if start_time is None and end_time is None:
@@ -100,32 +246,7 @@ class PignatData:
         if TIME not in df.columns:
             return df
 
-        sample_timestamp = df[TIME].iloc[0] if len(df) > 0 else None
-
-        if sample_timestamp and ':' in str(sample_timestamp) and len(str(sample_timestamp).split()) == 1:
-            mask = pd.Series([True] * len(df))
-
-            if start_time is not None:
-                try:
-                    start_time_only = str(start_time).split(' ')[1] if ' ' in str(start_time) else str(start_time)
-                    mask &= (df[TIME] >= start_time_only)
-                except:
-                    pass
-
-            if end_time is not None:
-                try:
-                    end_time_only = str(end_time).split(' ')[1] if ' ' in str(end_time) else str(end_time)
-                    mask &= (df[TIME] <= end_time_only)
-                except:
-                    pass
-        else:
-            mask = pd.Series([True] * len(df))
-            if start_time is not None:
-                mask &= (df[TIME] >= start_time)
-            if end_time is not None:
-                mask &= (df[TIME] <= end_time)
-
-        filtered_df = df[mask]
+        filtered_df = df[self._time_mask(start_time, end_time)]
         return filtered_df
 
 
@@ -144,65 +265,110 @@ class PignatData:
             graphs.append(graph_dict)
         return graphs
 
+    @staticmethod
+    def _parse_distinct(values: pd.Series, parse) -> np.ndarray:
+        """
+        Applique `parse` aux seules valeurs distinctes de `values` (un journal
+        Pignat répète les mêmes dates et heures) puis redistribue le résultat.
+        """
+        codes, uniques = pd.factorize(values)
+        parsed = parse(pd.Series(uniques, dtype=object).astype(str)).to_numpy()
+        # Code -1 (valeur manquante) -> dernier élément: NaT
+        return np.append(parsed, np.array([np.datetime64("NaT")], dtype=parsed.dtype))[codes]
+
+    def _parse_timestamps(self) -> tuple[np.ndarray, bool]:
+        """
+        Horodatages (datetime64) des lignes, parsés une seule fois par instance,
+        avec leurs bornes.
+
+        La colonne Time contient soit l'heure seule (HH:MM:SS, la date étant
+        alors dans la colonne Date), soit la date et l'heure.
+
+        Returns:
+            (tableau datetime64[ns] avec NaT si illisible, True si les
+            horodatages portent une vraie date ; sinon heures seules ancrées au
+            1970-01-01)
+        """
+        if self._timestamps is not None:
+            return self._timestamps, self._timestamps_have_date
+        with self._lock:
+            if self._timestamps is not None:
+                return self._timestamps, self._timestamps_have_date
+
+            times = self.data_frame[TIME]
+            sample = times.dropna()
+            sample = str(sample.iloc[0]) if len(sample) else ""
+            has_date = True
+            if ' ' in sample:
+                timestamps = self._parse_distinct(
+                    times, lambda v: pd.to_datetime(v, errors='coerce', format='mixed'))
+            else:
+                offsets = self._parse_distinct(
+                    times, lambda v: pd.to_timedelta(v, errors='coerce').astype("timedelta64[ns]"))
+                if DATE in self.columns:
+                    dates = self._parse_distinct(
+                        self.data_frame[DATE], lambda v: pd.to_datetime(v, errors='coerce', format='mixed'))
+                else:
+                    dates = np.zeros(len(times), dtype="datetime64[ns]")
+                    has_date = False
+                timestamps = dates.astype("datetime64[ns]") + offsets.astype("timedelta64[ns]")
+
+            timestamps = timestamps.astype("datetime64[ns]")
+            valid = timestamps[~np.isnat(timestamps)]
+            self._time_bounds = (valid.min(), valid.max()) if len(valid) else None
+            self._timestamps_have_date = has_date
+            # Publié en dernier : un lecteur sans verrou voit aussi les bornes
+            self._timestamps = timestamps
+            return timestamps, has_date
+
     def get_time_range(self) -> dict:
         if TIME not in self.columns:
             raise ValueError(f"Column {TIME} not found in data")
 
-        time_column = self.data_frame[TIME]
-        all_times = sorted(time_column.dropna().unique().tolist())
-
-        if not all_times:
+        empty = {
+            "min_time": None,
+            "max_time": None,
+            "unique_times": [],
+            "min_timestamp": None,
+            "max_timestamp": None,
+            "unique_timestamps": [],
+        }
+
+        _, has_date = self._parse_timestamps()
+        if self._time_bounds is None:
+            # Heures illisibles: échantillonnage des valeurs distinctes (triées)
+            all_times = np.unique(self.data_frame[TIME].dropna().astype(str).to_numpy())
+            if len(all_times) == 0:
+                return empty
+            step = max(1, len(all_times) // 100)
+            sampled = [t.split(' ')[-1] for t in all_times[::step].tolist()]
             return {
-                "min_time": None,
-                "max_time": None,
-                "unique_times": []
+                **empty,
+                "min_time": all_times[0].split(' ')[-1],
+                "max_time": all_times[-1].split(' ')[-1],
+                "unique_times": sampled,
             }
 
-        min_time = all_times[0]
-        max_time = all_times[-1]
-
-        # Fonction helper pour extraire uniquement l'heure
-        def extract_time_only(timestamp_str):
-            """Extrait uniquement l'heure au format HH:MM:SS depuis un timestamp"""
-            timestamp_str = str(timestamp_str)
-            # Si le format contient déjà un espace (YYYY-MM-DD HH:MM:SS), extraire la partie heure
-            if ' ' in timestamp_str:
-                return timestamp_str.split(' ')[1]
-            # Sinon, c'est déjà au format HH:MM:SS
-            return timestamp_str
-
-        try:
-            min_dt = pd.to_datetime(min_time)
-            max_dt = pd.to_datetime(max_time)
-            duration_minutes = (max_dt - min_dt).total_seconds() / 60
-
-            target_points = 72
-            delta_minutes = max(1, int(duration_minutes / target_points))
-            delta = pd.Timedelta(minutes=delta_minutes)
+        min_dt, max_dt = (pd.Timestamp(bound) for bound in self._time_bounds)
+        duration_minutes = (max_dt - min_dt).total_seconds() / 60
 
-            step_times = []
-            current_time = min_dt
-            while current_time <= max_dt:
-                # Retourner uniquement l'heure (HH:MM:SS)
-                step_times.append(current_time.strftime('%H:%M:%S'))
-                current_time += delta
+        target_points = 72
+        delta_minutes = max(1, int(duration_minutes / target_points))
+        steps = pd.date_range(min_dt, max_dt, freq=pd.Timedelta(minutes=delta_minutes))
 
-            return {
-                "min_time": extract_time_only(min_time),
-                "max_time": extract_time_only(max_time),
-                "unique_times": step_times
-            }
-
-        except Exception:
-            step = max(1, len(all_times) // 100)
-            sampled_times = all_times[::step]
-            # Extraire uniquement l'heure pour chaque timestamp
-            sampled_times_only = [extract_time_only(t) for t in sampled_times]
-            return {
-                "min_time": extract_time_only(min_time),
-                "max_time": extract_time_only(max_time),
-                "unique_times": sampled_times_only
-            }
+        result = {
+            "min_time": min_dt.strftime('%H:%M:%S'),
+            "max_time": max_dt.strftime('%H:%M:%S'),
+            "unique_times": steps.strftime('%H:%M:%S').tolist(),
+            "min_timestamp": None,
+            "max_timestamp": None,
+            "unique_timestamps": [],
+        }
+        if has_date:
+            result["min_timestamp"] = min_dt.strftime('%Y-%m-%d %H:%M:%S')
+            result["max_timestamp"] = max_dt.strftime('%Y-%m-%d %H:%M:%S')
+            result["unique_timestamps"] = steps.strftime('%Y-%m-%d %H:%M:%S').tolist()
+        return result
 
 
     def report_missing_per_column(self) -> pd.Series:
@@ -210,13 +376,334 @@ class PignatData:
 
     def report_missing_per_row(self) -> pd.DataFrame:
         df = self.data_frame
-        count_na = df.isna().sum(axis=1)
-        cols_na = df.isna().apply(lambda row: list(row[row].index), axis=1)
+        mask = df.isna().to_numpy()
+        count_na = mask.sum(axis=1)
+        rows, cols = np.nonzero(mask)
+        names = np.asarray(df.columns, dtype=object)[cols]
+        cols_na = [part.tolist() for part in np.split(names, np.cumsum(count_na)[:-1])]
         return pd.DataFrame({
             'n_missing': count_na,
             'cols_missing': cols_na
         }, index=df.index)
 
+    def get_data_quality(self, nominal_period_s: float | None = None,
+                         flat_min_duration_s: float = FLAT_MIN_DURATION_S) -> dict:
+        """
+        Rapport qualité du journal (commande DATA_QUALITY) : valeurs manquantes
+        par capteur, trous d'horodatage, capteurs figés et valeurs hors plage.
+
+        Args:
+            nominal_period_s: Période d'échantillonnage attendue (défaut: médiane des écarts)
+            flat_min_duration_s: Durée minimale (s) d'une valeur figée signalée
+
+        Returns:
+            Voir utils.pignat.data_quality.compute_data_quality
+        """
+        sensors = [
+            col for col in self.columns
+            if col not in (DATE, TIME, MILLISECOND) and pd.api.types.is_numeric_dtype(self.data_frame[col])
+        ]
+        values = self.data_frame[sensors].to_numpy(dtype="float64", na_value=np.nan)
+        timestamps, has_date = self._parse_timestamps() if TIME in self.columns else (None, False)
+        return compute_data_quality(
+            values, sensors, timestamps, has_date,
+            nominal_period_s=nominal_period_s,
+            flat_min_duration_s=flat_min_duration_s,
+        )
+
+    def generate_data_quality_sheet(self, wb: Workbook, quality: dict | None = None,
+                                    sheet_name: str = DATA_QUALITY_SHEET_TITLE) -> Workbook:
+        """Ajoute la feuille "Data quality" (voir get_data_quality) au classeur."""
+        if quality is None:
+            quality = self.get_data_quality()
+
+        ws = wb.create_sheet(title=sheet_name)
+        title_font = get_table_title_font()
+        header_font = get_table_header_font()
+        data_font = get_table_data_font()
+        thin_border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+
+        def write_table(row: int, title: str, headers: list[str], rows: list[list]) -> int:
+            ws.cell(row=row, column=1, value=title).font = title_font
+            for j, header in enumerate(headers, start=1):
+                cell = ws.cell(row=row + 1, column=j, value=header)
+                cell.font = header_font
+                cell.border = thin_border
+            for i, values in enumerate(rows, start=row + 2):
+                for j, value in enumerate(values, start=1):
+                    cell = ws.cell(row=i, column=j, value=value)
+                    cell.font = data_font
+                    cell.border = thin_border
+            return row + len(rows) + 4
+
+        sampling = quality["sampling"]
+        row = write_table(1, "Enregistrement", ["Indicateur", "Valeur"], [
+            ["Lignes", quality["rows"]],
+            ["Début", quality["start"]],
+            ["Fin", quality["end"]],
+            ["Période nominale (s)", sampling["nominal_period_s"]],
+            ["Horodatages illisibles", sampling["invalid_timestamps"]],
+            ["Retours en arrière", sampling["backward_steps"]],
+            ["Trous d'enregistrement", sampling["gaps"]["count"]],
+            ["Échantillons manquants", sampling["gaps"]["missing_samples"]],
+        ])
+
+        if sampling["gaps"]["spans"]:
+            row = write_table(row, "Plus longs trous d'enregistrement",
+                              ["Début", "Fin", "Durée (s)", "Échantillons manquants"],
+                              [[g["start"], g["end"], g["duration_s"], g["missing_samples"]]
+                               for g in sampling["gaps"]["spans"]])
+
+        sensor_rows = []
+        for sensor, report in quality["sensors"].items():
+            longest_missing = report["longest_missing_run"]
+            out_of_range = report["out_of_range"]
+            sensor_rows.append([
+                sensor,
+                report["nan_count"],
+                round(report["nan_ratio"] * 100, 2),
+                longest_missing["rows"] if longest_missing else 0,
+                "Oui" if report["constant"] else "Non",
+                report["flat_spans"]["count"],
+                report["flat_spans"]["longest_s"],
+                out_of_range["count"] if out_of_range else None,
+            ])
+        write_table(row, "Capteurs", [
+            "Capteur", "Valeurs manquantes", "% manquant", "Plus longue séquence manquante",
+            "Constant", "Périodes figées", "Plus longue période figée (s)", "Hors plage",
+        ], sensor_rows)
+
+        ws.column_dimensions['A'].width = 28
+        for letter in "BCDEFGH":
+            ws.column_dimensions[letter].width = 18
+        report_progress("sheet", ws.title, rows=ws.max_row)
+        return wb
+
+
+    def get_integrated_totals(self, start_time=None, end_time=None,
+                              nominal_period_s: float | None = None) -> dict:
+        """
+        Totaux intégrés sur la fenêtre de temps (commande INTEGRATED_TOTALS) :
+        masse alimentée, énergie des inducteurs... (voir INTEGRATED_CHANNELS),
+        par la méthode des trapèzes sur les horodatages réels.
+
+        Les écarts de plus de GAP_TOLERANCE × la période nominale sont des
+        trous d'enregistrement : ils ne sont pas intégrés et la moyenne porte
+        sur la durée effectivement couverte.
+
+        Args:
+            start_time, end_time: Fenêtre de temps optionnelle (même format que
+                                  les timeRange du rapport)
+            nominal_period_s: Période d'échantillonnage attendue (défaut: médiane des écarts)
+
+        Returns:
+            {"start", "end", "rows", "duration_h", "nominal_period_s",
+            "gaps": {"count", "duration_h"}, "totals": [{"channel", "label",
+            "unit", "total", "mean", "mean_unit", "covered_h"}], "missing": [voies absentes]}
+
+        Raises:
+            ValueError: Si la colonne Time est absente
+        """
+        if TIME not in self.columns:
+            raise ValueError(f"Column {TIME} not found in data")
+
+        rows = np.flatnonzero(self._time_mask(start_time, end_time))
+        timestamps, _ = self._parse_timestamps()
+        selected = timestamps[rows]
+        valid = selected[~np.isnat(selected)]
+        seconds = (selected - valid.min()) / np.timedelta64(1, 's') if len(valid) else np.full(len(rows), np.nan)
+
+        steps = np.diff(seconds)
+        finite = np.isfinite(steps) & (steps > 0)
+        if nominal_period_s is None:
+            nominal_period_s = float(np.median(steps[finite])) if finite.any() else None
+        max_step_s = GAP_TOLERANCE * nominal_period_s if nominal_period_s else None
+        gaps = finite & (steps > max_step_s) if max_step_s else np.zeros(len(steps), dtype=bool)
+
+        totals, missing = [], []
+        for spec in INTEGRATED_CHANNELS:
+            channel = spec['channel']
+            if not self._has_channel(channel):
+                missing.append(channel)
+                continue
+            integrated = integrate(self._channel_values(channel)[rows], seconds, max_step_s)
+            totals.append({
+                "channel": channel,
+                "label": spec['label'],
+                "unit": spec['unit'],
+                "total": integrated["total"],
+                "mean": integrated["mean"],
+                "mean_unit": spec['mean_unit'],
+                "covered_h": integrated["covered_h"],
+            })
+
+        return {
+            "start": self._row_time_label(rows[0]) if len(rows) else None,
+            "end": self._row_time_label(rows[-1]) if len(rows) else None,
+            "rows": int(len(rows)),
+            "duration_h": float(np.nanmax(seconds)) / 3600.0 if len(valid) else 0.0,
+            "nominal_period_s": nominal_period_s,
+            "gaps": {"count": int(gaps.sum()), "duration_h": float(steps[gaps].sum()) / 3600.0},
+            "totals": totals,
+            "missing": missing,
+        }
+
+    def get_steady_states(self, window_s: float = STEADY_STATE_WINDOW_S,
+                          min_duration_s: float | None = None,
+                          channels: list[str] | None = None,
+                          max_windows: int = MAX_STEADY_WINDOWS) -> dict:
+        """
+        Périodes de régime stabilisé (commande STEADY_STATE), candidates pour
+        pré-remplir les timeRange des métriques.
+
+        Args:
+            window_s: Durée (s) de la fenêtre glissante de moyenne et variance
+            min_duration_s: Durée minimale d'une période (défaut: window_s)
+            channels: Voies surveillées (défaut: STEADY_STATE_CHANNELS) ; les
+                      voies absentes ou sans valeur sont ignorées
+            max_windows: Nombre maximal de périodes retournées (les plus longues)
+
+        Returns:
+            {"window_s", "min_duration_s", "nominal_period_s", "channels",
+            "ignored", "stable_ratio", "windows": [{"timeRange": {"startTime",
+            "endTime"}, "duration_s", "rows", "channels": {voie: {"mean", "std"}}}]}
+            par ordre chronologique
+
+        Raises:
+            ValueError: Si window_s n'est pas positif, si la colonne Time est
+                        absente ou si aucune voie n'est utilisable
+        """
+        if window_s <= 0:
+            raise ValueError(f"window_s doit être positif (reçu: {window_s})")
+        if TIME not in self.columns:
+            raise ValueError(f"Column {TIME} not found in data")
+        if min_duration_s is None:
+            min_duration_s = window_s
+
+        used, ignored, columns = [], [], []
+        for channel in channels or STEADY_STATE_CHANNELS:
+            values = self._channel_values(channel) if self._has_channel(channel) else None
+            if values is None or np.isnan(values).all():
+                ignored.append(channel)
+                continue
+            used.append(channel)
+            columns.append(values)
+        if not used:
+            raise ValueError(f"Aucune voie utilisable pour la détection de régime stabilisé: {ignored}")
+
+        timestamps, _ = self._parse_timestamps()
+        if self._time_bounds is not None:
+            seconds = (timestamps - self._time_bounds[0]) / np.timedelta64(1, 's')
+        else:
+            seconds = np.full(len(timestamps), np.nan)
+        with span("steady_state"):
+            detected = find_steady_windows(np.column_stack(columns), used, seconds, window_s, min_duration_s)
+
+        windows = detected["windows"]
+        longest = sorted(range(len(windows)), key=lambda i: -windows[i]["duration_s"])[:max_windows]
+        selected = []
+        for i in sorted(longest):
+            window = windows[i]
+            selected.append({
+                # Date et heure si le journal est daté : la fenêtre ne désigne qu'un seul jour
+                "timeRange": {
+                    "startTime": self._row_time_label(window["start_row"]),
+                    "endTime": self._row_time_label(window["end_row"]),
+                },
+                "duration_s": window["duration_s"],
+                "rows": window["rows"],
+                "channels": window["channels"],
+            })
+        return {
+            "window_s": window_s,
+            "min_duration_s": min_duration_s,
+            "nominal_period_s": detected["nominal_period_s"],
+            "channels": used,
+            "ignored": ignored,
+            "stable_ratio": detected["stable_ratio"],
+            "windows": selected,
+        }
+
+    def get_conditions_at(self, event_times: np.ndarray, lookback_s: float = INJECTION_LOOKBACK_S,
+                          channels: list[str] | None = None) -> dict:
+        """
+        Conditions opératoires (moyenne des voies sur les lookback_s secondes
+        précédant chaque instant), pour rattacher le journal à des injections GC.
+
+        Les instants datés sont utilisés tels quels s'ils recouvrent le
+        journal ; sinon (instants sans date, ou d'un autre jour) seule l'heure
+        compte : elle est placée le jour du début du journal, ou le lendemain
+        si elle précède son heure de début (essai passant minuit).
+
+        Args:
+            event_times: Instants datetime64 (NaT si illisibles)
+            lookback_s: Durée (s) de la fenêtre de moyenne
+            channels: Voies voulues (défaut: CONDITION_CHANNELS) ; les voies
+                      absentes sont ignorées
+
+        Returns:
+            {"mode": "datetime" ou "time_of_day", "channels", "missing",
+            "values": tableau (n_instants, n_voies), "samples": lignes du
+            journal dans chaque fenêtre}
+
+        Raises:
+            ValueError: Si lookback_s n'est pas positif ou si la colonne Time est absente
+        """
+        if lookback_s <= 0:
+            raise ValueError(f"lookback_s doit être positif (reçu: {lookback_s})")
+        if TIME not in self.columns:
+            raise ValueError(f"Column {TIME} not found in data")
+
+        wanted = channels or CONDITION_CHANNELS
+        used = [c for c in wanted if self._has_channel(c)]
+        missing = [c for c in wanted if not self._has_channel(c)]
+
+        timestamps, _ = self._parse_timestamps()
+        event_times = np.asarray(event_times, dtype="datetime64[ns]")
+        lookback = np.timedelta64(int(lookback_s * 1e9), 'ns')
+        mode = "time_of_day"
+        if self._time_bounds is not None:
+            start, end = self._time_bounds
+            dated = event_times[~np.isnat(event_times)]
+            if len(dated) and ((dated >= start - lookback) & (dated <= end)).any():
+                mode = "datetime"
+            else:
+                day = start.astype("datetime64[D]")
+                offsets = event_times - event_times.astype("datetime64[D]")
+                event_times = day + offsets
+                event_times = np.where(event_times < start - lookback,
+                                       event_times + np.timedelta64(1, 'D'), event_times)
+
+        valid = ~np.isnat(timestamps)
+        keys = timestamps[valid].astype("int64")
+        rows = np.flatnonzero(valid)
+        if len(keys) > 1 and (np.diff(keys) < 0).any():
+            order = np.argsort(keys, kind="stable")
+            keys, rows = keys[order], rows[order]
+
+        values = np.column_stack([self._channel_values(c)[rows] for c in used]) if used \
+            else np.empty((len(rows), 0))
+        known = ~np.isnat(event_times)
+        means = np.full((len(event_times), len(used)), np.nan)
+        samples = np.zeros(len(event_times), dtype=np.int64)
+        with span("asof_join"):
+            means[known], samples[known] = lookback_means(
+                keys, values, event_times[known].astype("int64"), lookback.astype("int64"))
+        return {"mode": mode, "channels": used, "missing": missing, "values": means, "samples": samples}
+
+    @staticmethod
+    def _integrated_totals_table(totals: dict) -> pd.DataFrame:
+        """Tableau "Totaux intégrés" de la feuille Pignat."""
+        return pd.DataFrame(
+            [[t["label"], t["channel"], t["total"], t["unit"], t["mean"], t["mean_unit"],
+              round(t["covered_h"], 3)] for t in totals["totals"]],
+            columns=["Grandeur", "Voie", "Total", "Unité", "Moyenne", "Unité moyenne", "Durée intégrée (h)"],
+        )
 
     def _get_temperature_over_time(self, start_time=None, end_time=None) -> pd.DataFrame:
         cols = [TIME, TT301, TT302, TT303, TT206]
@@ -239,12 +726,9 @@ class PignatData:
         return self._filter_by_time_range(df, start_time, end_time)
 
     def _get_delta_pression_over_time(self, start_time=None, end_time=None) -> pd.DataFrame:
-        cols = [TIME, PI177, PT230]
-        df_sel = self._select_columns(cols).copy()
-        df_sel = self._filter_by_time_range(df_sel, start_time, end_time)
-        delta_name = f"Delta_Pression_{PI177}_minus_{PT230}"
-        df_sel[delta_name] = df_sel[PI177] - df_sel[PT230]
-        return df_sel.drop(columns=[PI177, PT230])
+        cols = [TIME, DELTA_PRESSURE]
+        df = self._select_columns(cols)
+        return self._filter_by_time_range(df, start_time, end_time)
 
 
     def get_json_metrics(self, metric: str, start_time=None, end_time=None):
@@ -307,13 +791,173 @@ class PignatData:
                     "name": DELTA_PRESSURE_DISPLAY_TITLE,
                     "data": self._get_delta_pression_over_time(start_time, end_time),
                     "x_axis": TIME,
-                    "y_axis": [f"Delta_Pression_{PI177}_minus_{PT230}"]
+                    "y_axis": [DELTA_PRESSURE]
+                }
+            elif metric in METRIC_SPECS:
+                # Métrique déclarée seulement dans les constantes (voies calculées...)
+                spec = self._metric_spec(metric)
+                df = self._select_columns([TIME] + spec['y_axis'])
+                return {
+                    "name": spec['name'],
+                    "data": self._filter_by_time_range(df, start_time, end_time),
+                    "x_axis": TIME,
+                    "y_axis": spec['y_axis']
                 }
             else:
                 raise ValueError(f"Metric '{metric}' is not recognized.")
         except Exception:
             raise
 
+    def get_time_series(self, metrics: list[str], start_time=None, end_time=None,
+                        max_points: int = DEFAULT_MAX_POINTS) -> dict:
+        """
+        Séries temporelles des métriques, réduites pour l'affichage (commande
+        GET_TIME_SERIES).
+
+        Args:
+            metrics: Noms internes des métriques (voir GRAPHS)
+            start_time, end_time: Fenêtre de temps optionnelle (même format que
+                                  les timeRange du rapport)
+            max_points: Nombre maximal de points par métrique
+
+        Returns:
+            {métrique: {"name", "x_axis", "y_axis", "total_points", "time": [...],
+            "series": {colonne: [valeurs ou None]}}}, en colonnes plutôt que
+            ligne par ligne
+
+        Raises:
+            ValueError: Si max_points < 2, ou si une métrique est inconnue ou
+                        sans ses colonnes
+        """
+        if max_points < 2:
+            raise ValueError(f"max_points doit être au moins 2 (reçu: {max_points})")
+
+        result = {}
+        for metric in metrics:
+            spec = self.get_json_metrics(metric, start_time, end_time)
+            df = spec["data"]
+            values = np.column_stack([
+                pd.to_numeric(df[col], errors='coerce').to_numpy(dtype="float64")
+                for col in spec["y_axis"]
+            ]) if len(df) else np.empty((0, len(spec["y_axis"])))
+            keep = min_max_indices(values, max_points)
+            kept = values[keep]
+
+            result[metric] = {
+                "name": spec["name"],
+                "x_axis": spec["x_axis"],
+                "y_axis": spec["y_axis"],
+                "total_points": len(df),
+                "time": df[spec["x_axis"]].astype(str).to_numpy()[keep].tolist(),
+                "series": {
+                    col: [None if v != v else v for v in kept[:, i].tolist()]
+                    for i, col in enumerate(spec["y_axis"])
+                },
+            }
+        return result
+
+
+    @staticmethod
+    def _parse_metric_config(metric_config, warn: bool = True) -> tuple | None:
+        """
+        (nom, début, fin, agrégats) d'une entrée de metrics_wanted, None si vide.
+        Les agrégats inconnus sont retirés (signalés sur stderr si warn).
+        """
+        if metric_config is None:
+            return None
+        if isinstance(metric_config, dict):
+            metric_name = metric_config.get("name")
+            time_range = metric_config.get("timeRange", {})
+            start_time = time_range.get("startTime") if time_range else None
+            end_time = time_range.get("endTime") if time_range else None
+            requested = metric_config.get("aggregates") or []
+        else:
+            metric_name, start_time, end_time, requested = metric_config, None, None, []
+        if not metric_name:
+            return None
+        # Un agrégat inconnu est ignoré pour cette métrique seulement : il ferait
+        # échouer le rééchantillonnage de toute la fenêtre de temps
+        unknown = [a for a in requested if a not in AGGREGATES]
+        if unknown and warn:
+            print(f"[PIGNAT] Agrégats inconnus ignorés pour {metric_name}: {unknown} "
+                  f"(attendus: {', '.join(AGGREGATES)})", file=sys.stderr)
+        # La moyenne est toujours calculée: c'est elle que trace le graphique
+        aggregates = ["mean"] + [a for a in dict.fromkeys(requested) if a != "mean" and a in AGGREGATES]
+        return metric_name, start_time, end_time, aggregates
+
+    def _metric_spec(self, metric: str) -> dict:
+        """Titre et colonnes d'une métrique, sans construire ses données."""
+        spec = METRIC_SPECS.get(metric)
+        if spec is None:
+            raise ValueError(f"Metric '{metric}' is not recognized.")
+        missing_cols = [col for col in [TIME] + spec['sources'] if col not in self.columns]
+        if missing_cols:
+            raise ValueError(f"Missing columns for metric {metric}: {missing_cols}")
+        return {
+            "name": DISPLAY_NAME_MAPPING[metric],
+            "x_axis": TIME,
+            "y_axis": spec['y_axis'],
+            "sources": spec['sources'],
+        }
+
+    def _resample_window(self, sensors: list[str], start_time, end_time, aggregates: list[str]) -> dict | None:
+        """
+        Rééchantillonne en une passe toutes les colonnes `sensors` (voies
+        calculées comprises) sur la fenêtre de temps, par intervalles de
+        RESAMPLE_PERIOD_S.
+
+        Returns:
+            {"time": libellés des intervalles, "count"/agrégat: {colonne: tableau}},
+            None si les heures ne sont pas lisibles (tableaux non rééchantillonnés)
+        """
+        mask = self._time_mask(start_time, end_time)
+        df = self._select_columns([TIME] + sensors)[mask]
+
+        columns = {sensor: df[sensor] for sensor in sensors if pd.api.types.is_numeric_dtype(df[sensor])}
+        names = list(columns)
+
+        if df.empty:
+            return {"time": np.array([], dtype=object), "names": names,
+                    "count": np.empty((0, len(names))), **{a: np.empty((0, len(names))) for a in aggregates}}
+
+        # Horodatages complets : une fenêtre de plusieurs jours ne mélange pas les jours
+        keys = self._parse_timestamps()[0][mask]
+        if np.isnat(keys).any():
+            return None
+        sample_time = str(df[TIME].iloc[0])
+        time_only = ':' in sample_time and len(sample_time.split()) == 1
+        days = keys.astype("datetime64[D]")
+        if time_only and days.min() != days.max():
+            time_only = False
+
+        values = np.column_stack([c.to_numpy(dtype="float64", na_value=np.nan) for c in columns.values()]) \
+            if names else np.empty((len(df), 0))
+        period = RESAMPLE_PERIOD_S * 10**9
+        result = resample_bins(keys.astype("int64"), values, period, aggregates)
+
+        if time_only:
+            result["time"] = pd.to_datetime(result["bins"]).strftime('%H:%M:%S').to_numpy(dtype=object)
+        else:
+            result["time"] = pd.to_datetime(result["bins"]).strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object)
+        result["names"] = names
+        return result
+
+    @staticmethod
+    def _metric_table(window: dict, y_axis: list[str], aggregates: list[str]) -> pd.DataFrame:
+        """Tableau d'une métrique lu dans le rééchantillonnage de sa fenêtre."""
+        index = {name: j for j, name in enumerate(window["names"])}
+        cols = [col for col in y_axis if col in index]
+        j = [index[col] for col in cols]
+        # Intervalles où la métrique a au moins une valeur
+        rows = (window["count"][:, j] > 0).any(axis=1) if j else np.zeros(len(window["time"]), dtype=bool)
+
+        table = {TIME: window["time"][rows]}
+        for col in cols:
+            table[col] = window["mean"][rows, index[col]]
+        for aggregate in aggregates[1:]:
+            for col in cols:
+                table[f"{col} ({aggregate})"] = window[aggregate][rows, index[col]]
+        return pd.DataFrame(table)
 
     def generate_workbook_with_charts(self,
         wb: Workbook,
@@ -336,62 +980,56 @@ class PignatData:
 
         current_col = 1
 
-        for i, metric_config in enumerate(metrics_wanted):
+        # Une seule passe de rééchantillonnage par fenêtre de temps, pour toutes
+        # les colonnes des métriques qui la partagent
+        windows = {}
+        for metric_config in metrics_wanted:
             try:
-                if metric_config is None:
+                parsed = self._parse_metric_config(metric_config)
+                if parsed is None:
                     continue
-
-                if isinstance(metric_config, dict):
-                    metric_name = metric_config.get("name")
-                    if metric_name is None:
-                        continue
-                    time_range = metric_config.get("timeRange", {})
-                    start_time = time_range.get("startTime") if time_range else None
-                    end_time = time_range.get("endTime") if time_range else None
-                else:
-                    metric_name = metric_config
-                    start_time = None
-                    end_time = None
-
-                if not metric_name:
+                metric_name, start_time, end_time, aggregates = parsed
+                if metric_name == INTEGRATED_TOTALS:
                     continue
+                window = windows.setdefault((start_time, end_time), {"sensors": [], "aggregates": []})
+                window["sensors"] += self._metric_spec(metric_name)['y_axis']
+                window["aggregates"] += aggregates
+            except Exception:
+                continue
+        resampled = {}
+        with span("resample"):
+            for (start_time, end_time), window in windows.items():
+                try:
+                    resampled[(start_time, end_time)] = self._resample_window(
+                        list(dict.fromkeys(window["sensors"])), start_time, end_time,
+                        list(dict.fromkeys(window["aggregates"])))
+                except Exception as e:
+                    print(f"[PIGNAT] Rééchantillonnage impossible: {e}", file=sys.stderr)
+                    resampled[(start_time, end_time)] = None
 
-                metric_data = self.get_json_metrics(metric_name, start_time, end_time)
-                df = metric_data['data']
-
-                # Resample to 1 point per minute for precise granularity
-                if not df.empty and TIME in df.columns:
-                    try:
-                        df_copy = df.copy()
-                        sample_time = str(df_copy[TIME].iloc[0])
-
-                        if ':' in sample_time and len(sample_time.split()) == 1:
-                            # Convert TIME column to string and prepend date
-                            df_copy['_datetime'] = pd.to_datetime(df_copy[TIME].astype(str).apply(lambda x: f'2000-01-01 {x}'))
-                        else:
-                            df_copy['_datetime'] = pd.to_datetime(df_copy[TIME])
-
-                        df_copy.set_index('_datetime', inplace=True)
-                        numeric_cols = [col for col in df_copy.columns if col != TIME and pd.api.types.is_numeric_dtype(df_copy[col])]
-                        df_resampled = df_copy[numeric_cols].resample('1T').mean().dropna(how='all')
-                        df_resampled.reset_index(inplace=True)
-
-                        if ':' in sample_time and len(sample_time.split()) == 1:
-                            df_resampled[TIME] = df_resampled['_datetime'].dt.strftime('%H:%M:%S')
-                        else:
-                            df_resampled[TIME] = df_resampled['_datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
-
-                        df_resampled.drop('_datetime', axis=1, inplace=True)
-                        cols_order = [TIME] + [col for col in df_resampled.columns if col != TIME]
-                        df_display = df_resampled[cols_order]
-                    except Exception:
-                        df_display = df.copy()
+        for i, metric_config in enumerate(metrics_wanted):
+            try:
+                parsed = self._parse_metric_config(metric_config, warn=False)
+                if parsed is None:
+                    continue
+                metric_name, start_time, end_time, aggregates = parsed
+
+                if metric_name == INTEGRATED_TOTALS:
+                    # Tableau seul, sans graphique
+                    metric_data = None
+                    totals = self.get_integrated_totals(start_time, end_time)
+                    df_table = self._integrated_totals_table(totals)
+                    title = f"{INTEGRATED_TOTALS_DISPLAY_TITLE} ({totals['start']} – {totals['end']})"
                 else:
-                    df_display = df.copy()
-
-                df_table = df_display.copy()
+                    metric_data = self._metric_spec(metric_name)
+                    window = resampled.get((start_time, end_time))
+                    if window is not None:
+                        df_table = self._metric_table(window, metric_data['y_axis'], aggregates)
+                    else:
+                        # Heures illisibles: données brutes, sans rééchantillonnage
+                        df_table = self.get_json_metrics(metric_name, start_time, end_time)['data'].copy()
 
-                title = metric_data['name'].replace('=', '-')
+                    title = metric_data['name'].replace('=', '-')
                 title_cell = ws.cell(row=1, column=current_col, value=title)
                 title_cell.font = title_font  # Futura PT Demi 11 gras
                 
@@ -409,7 +1047,12 @@ class PignatData:
                         data_cell = ws.cell(row=3 + row_idx, column=current_col + col_idx, value=value)
                         data_cell.border = thin_border
                         data_cell.font = data_font  # Futura PT Light 11
-                
+                report_progress("sheet", f"{sheet_name}/{title}", rows=len(df_table))
+
+                if metric_data is None:
+                    current_col += len(df_table.columns) + 1
+                    continue
+
                 chart = LineChart()
                 chart.title = title
                 chart.style = 2
@@ -551,6 +1194,7 @@ class PignatData:
                 chart_col = current_col + len(df_table.columns) + 1
                 chart_col_letter = get_column_letter(chart_col)
                 ws.add_chart(chart, f"{chart_col_letter}2")
+                report_progress("chart", title)
                 
                 data_width = len(df_table.columns)
                 chart_width = int(chart.width) if hasattr(chart, 'width') else 22
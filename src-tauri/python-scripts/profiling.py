@@ -0,0 +1,239 @@
+"""
+Instrumentation légère des traitements : spans, compteurs et profilage.
+
+- `span(name)` (gestionnaire de contexte ou décorateur) mesure la durée d'une
+  étape (lecture de fichier, extraction des blocs, conversion numérique,
+  tableaux de synthèse...). Les durées sont agrégées par nom : nombre, total,
+  min, max et histogramme de latence (bornes en ms de LATENCY_BUCKETS_MS).
+- `increment(name)` incrémente un compteur.
+- `get_stats()` retourne l'agrégat (commande STATS).
+- `profile_command()` exécute une commande sous cProfile, tracemalloc ou en
+  enregistrant les spans au format Chrome trace (commande PROFILE).
+"""
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+# Bornes supérieures (ms) des classes de l'histogramme de latence
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Nombre de lignes retournées par PROFILE (fonctions ou allocations)
+PROFILE_TOP = 30
+
+PROFILE_MODES = ("cprofile", "tracemalloc", "trace")
+
+_lock = threading.Lock()
+_spans: dict[str, dict] = {}
+_counters: dict[str, int] = {}
+_started_at = time.time()
+
+# Événements Chrome trace en cours d'enregistrement (PROFILE trace), sinon None
+_trace_events: Optional[list] = None
+
+# Un seul profilage à la fois: cProfile et tracemalloc sont globaux au processus
+_profile_lock = threading.Lock()
+
+
+def _new_span_stats() -> dict:
+    return {
+        "count": 0,
+        "total_ms": 0.0,
+        "min_ms": None,
+        "max_ms": 0.0,
+        "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+    }
+
+
+def record_span(name: str, start: float, end: float) -> None:
+    """
+    Enregistre une durée mesurée avec time.perf_counter().
+
+    Args:
+        name: Nom du span
+        start, end: Bornes de la mesure (perf_counter, en secondes)
+    """
+    duration_ms = (end - start) * 1000
+    bucket = len(LATENCY_BUCKETS_MS)
+    for i, bound in enumerate(LATENCY_BUCKETS_MS):
+        if duration_ms <= bound:
+            bucket = i
+            break
+
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = _new_span_stats()
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["min_ms"] = duration_ms if stats["min_ms"] is None else min(stats["min_ms"], duration_ms)
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["buckets"][bucket] += 1
+
+        if _trace_events is not None:
+            _trace_events.append({
+                "name": name,
+                "ph": "X",
+                "ts": round(start * 1e6, 1),
+                "dur": round(duration_ms * 1000, 1),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            })
+
+
+class span(contextlib.ContextDecorator):
+    """Mesure la durée d'un bloc ou d'une fonction sous le nom `name`."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _recreate_cm(self):
+        # En décorateur, une instance neuve par appel : des appels concurrents
+        # (pool v2, PRELOAD) n'écrasent pas l'instant de départ des autres
+        return span(self.name)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_span(self.name, self._start, time.perf_counter())
+        return False
+
+
+def increment(name: str, value: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def get_stats(reset: bool = False) -> dict:
+    """
+    Agrégat des spans et compteurs depuis le démarrage (ou le dernier reset).
+
+    Returns:
+        {"since", "uptime_s", "counters", "spans": {nom: {"count", "total_ms",
+        "mean_ms", "min_ms", "max_ms", "histogram": {"<=1ms": n, ..., ">10000ms": n}}}}
+    """
+    global _started_at
+    labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    with _lock:
+        spans = {}
+        for name, stats in sorted(_spans.items()):
+            spans[name] = {
+                "count": stats["count"],
+                "total_ms": round(stats["total_ms"], 1),
+                "mean_ms": round(stats["total_ms"] / stats["count"], 2),
+                "min_ms": round(stats["min_ms"], 2),
+                "max_ms": round(stats["max_ms"], 2),
+                "histogram": {label: n for label, n in zip(labels, stats["buckets"]) if n},
+            }
+        result = {
+            "since": _started_at,
+            "uptime_s": round(time.time() - _started_at, 1),
+            "counters": dict(sorted(_counters.items())),
+            "spans": spans,
+        }
+        if reset:
+            _spans.clear()
+            _counters.clear()
+            _started_at = time.time()
+    return result
+
+
+def _run_cprofile(run: Callable[[], dict]) -> tuple[dict, dict]:
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    response = profiler.runcall(run)
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+
+    hotspots = []
+    for func in stats.fcn_list[:PROFILE_TOP]:
+        _, ncalls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        hotspots.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "ncalls": ncalls,
+            "tottime_ms": round(tottime * 1000, 2),
+            "cumtime_ms": round(cumtime * 1000, 2),
+        })
+    return response, {"hotspots": hotspots}
+
+
+def _run_tracemalloc(run: Callable[[], dict]) -> tuple[dict, dict]:
+    import tracemalloc
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    try:
+        response = run()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    allocations = [
+        {
+            "location": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count_diff,
+        }
+        for stat in after.compare_to(before, "lineno")[:PROFILE_TOP]
+    ]
+    return response, {"peak_kb": round(peak / 1024, 1), "allocations": allocations}
+
+
+def _run_trace(run: Callable[[], dict], out_path: Optional[str]) -> tuple[dict, dict]:
+    global _trace_events
+    with _lock:
+        _trace_events = []
+    try:
+        response = run()
+    finally:
+        with _lock:
+            events, _trace_events = _trace_events, None
+
+    if out_path is None:
+        out_path = os.path.join(tempfile.gettempdir(), f"bobine_trace_{int(time.time() * 1000)}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return response, {"trace_path": out_path, "events": len(events)}
+
+
+def profile_command(run: Callable[[], dict], mode: str, out_path: Optional[str] = None) -> dict:
+    """
+    Exécute `run` (une commande) sous un profileur.
+
+    Args:
+        run: Fonction sans argument retournant la réponse de la commande
+        mode: "cprofile" (fonctions les plus coûteuses), "tracemalloc"
+              (pic mémoire et principales allocations) ou "trace" (fichier
+              Chrome trace des spans, à ouvrir dans chrome://tracing ou Perfetto)
+        out_path: Fichier de sortie du mode "trace" (défaut: répertoire temporaire)
+
+    Returns:
+        {"mode", "seconds", "response": réponse de la commande, ...résultats du profileur}
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Mode de profilage inconnu: {mode} (attendu: {', '.join(PROFILE_MODES)})")
+
+    with _profile_lock:
+        start = time.perf_counter()
+        if mode == "cprofile":
+            response, profile = _run_cprofile(run)
+        elif mode == "tracemalloc":
+            response, profile = _run_tracemalloc(run)
+        else:
+            response, profile = _run_trace(run, out_path)
+        seconds = time.perf_counter() - start
+
+    return {"mode": mode, "seconds": round(seconds, 3), "response": response, **profile}
@@ -0,0 +1,243 @@
+"""
+Protocole du mode interactif (stdin/stdout).
+
+Deux formats de requête cohabitent, détectés ligne par ligne :
+
+- v1 (compatibilité, utilisé par le service Rust) : arguments séparés par des
+  tabulations. La commande est traitée immédiatement, dans l'ordre, et la
+  réponse JSON est suivie de la ligne `<<<END_RESPONSE>>>`.
+
+- v2 : une ligne JSON `{"v": 2, "id": "...", "cmd": "...", "args": [...]}`.
+  Les commandes sont exécutées dans un pool de threads, plusieurs peuvent être
+  en cours et les réponses arrivent dans le désordre, chacune sur une ligne
+  `{"v": 2, "id": "...", "result": ...}` (ou `"error"`). La commande CANCEL
+  (`"args": ["<id>"]`) annule une requête en attente ou en cours.
+
+L'annulation est coopérative : les traitements longs appellent
+`check_cancelled()` entre leurs étapes.
+
+Pendant une commande, `report_progress()` émet des événements d'avancement
+avant la réponse finale : en v1 sur des lignes `<<<EVENT>>>{...}` (ignorées
+dans la réponse par le service Rust), en v2 sur des lignes
+`{"v": 2, "id": "...", "event": {...}}`. Hors mode interactif (CLI, processus
+du mode --batch), aucun événement n'est écrit ; la durée des étapes est
+seulement enregistrée dans les statistiques (profiling.py).
+"""
+import contextlib
+import json
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from profiling import increment, record_span, span
+
+PROTOCOL_VERSION = 2
+END_RESPONSE = "<<<END_RESPONSE>>>"
+EVENT_PREFIX = "<<<EVENT>>>"
+DEFAULT_MAX_WORKERS = 4
+
+
+class CommandCancelled(Exception):
+    """Levée par check_cancelled() quand la requête courante a été annulée."""
+
+
+class RequestContext:
+    def __init__(self, request_id: Optional[str], emit: Optional[Callable[[dict], None]] = None):
+        """
+        Args:
+            request_id: Identifiant de la requête (None en v1)
+            emit: Fonction d'écriture des événements d'avancement
+        """
+        self.id = request_id
+        self.cancel_event = threading.Event()
+        self.emit = emit
+        self.started = time.perf_counter()
+        self.last_event = self.started
+
+
+_local = threading.local()
+
+
+def current_request() -> Optional[RequestContext]:
+    """Contexte de la requête traitée par le thread courant (None hors mode interactif)."""
+    return getattr(_local, "request", None)
+
+
+@contextlib.contextmanager
+def request_scope(ctx: RequestContext):
+    """Rattache `ctx` au thread courant le temps d'une commande."""
+    previous = current_request()
+    _local.request = ctx
+    try:
+        yield ctx
+    finally:
+        _local.request = previous
+
+
+def check_cancelled() -> None:
+    """Interrompt le traitement courant si sa requête a été annulée."""
+    ctx = current_request()
+    if ctx is not None and ctx.cancel_event.is_set():
+        raise CommandCancelled(f"Requête {ctx.id} annulée")
+
+
+def report_progress(stage: str, detail: Optional[str] = None, rows: Optional[int] = None, **extra) -> None:
+    """
+    Émet un événement d'avancement pour la requête courante.
+
+    Args:
+        stage: Étape ("context", "parse", "sheet", "chart", "save"...)
+        detail: Source, feuille ou graphique concerné
+        rows: Nombre de lignes traitées par l'étape
+        extra: Champs supplémentaires de l'événement
+
+    L'événement porte `elapsed_ms` (depuis le début de la requête) et
+    `stage_ms` (depuis l'événement précédent, soit la durée de l'étape). Cette
+    durée est aussi enregistrée comme span `stage` (voir profiling.py).
+    """
+    ctx = current_request()
+    if ctx is None:
+        return
+    now = time.perf_counter()
+    record_span(stage, ctx.last_event, now)
+    if ctx.emit is None:
+        ctx.last_event = now
+        return
+    event = {
+        "stage": stage,
+        "detail": detail,
+        "rows": rows,
+        "elapsed_ms": round((now - ctx.started) * 1000, 1),
+        "stage_ms": round((now - ctx.last_event) * 1000, 1),
+        **extra,
+    }
+    ctx.last_event = now
+    ctx.emit(event)
+
+
+class InteractiveServer:
+    def __init__(self, handler: Callable[[list[str]], dict], max_workers: int = DEFAULT_MAX_WORKERS, out=None):
+        """
+        Args:
+            handler: Fonction de traitement d'une commande (args -> réponse {"result"|"error"})
+            max_workers: Nombre de commandes v2 exécutées en parallèle
+            out: Flux de sortie (sys.stdout par défaut)
+        """
+        self.handler = handler
+        self.out = out or sys.stdout
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="request")
+        self._write_lock = threading.Lock()
+        self._inflight: dict[str, tuple[RequestContext, Future]] = {}
+        self._inflight_lock = threading.Lock()
+
+    def write_line(self, text: str) -> None:
+        """Écrit une ou plusieurs lignes d'un seul tenant (sans entrelacement entre threads)."""
+        with self._write_lock:
+            self.out.write(text + "\n")
+            self.out.flush()
+
+    def _dumps(self, payload: dict) -> str:
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+    def _handle(self, args: list[str]) -> dict:
+        """Exécute une commande en mesurant sa latence (STATS)."""
+        increment("requests")
+        with span(f"command.{args[0]}"):
+            response = self.handler(args)
+        if "error" in response:
+            increment("errors")
+        return response
+
+    # ---- v1 ----
+    def handle_legacy(self, line: str) -> None:
+        ctx = RequestContext(None, emit=lambda event: self.write_line(EVENT_PREFIX + self._dumps(event)))
+        with request_scope(ctx):
+            response = self._handle(line.split('\t'))
+        self.write_line(self._dumps(response) + "\n" + END_RESPONSE)
+
+    # ---- v2 ----
+    def handle_request(self, line: str) -> None:
+        try:
+            request = json.loads(line)
+            request_id = str(request["id"])
+            cmd = request["cmd"]
+            args = [str(a) for a in request.get("args", [])]
+        except (ValueError, KeyError, TypeError) as e:
+            self.write_line(self._dumps({"v": PROTOCOL_VERSION, "id": None, "error": f"Requête invalide: {e}"}))
+            return
+
+        if cmd == "CANCEL":
+            target = args[0] if args else None
+            self.write_line(self._dumps({
+                "v": PROTOCOL_VERSION, "id": request_id,
+                "result": {"target": target, "cancelled": self.cancel(target)},
+            }))
+            return
+
+        ctx = RequestContext(request_id)
+        ctx.emit = lambda event: self.write_line(
+            self._dumps({"v": PROTOCOL_VERSION, "id": request_id, "event": event}))
+        with self._inflight_lock:
+            future = self.pool.submit(self._run, ctx, [cmd] + args)
+            self._inflight[request_id] = (ctx, future)
+        future.add_done_callback(lambda _f, rid=request_id: self._forget(rid, _f))
+
+    def _forget(self, request_id: str, future: Future) -> None:
+        with self._inflight_lock:
+            if self._inflight.get(request_id, (None, None))[1] is future:
+                del self._inflight[request_id]
+        if future.cancelled():
+            self.write_line(self._dumps({
+                "v": PROTOCOL_VERSION, "id": request_id, "error": "Requête annulée", "cancelled": True,
+            }))
+
+    def _run(self, ctx: RequestContext, args: list[str]) -> None:
+        ctx.started = ctx.last_event = time.perf_counter()
+        with request_scope(ctx):
+            try:
+                response = self._handle(args)
+            except Exception as e:
+                response = {"error": str(e), "traceback": traceback.format_exc()}
+
+        payload = {"v": PROTOCOL_VERSION, "id": ctx.id, **response}
+        if ctx.cancel_event.is_set():
+            increment("cancelled")
+            payload["cancelled"] = True
+        self.write_line(self._dumps(payload))
+
+    def cancel(self, request_id: Optional[str]) -> bool:
+        """Annule une requête v2 en attente (retirée de la file) ou en cours (coopératif)."""
+        with self._inflight_lock:
+            entry = self._inflight.get(request_id)
+        if entry is None:
+            return False
+        ctx, future = entry
+        ctx.cancel_event.set()
+        future.cancel()
+        return True
+
+    def serve(self, stdin=None) -> None:
+        """Lit les requêtes jusqu'à EOF puis attend la fin des requêtes v2 en cours."""
+        stdin = stdin or sys.stdin
+        try:
+            while True:
+                line = stdin.readline()
+                if not line.strip():
+                    # EOF, sortir proprement
+                    break
+                line = line.rstrip("\r\n")
+                try:
+                    if line.lstrip().startswith("{"):
+                        self.handle_request(line)
+                    else:
+                        self.handle_legacy(line.strip())
+                except Exception as e:
+                    print(f"[INTERACTIVE] Error: {e}", file=sys.stderr)
+                    print(traceback.format_exc(), file=sys.stderr)
+                    self.write_line(self._dumps({"error": str(e), "traceback": traceback.format_exc()}) + "\n" + END_RESPONSE)
+        finally:
+            self.pool.shutdown(wait=True)
@@ -1,4 +1,5 @@
 import os
+import threading
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.utils.dataframe import dataframe_to_rows
@@ -17,16 +18,48 @@ from utils.chart_styles import (
     get_table_title_font, get_table_header_font, get_table_data_font,
     apply_pie_chart_styles, apply_bar_chart_styles
 )
+from profiling import span
+from protocol import report_progress
 
 
+def carbon_labels(start: int, end: int) -> list[str]:
+    """Étiquettes de carbone C{start}..C{end} (bornes incluses)"""
+    return [f'C{i}' for i in range(start, end + 1)]
+
+
+# Bornes (incluses) des carbones de la phase totale
+CARBON_RANGE = (1, 32)
+
+# Colonnes communes des phases indexées par carbone
+PHASE_COLUMNS = ['% Paraffin', '% Olefin', '% BTX', '% Total']
+GAS_PHASE_COLUMNS = {'% Paraffin': '% Paraffin', '% iso+Olefin': '% Olefin', '% BTX': '% BTX', '% total': '% Total'}
+LIQUID_PHASE_COLUMNS = {'% Paraffin': '% Paraffin', '% Olefin': '% Olefin', '% BTX': '% BTX', '% Total': '% Total'}
+
+# Carbones utilisés par les KPI du Summary
+LIGHT_OLEFIN_CARBONS = carbon_labels(2, 4)       # Ethylene, Propylene, C4=
+AROMATIC_CARBONS = carbon_labels(6, 8)           # Benzene, Toluene, Xylene
+GAS_PARAFFIN_CARBONS = carbon_labels(1, 8)
+GAS_OLEFIN_OTHER_CARBONS = carbon_labels(5, 6)
+LIQUID_OTHER_CARBONS = carbon_labels(6, 32)
+
 
 class Resume:
-    def __init__(self, dir_online:str, dir_offline:str, dir_context:str):
+    def __init__(
+        self,
+        dir_online: str,
+        dir_offline: str,
+        dir_context: str,
+        chromeleon_online: Optional[ChromeleonOnline] = None,
+        chromeleon_offline: Optional[ChromeleonOffline] = None,
+        context_data: Optional[ExcelContextData] = None,
+    ):
         """
         Initialize Resume class with ChromeleonOnline, ChromeleonOffline, and ExcelContextData.
 
         Args:
-            dir_root: Root directory containing the data files
+            dir_online, dir_offline, dir_context: Directories of each data source
+            chromeleon_online, chromeleon_offline, context_data: Already parsed
+                instances to reuse (built from the directories when None)
         """
         self.dir_online = dir_online
         self.dir_offline = dir_offline
@@ -37,20 +70,24 @@ class Resume:
         self.context_data = None
 
         # ---- Data ----
+        # Tables dérivées (phases, summary) calculées à la demande, voir _memoized ;
+        # l'instance est partagée entre threads (cache de main.get_source)
+        self._cache: dict[tuple, Any] = {}
+        self._lock = threading.RLock()
         self.masses = {}
         self.online_relative_area_by_carbon = None
         self.offline_relative_area_by_carbon = None
 
         # Initialize ChromeleonOnline
         try:
-            self.chromeleon_online = ChromeleonOnline(dir_online)
+            self.chromeleon_online = chromeleon_online or ChromeleonOnline(dir_online)
             self.online_relative_area_by_carbon = self.chromeleon_online.make_summary_tables()[1]
         except Exception:
             pass
 
         # Initialize ChromeleonOffline
         try:
-            self.chromeleon_offline = ChromeleonOffline(dir_offline)
+            self.chromeleon_offline = chromeleon_offline or ChromeleonOffline(dir_offline)
             self.offline_relative_area_by_carbon = self.chromeleon_offline.get_relative_area_by_carbon_tables()[
                 "Moyenne"]
         except Exception:
@@ -58,11 +95,58 @@ class Resume:
 
         # Initialize ExcelContextData and retrieve masses
         try:
-            self.context_data = ExcelContextData(dir_context)
+            self.context_data = context_data or ExcelContextData(dir_context)
             self.masses = self.context_data.get_masses()
         except Exception:
             pass
 
+    # ---- Source data: toute réassignation invalide les tables dérivées ----
+    @property
+    def masses(self) -> dict:
+        return self._masses
+
+    @masses.setter
+    def masses(self, value: dict) -> None:
+        self._masses = value
+        self.invalidate()
+
+    @property
+    def online_relative_area_by_carbon(self) -> Optional[pd.DataFrame]:
+        return self._online_relative_area_by_carbon
+
+    @online_relative_area_by_carbon.setter
+    def online_relative_area_by_carbon(self, value: Optional[pd.DataFrame]) -> None:
+        self._online_relative_area_by_carbon = value
+        self.invalidate()
+
+    @property
+    def offline_relative_area_by_carbon(self) -> Optional[pd.DataFrame]:
+        return self._offline_relative_area_by_carbon
+
+    @offline_relative_area_by_carbon.setter
+    def offline_relative_area_by_carbon(self, value: Optional[pd.DataFrame]) -> None:
+        self._offline_relative_area_by_carbon = value
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Vide le cache des tables dérivées (phases, summary, mass balance)."""
+        with self._lock:
+            self._cache.clear()
+
+    def _memoized(self, name: str, compute, *args):
+        """
+        Retourne le résultat mis en cache de `compute(*args)`.
+
+        La clé inclut les masses courantes : une modification en place de
+        `self.masses` produit donc un nouveau calcul. Les tables retournées
+        sont partagées entre appelants et ne doivent pas être modifiées.
+        """
+        key = (name, args, tuple(sorted((self.masses or {}).items())))
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = compute(*args)
+            return self._cache[key]
+
     def _get_pourcentage_by_mass(self):
         masse_1 = self.masses.get("masse recette 1 (kg)", 0) or 0
         masse_2 = self.masses.get("masse recette 2 (kg)", 0) or 0
@@ -92,6 +176,9 @@ class Resume:
         }
 
     def get_gas_phase(self) -> pd.DataFrame:
+        return self._memoized("gas_phase", self._compute_gas_phase)
+
+    def _compute_gas_phase(self) -> pd.DataFrame:
         if self.online_relative_area_by_carbon is None:
             return pd.DataFrame()
         
@@ -114,6 +201,9 @@ class Resume:
         return gas_phase_df
 
     def get_liquid_phase(self) -> pd.DataFrame:
+        return self._memoized("liquid_phase", self._compute_liquid_phase)
+
+    def _compute_liquid_phase(self) -> pd.DataFrame:
         if self.offline_relative_area_by_carbon is None:
             return pd.DataFrame()
         
@@ -135,82 +225,66 @@ class Resume:
         
         return liquid_phase_df
 
-    def get_total_phase(self) -> pd.DataFrame:
+    @staticmethod
+    def _phase_by_carbon(phase_df: pd.DataFrame, columns: dict[str, str]) -> pd.DataFrame:
+        """
+        Ramène une table de phase à un DataFrame indexé par carbone avec les
+        colonnes communes PHASE_COLUMNS.
+
+        Args:
+            phase_df: Table de phase (colonne ou index 'Carbon')
+            columns: Mapping {colonne de phase_df: colonne de PHASE_COLUMNS}
+
+        Returns:
+            DataFrame indexé par carbone (première occurrence conservée)
+        """
+        df = phase_df.set_index('Carbon') if 'Carbon' in phase_df.columns else phase_df
+        df = df[~df.index.duplicated(keep='first')]
+        df = df.reindex(columns=list(columns)).rename(columns=columns)
+        return df.reindex(columns=PHASE_COLUMNS, fill_value=0.0).fillna(0.0)
+
+    def _gas_by_carbon(self) -> pd.DataFrame:
+        return self._memoized(
+            "gas_by_carbon", lambda: self._phase_by_carbon(self.get_gas_phase(), GAS_PHASE_COLUMNS))
+
+    def _liquid_by_carbon(self) -> pd.DataFrame:
+        return self._memoized(
+            "liquid_by_carbon", lambda: self._phase_by_carbon(self.get_liquid_phase(), LIQUID_PHASE_COLUMNS))
+
+    def get_total_phase(self, carbon_range: tuple[int, int] = CARBON_RANGE) -> pd.DataFrame:
+        return self._memoized("total_phase", self._compute_total_phase, tuple(carbon_range))
+
+    def _compute_total_phase(self, carbon_range: tuple[int, int]) -> pd.DataFrame:
+        """
+        Phase totale = phase gaz + phase liquide, alignées par carbone.
+
+        Args:
+            carbon_range: Bornes incluses (min, max) des carbones à reporter
+
+        Returns:
+            DataFrame avec colonne Carbon (C{min}..C{max}, Autres, Total) et PHASE_COLUMNS
+        """
         gas_phase_df = self.get_gas_phase()
         liquid_phase_df = self.get_liquid_phase()
         
         if gas_phase_df.empty or liquid_phase_df.empty:
             return pd.DataFrame()
-        
-        carbon_entries = [f'C{i}' for i in range(1, 33)]
-        
-        result_data = []
-        
-        for carbon in carbon_entries:
-            linear_pct = 0.0
-            olefin_pct = 0.0
-            btx_pct = 0.0
-            total_pct = 0.0
-            
-            gas_row = gas_phase_df[gas_phase_df['Carbon'] == carbon]
-            if not gas_row.empty:
-                linear_pct += gas_row['% Paraffin'].iloc[0] if '% Paraffin' in gas_row.columns else 0.0
-                olefin_pct += gas_row['% iso+Olefin'].iloc[0] if '% iso+Olefin' in gas_row.columns else 0.0
-                btx_pct += gas_row['% BTX'].iloc[0] if '% BTX' in gas_row.columns else 0.0
-                total_pct += gas_row['% total'].iloc[0] if '% total' in gas_row.columns else 0.0
-            
-            # Get values from liquid phase (if carbon exists in liquid phase)
-            liquid_row = liquid_phase_df[liquid_phase_df['Carbon'] == carbon]
-            if not liquid_row.empty:
-                # For liquid phase: Paraffin (linear), Olefin (branched)
-                linear_pct += liquid_row['% Paraffin'].iloc[0] if '% Paraffin' in liquid_row.columns else 0.0
-                olefin_pct += liquid_row['% Olefin'].iloc[0] if '% Olefin' in liquid_row.columns else 0.0
-                btx_pct += liquid_row['% BTX'].iloc[0] if '% BTX' in liquid_row.columns else 0.0
-                total_pct += liquid_row['% Total'].iloc[0] if '% Total' in liquid_row.columns else 0.0
-            
-            result_data.append({
-                'Carbon': carbon,
-                '% Paraffin': linear_pct,
-                '% Olefin': olefin_pct,
-                '% BTX': btx_pct,
-                '% Total': total_pct
-            })
-        
-        # Add "Autres" and "Total" rows if they exist in either phase
-        for special_row in ['Autres', 'Total']:
-            linear_pct = 0.0
-            olefin_pct = 0.0
-            btx_pct = 0.0
-            total_pct = 0.0
-            
-            # Check gas phase
-            gas_special = gas_phase_df[gas_phase_df['Carbon'] == special_row]
-            if not gas_special.empty:
-                linear_pct += gas_special['% Paraffin'].iloc[0] if '% Paraffin' in gas_special.columns else 0.0
-                olefin_pct += gas_special['% iso+Olefin'].iloc[0] if '% iso+Olefin' in gas_special.columns else 0.0
-                btx_pct += gas_special['% BTX'].iloc[0] if '% BTX' in gas_special.columns else 0.0
-                total_pct += gas_special['% total'].iloc[0] if '% total' in gas_special.columns else 0.0
-            
-            # Check liquid phase
-            liquid_special = liquid_phase_df[liquid_phase_df['Carbon'] == special_row]
-            if not liquid_special.empty:
-                linear_pct += liquid_special['% Paraffin'].iloc[0] if '% Paraffin' in liquid_special.columns else 0.0
-                olefin_pct += liquid_special['% Olefin'].iloc[0] if '% Olefin' in liquid_special.columns else 0.0
-                btx_pct += liquid_special['% BTX'].iloc[0] if '% BTX' in liquid_special.columns else 0.0
-                total_pct += liquid_special['% Total'].iloc[0] if '% Total' in liquid_special.columns else 0.0
-            
-            result_data.append({
-                'Carbon': special_row,
-                '% Paraffin': linear_pct,
-                '% Olefin': olefin_pct,
-                '% BTX': btx_pct,
-                '% Total': total_pct
-            })
-        
-        return pd.DataFrame(result_data)
+
+        gas = self._gas_by_carbon()
+        liquid = self._liquid_by_carbon()
+
+        rows = carbon_labels(*carbon_range) + ['Autres', 'Total']
+        total = gas.add(liquid, fill_value=0).reindex(rows, fill_value=0.0)
+        total.index.name = 'Carbon'
+
+        return total.reset_index()
 
 
     def get_summary_and_mass_balance(self) -> dict[str, pd.DataFrame]:
+        return self._memoized("summary_and_mass_balance", self._compute_summary_and_mass_balance)
+
+    @span("summary_tables")
+    def _compute_summary_and_mass_balance(self) -> dict[str, pd.DataFrame]:
         # Get phase tables
         gas_phase_df = self.get_gas_phase()
         liquid_phase_df = self.get_liquid_phase()
@@ -218,33 +292,36 @@ class Resume:
         
         if gas_phase_df.empty or liquid_phase_df.empty or total_phase_df.empty:
             return {"summary": pd.DataFrame(), "mass_balance": pd.DataFrame()}
-        
-        # Helper function to get value from dataframe
-        def get_value(df: pd.DataFrame, carbon: str, column: str) -> float:
-            """Get value from dataframe for specific carbon and column"""
-            row = df[df['Carbon'] == carbon]
-            return row[column].iloc[0] if not row.empty and column in row.columns else 0.0
-        
+
+        gas = self._gas_by_carbon()
+        liquid = self._liquid_by_carbon()
+        total = total_phase_df.set_index('Carbon')
+
+        def pick(df: pd.DataFrame, carbons: list[str], column: str) -> pd.Series:
+            """Valeurs de `column` pour `carbons` (0.0 si le carbone est absent)"""
+            return df[column].reindex(carbons, fill_value=0.0)
+
         # --- SUMMARY CALCULATIONS ---
 
         # Light olefin = C2 + C3 + C4 olefins only
-        light_olefin = sum(get_value(total_phase_df, f'C{i}', '% Olefin') for i in range(2, 5))
+        light_olefins = pick(total, LIGHT_OLEFIN_CARBONS, '% Olefin')
+        light_olefin = light_olefins.sum()
 
         # Aromatics = Somme BTX de C6 à C8 dans total phase table
-        aromatics = sum(get_value(total_phase_df, f'C{i}', '% BTX') for i in range(6, 9))
+        aromatics_by_carbon = pick(total, AROMATIC_CARBONS, '% BTX')
+        aromatics = aromatics_by_carbon.sum()
         
         # Other Hydrocarbons gas = %Paraffin de C1 à C8 dans gas phase + C5 et C6 en % iso + Olefin dans gas phase + %total de autres dans gas phase table
         other_hc_gas = (
-            sum(get_value(gas_phase_df, f'C{i}', '% Paraffin') for i in range(1, 9)) +
-            get_value(gas_phase_df, 'C5', '% iso+Olefin') +
-            get_value(gas_phase_df, 'C6', '% iso+Olefin') +
-            get_value(gas_phase_df, 'Autres', '% total')
+            pick(gas, GAS_PARAFFIN_CARBONS, '% Paraffin').sum() +
+            pick(gas, GAS_OLEFIN_OTHER_CARBONS, '% Olefin').sum() +
+            pick(gas, ['Autres'], '% Total').sum()
         )
         
         # Other Hydrocarbons liquid = Somme toute valeur de %Paraffin et %Olefin de C6 à C32 dans table liquide phase + %total de autres dans table liquide phase
         other_hc_liquid = (
-            sum(get_value(liquid_phase_df, f'C{i}', '% Paraffin') + get_value(liquid_phase_df, f'C{i}', '% Olefin') for i in range(6, 33)) +
-            get_value(liquid_phase_df, 'Autres', '% Total')
+            liquid[['% Paraffin', '% Olefin']].reindex(LIQUID_OTHER_CARBONS, fill_value=0.0).to_numpy().sum() +
+            pick(liquid, ['Autres'], '% Total').sum()
         )
         
         # Residu = résidu% 
@@ -252,12 +329,8 @@ class Resume:
         residue = mass_percentages.get("Residue (%)", 0) or 0
         
         # Individual components from total phase
-        ethylene = get_value(total_phase_df, 'C2', '% Olefin')
-        propylene = get_value(total_phase_df, 'C3', '% Olefin')
-        c4_eq = get_value(total_phase_df, 'C4', '% Olefin')
-        benzene = get_value(total_phase_df, 'C6', '% BTX')
-        toluene = get_value(total_phase_df, 'C7', '% BTX')
-        xylene = get_value(total_phase_df, 'C8', '% BTX')
+        ethylene, propylene, c4_eq = light_olefins.tolist()
+        benzene, toluene, xylene = aromatics_by_carbon.tolist()
 
         # HVC = Light Olefins + Aromatics
         hvc = light_olefin + aromatics
@@ -1146,6 +1219,7 @@ class Resume:
                 apply_mass_balance_formatting(ws, current_top_row, mass_balance_start_col, mb_end_row, mb_end_col)
                 apply_wide_column_width_adjustment(ws, mass_balance_table, current_top_row, mass_balance_start_col, "")
 
+            report_progress("sheet", ws.title, rows=ws.max_row)
 
             # ---- Add charts based on metrics_wanted ----
             wanted = {m.strip().lower() for m in metrics_wanted}
@@ -1190,7 +1264,7 @@ class Resume:
 
             # Calculate dynamic positioning
             current_chart_idx = 0
-            for chart_type, _ in charts_to_create:
+            for chart_type, chart_title in charts_to_create:
                 # Calculate row and column based on current index
                 row_idx = current_chart_idx // CHARTS_PER_ROW
                 col_idx = current_chart_idx % CHARTS_PER_ROW
@@ -1231,7 +1305,8 @@ class Resume:
                         total_start_col, current_top_row, total_end_row, total_end_col,
                         c_start=1, c_end=8, title="Products repartition (C1–C8)"
                     )
-                
+
+                report_progress("chart", chart_title)
                 current_chart_idx += 1
 
             return wb
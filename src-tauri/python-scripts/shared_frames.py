@@ -0,0 +1,294 @@
+"""
+Transport de DataFrames entre processus par mémoire partagée.
+
+Un processus de travail (pool du mode --batch, parsing parallèle des sources)
+qui renvoie un DataFrame au coordinateur le fait normalement par pickle : le
+tableau est sérialisé, copié dans un tube puis désérialisé. Ici, le processus
+de travail publie ses colonnes dans un segment `multiprocessing.shared_memory`
+et ne renvoie qu'une poignée de quelques octets ; le coordinateur s'attache au
+segment et obtient un DataFrame dont les colonnes numériques pointent
+directement dans la mémoire partagée, sans copie.
+
+Disposition du segment :
+
+    MAGIC (4 octets) | longueur du schéma (uint32) | schéma JSON | colonnes
+
+Le schéma décrit le nombre de lignes et, pour chaque colonne, son nom, son
+type numpy, sa nature ("numeric", "datetime" ou "text") et son décalage dans
+le segment (aligné sur ALIGNMENT octets). Les colonnes texte sont stockées en
+largeur fixe (dtype numpy "U") et converties en objets Python à l'attachement,
+ce qui les copie (valeurs manquantes -> "") : seules les colonnes numériques
+et dates sont sans copie.
+
+Propriété du segment : le processus qui publie s'en dessaisit ; c'est le
+coordinateur qui le libère (`SharedFrame.close()`, ou `discard_frame()` pour
+une poignée jamais attachée).
+
+Hors POSIX (Windows, data_processor.exe), un segment est détruit dès que sa
+dernière poignée se ferme, donc avant que le coordinateur ne s'y attache :
+les colonnes, converties de la même façon, voyagent alors dans la poignée
+elle-même (pickle) et attach_frame retourne le même DataFrame.
+
+Exemple :
+
+    with ProcessPoolExecutor() as pool:
+        handle = pool.submit(publish_pignat_matrix, dir_root).result()
+    with attach_frame(handle) as frame:
+        df = frame.df
+        ...
+"""
+import json
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"BBSF"
+SCHEMA_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<4sI")
+
+KIND_NUMERIC = "numeric"
+KIND_DATETIME = "datetime"
+KIND_TEXT = "text"
+
+# Le segment ne survit à la fermeture de sa dernière poignée que sous POSIX
+SHARED_MEMORY_AVAILABLE = os.name == "posix"
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _column_array(series: pd.Series) -> tuple[str, np.ndarray]:
+    """Nature et tableau numpy contigu d'une colonne à publier."""
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+        # Les types nullables (Int64, Float64...) passent en float64 (NA -> NaN)
+        if isinstance(series.dtype, np.dtype):
+            return KIND_NUMERIC, np.ascontiguousarray(series.to_numpy())
+        return KIND_NUMERIC, series.to_numpy(dtype="float64", na_value=np.nan)
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        return KIND_DATETIME, np.ascontiguousarray(series.to_numpy(dtype="datetime64[ns]"))
+    values = series.astype(object).where(series.notna(), "").astype(str)
+    return KIND_TEXT, values.to_numpy(dtype=str)
+
+
+def publish_frame(df: pd.DataFrame, columns: Optional[list[str]] = None) -> dict:
+    """
+    Copie les colonnes d'un DataFrame dans un nouveau segment de mémoire partagée.
+
+    L'index n'est pas publié (le DataFrame attaché a un RangeIndex).
+
+    Args:
+        df: DataFrame à publier
+        columns: Colonnes à publier (défaut: toutes)
+
+    Returns:
+        Poignée picklable {"name", "nbytes", "rows", "columns"} à transmettre
+        au coordinateur (voir attach_frame) ; hors POSIX, {"name": None,
+        "rows", "columns", "data": {colonne: tableau}}
+
+    Raises:
+        ValueError: Si une colonne demandée est absente ou si les noms de
+            colonnes ne sont pas uniques
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes absentes du DataFrame: {missing}")
+    if len(set(map(str, columns))) != len(columns):
+        raise ValueError("Les noms de colonnes à publier doivent être uniques")
+
+    arrays = []
+    schema_columns = []
+    for col in columns:
+        kind, array = _column_array(df[col])
+        arrays.append(array)
+        schema_columns.append({"name": str(col), "kind": kind, "dtype": array.dtype.str, "nbytes": array.nbytes})
+
+    if not SHARED_MEMORY_AVAILABLE:
+        return {
+            "name": None,
+            "rows": len(df),
+            "columns": [c["name"] for c in schema_columns],
+            "data": {c["name"]: array for c, array in zip(schema_columns, arrays)},
+        }
+
+    # Le schéma contient les décalages, qui dépendent de sa propre longueur :
+    # on le réserve avec une marge pour les chiffres des décalages
+    schema = {"version": SCHEMA_VERSION, "rows": len(df), "columns": schema_columns}
+    reserved = len(json.dumps(schema).encode("utf-8")) + 24 * (len(columns) + 1)
+    offset = _align(_PREFIX.size + reserved)
+    for column in schema_columns:
+        column["offset"] = offset
+        offset = _align(offset + column["nbytes"])
+    header = json.dumps(schema).encode("utf-8")
+    nbytes = max(offset, 1)
+
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    try:
+        _PREFIX.pack_into(shm.buf, 0, MAGIC, len(header))
+        shm.buf[_PREFIX.size:_PREFIX.size + len(header)] = header
+        for column, array in zip(schema_columns, arrays):
+            target = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=column["offset"])
+            target[...] = array
+            del target
+        handle = {"name": shm.name, "nbytes": nbytes, "rows": len(df), "columns": [c["name"] for c in schema_columns]}
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+
+    shm.close()
+    # Le segment appartient désormais au coordinateur : sans cela, le suivi
+    # des ressources le détruirait à la sortie du processus qui l'a créé
+    resource_tracker.unregister(_tracker_name(shm), "shared_memory")
+    return handle
+
+
+def _tracker_name(shm: shared_memory.SharedMemory) -> str:
+    """Nom du segment tel qu'enregistré par le suivi des ressources (avec le « / » POSIX)."""
+    return shm.name if shm.name.startswith("/") else "/" + shm.name
+
+
+def _read_schema(shm: shared_memory.SharedMemory) -> dict:
+    magic, length = _PREFIX.unpack_from(shm.buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"Le segment {shm.name} ne contient pas de DataFrame publié")
+    schema = json.loads(bytes(shm.buf[_PREFIX.size:_PREFIX.size + length]).decode("utf-8"))
+    if schema.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"Version de schéma non supportée: {schema.get('version')}")
+    return schema
+
+
+class SharedFrame:
+    """DataFrame attaché à un segment de mémoire partagée (voir attach_frame)."""
+
+    def __init__(self, handle: dict):
+        """
+        Args:
+            handle: Poignée retournée par publish_frame
+
+        Raises:
+            FileNotFoundError: Si le segment n'existe plus
+        """
+        self.name = handle["name"]
+        if self.name is None:
+            # Colonnes transmises dans la poignée (hors POSIX, voir publish_frame)
+            self._shm = None
+            self.schema = {"version": SCHEMA_VERSION, "rows": handle["rows"], "columns": handle["columns"]}
+            self.df = pd.DataFrame({
+                name: array.astype(object) if array.dtype.kind == "U" else array
+                for name, array in handle["data"].items()
+            }, copy=False)
+            return
+        self._shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            self.schema = _read_schema(self._shm)
+        except BaseException:
+            self._shm.close()
+            raise
+
+        rows = self.schema["rows"]
+        data = {}
+        for column in self.schema["columns"]:
+            dtype = np.dtype(column["dtype"])
+            array = np.ndarray((rows,), dtype=dtype, buffer=self._shm.buf, offset=column["offset"])
+            if column["kind"] == KIND_TEXT:
+                data[column["name"]] = array.astype(object)
+            else:
+                # Lecture seule : le segment peut être partagé par plusieurs lecteurs
+                array.flags.writeable = False
+                data[column["name"]] = array
+        self.df: Optional[pd.DataFrame] = pd.DataFrame(data, copy=False)
+
+    def copy(self) -> pd.DataFrame:
+        """Copie indépendante du segment, utilisable après close()."""
+        return self.df.copy(deep=True)
+
+    def close(self, unlink: bool = True) -> None:
+        """
+        Détache le DataFrame et libère le segment.
+
+        Toute vue encore référencée sur les colonnes (ex. `frame.df["TT301 °C"]`
+        conservée ailleurs) empêche le détachement ; le segment est alors libéré
+        quand ces vues disparaissent.
+
+        Args:
+            unlink: Supprime le segment (False s'il doit encore être attaché
+                    par un autre processus)
+        """
+        self.df = None
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+        if unlink:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def attach_frame(handle: dict) -> SharedFrame:
+    """
+    S'attache au segment publié par publish_frame (sans copie des colonnes
+    numériques). À utiliser comme gestionnaire de contexte.
+    """
+    return SharedFrame(handle)
+
+
+def discard_frame(handle: dict) -> None:
+    """Supprime un segment publié qui ne sera jamais attaché (ex. tâche annulée)."""
+    if handle.get("name") is None:
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=handle["name"])
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def publish_pignat_matrix(dir_root: str) -> dict:
+    """
+    Parse le CSV Pignat de `dir_root` et publie la matrice des capteurs
+    (colonnes numériques) avec la colonne Time.
+
+    Exécutée dans un processus de travail ; retourne la poignée à attacher.
+    """
+    from pignat import PignatData
+    from utils.pignat.pignat_constants import TIME
+
+    df = PignatData(dir_root).data_frame
+    columns = [col for col in df.columns if col == TIME or pd.api.types.is_numeric_dtype(df[col].dtype)]
+    return publish_frame(df, columns)
+
+
+def publish_gc_matrix(dir_root: str) -> dict:
+    """
+    Parse l'export Chromeleon online de `dir_root` et publie la matrice
+    injections × composés des aires relatives (sans la ligne des moyennes),
+    avec les colonnes Injection Name et Injection Time.
+
+    Exécutée dans un processus de travail ; retourne la poignée à attacher.
+    """
+    from chromeleon_online import ChromeleonOnline
+
+    rel_df = ChromeleonOnline(dir_root).get_relative_area_by_injection()
+    injections = rel_df.iloc[:-1].reset_index(drop=True)
+    areas = [col for col in injections.columns if col.startswith('Rel. Area (%) : ')]
+    matrix = injections[['Injection Name', 'Injection Time']].copy()
+    for col in areas:
+        matrix[col] = pd.to_numeric(injections[col], errors='coerce').astype('float64')
+    return publish_frame(matrix)
@@ -0,0 +1,40 @@
+"""
+Jointure « as-of » vectorisée entre des événements (injections GC) et un
+journal de capteurs trié par temps
+"""
+import numpy as np
+
+
+def lookback_means(keys: np.ndarray, values: np.ndarray, event_keys: np.ndarray,
+                   lookback: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Moyenne de chaque colonne de `values` sur la fenêtre [t - lookback, t]
+    précédant chaque événement t, comme un merge_asof (direction "backward")
+    suivi d'une moyenne glissante, en O(n + m log n) : sommes cumulées puis
+    deux np.searchsorted par événement.
+
+    Args:
+        keys: Instants des lignes du journal (entiers, ex. ns), triés
+        values: Tableau (n_lignes, n_colonnes) de float64 (NaN ignorés)
+        event_keys: Instants des événements (même unité que keys)
+        lookback: Durée de la fenêtre, même unité que keys (> 0)
+
+    Returns:
+        (moyennes (n_événements, n_colonnes), NaN si aucune valeur dans la
+        fenêtre ; nombre de lignes du journal dans chaque fenêtre)
+    """
+    nan = np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        # Sommes des écarts à la moyenne de la colonne : moins d'erreur
+        # d'arrondi sur des millions de lignes
+        centers = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(values.shape[1])
+    zero = np.zeros((1, values.shape[1]))
+    counts = np.concatenate((zero, np.cumsum(~nan, axis=0)))
+    sums = np.concatenate((zero, np.cumsum(np.where(nan, 0.0, values - centers), axis=0)))
+
+    lo = np.searchsorted(keys, event_keys - lookback, side="left")
+    hi = np.searchsorted(keys, event_keys, side="right")
+    n = counts[hi] - counts[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(n > 0, centers + (sums[hi] - sums[lo]) / n, np.nan)
+    return means, hi - lo
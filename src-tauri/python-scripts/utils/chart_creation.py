@@ -44,7 +44,9 @@ def create_chart_configuration(metrics_wanted: list[dict]) -> dict:
     config = {
         'want_line': False,
         'want_bar': False,
-        'selected_elements': []
+        'selected_elements': [],
+        'start_time': None,
+        'end_time': None
     }
     
     if not metrics_wanted:
@@ -74,4 +76,24 @@ def create_chart_configuration(metrics_wanted: list[dict]) -> dict:
             )
             break
     
-    return config
\ No newline at end of file
+    # Fenêtre de temps : la première métrique qui en porte une s'applique à toute la feuille
+    for metric in metrics_wanted:
+        time_range = metric.get("timeRange")
+        if time_range:
+            config['start_time'] = time_range.get("startTime")
+            config['end_time'] = time_range.get("endTime")
+            break
+    
+    return config
+
+
+def format_window_suffix(start_time=None, end_time=None) -> str:
+    """
+    Suffixe de titre décrivant la fenêtre de temps d'un rapport.
+
+    Returns:
+        " (début → fin)", ou "" si aucune borne n'est donnée
+    """
+    if start_time is None and end_time is None:
+        return ""
+    return f" ({start_time or 'début'} → {end_time or 'fin'})"
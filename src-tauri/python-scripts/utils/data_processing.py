@@ -336,4 +336,56 @@ def validate_data_availability(rel_df: pd.DataFrame, min_timepoints: int = 2) ->
         'has_numeric_data': has_numeric_data,
         'chemical_elements': chemical_elements,
         'data_rows_count': len(data_rows)
-    }
\ No newline at end of file
+    }
+
+def build_injection_rows(data_by_elements: dict) -> pd.DataFrame:
+    """
+    Lignes d'injection triées par temps : nom, heure standardisée, horodatage
+    complet et aire relative de chaque élément (sans la ligne "Moyennes").
+
+    Args:
+        data_by_elements: Dictionnaire des données par élément/composé
+
+    Returns:
+        DataFrame ['Injection Name', 'Injection Time', 'Timestamp', 'Rel. Area (%) : ...']
+
+    Raises:
+        ValueError: Si aucun élément n'est trouvé ou si les colonnes d'injection manquent
+    """
+    from .column_mapping import validate_required_columns
+    from .time_utils import parse_injection_timestamp
+
+    if not data_by_elements:
+        raise ValueError("Aucun élément chimique trouvé dans les sous-tableaux")
+
+    first_element_df = list(data_by_elements.values())[0]
+
+    required_cols = ['Injection Name', 'Injection Time']
+    is_valid, missing = validate_required_columns(first_element_df, required_cols)
+    if not is_valid:
+        raise ValueError(f"Colonnes manquantes: {missing}. "
+                         "Vérifiez que les colonnes 'Inject Time' sont présentes dans les données.")
+
+    result = first_element_df[required_cols].copy()
+    # Horodatage lu avant la standardisation en HH:MM (date et secondes perdues)
+    result['Timestamp'] = pd.to_datetime(result['Injection Time'].map(parse_injection_timestamp))
+    result = process_injection_times(result)
+
+    for element, df in data_by_elements.items():
+        col = f'Rel. Area (%) : {element}'
+        if col in df.columns:
+            result[col] = pd.to_numeric(df[col], errors='coerce').values
+
+    return sort_data_by_time(result)
+
+
+def filter_data_by_injections(data_by_elements: dict, injection_names) -> dict:
+    """
+    Restreint les sous-tableaux par élément aux injections données (ex. celles
+    d'une fenêtre de temps), pour les moyennes de temps de rétention.
+    """
+    names = set(pd.Series(injection_names).astype(str))
+    return {
+        element: df[df['Injection Name'].astype(str).isin(names)].reset_index(drop=True)
+        for element, df in data_by_elements.items()
+    }
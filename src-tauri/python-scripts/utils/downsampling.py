@@ -0,0 +1,50 @@
+"""
+Réduction du nombre de points des séries temporelles pour l'affichage
+"""
+import numpy as np
+
+
+def min_max_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices des lignes à conserver pour afficher des séries avec au plus
+    max_points points, sans perdre les pics.
+
+    Les lignes sont découpées en paquets consécutifs de même taille ; dans
+    chaque paquet on garde, pour chaque colonne, la ligne du minimum et celle
+    du maximum. La première et la dernière ligne sont toujours conservées.
+    Si le budget ne permet pas un paquet (max_points < 2 × n_colonnes + 2),
+    les lignes sont prises à pas régulier.
+
+    Args:
+        values: Tableau (n_lignes,) ou (n_lignes, n_colonnes) ; les NaN sont ignorés
+        max_points: Nombre maximal de lignes retournées (>= 2)
+
+    Returns:
+        Indices triés (sans doublons) des lignes conservées, au plus max_points
+    """
+    values = np.asarray(values, dtype="float64")
+    if values.ndim == 1:
+        values = values[:, None]
+    n_rows, n_cols = values.shape
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+
+    n_buckets = (max_points - 2) // (2 * max(n_cols, 1))
+    if n_buckets < 1:
+        return np.unique(np.linspace(0, n_rows - 1, max(max_points, 1)).round().astype(np.int64))
+    size = -(-n_rows // n_buckets)
+    padded = np.full((n_buckets * size, n_cols), np.nan)
+    padded[:n_rows] = values
+    buckets = padded.reshape(n_buckets, size, n_cols)
+
+    nan = np.isnan(buckets)
+    arg_min = np.where(nan, np.inf, buckets).argmin(axis=1)
+    arg_max = np.where(nan, -np.inf, buckets).argmax(axis=1)
+    offsets = (np.arange(n_buckets) * size)[:, None]
+
+    indices = np.concatenate([
+        (arg_min + offsets).ravel(),
+        (arg_max + offsets).ravel(),
+        [0, n_rows - 1],
+    ])
+    return np.unique(indices[indices < n_rows])
@@ -3,6 +3,7 @@ Utilities for file operations and Excel file handling
 """
 import os
 import pandas as pd
+from profiling import span
 
 
 def get_first_excel_file(dir_root: str) -> str:
@@ -50,12 +51,13 @@ def read_excel_summary(file_path: str, dtype: str = 'str') -> pd.DataFrame:
         ValueError: Si la feuille Summary ne peut pas être lue
     """
     try:
-        df = pd.read_excel(
-            file_path,
-            sheet_name="Summary",
-            header=None,
-            dtype=dtype
-        )
+        with span("file_read"):
+            df = pd.read_excel(
+                file_path,
+                sheet_name="Summary",
+                header=None,
+                dtype=dtype
+            )
         return df
     except Exception as e:
         raise ValueError(f"Impossible de lire la feuille Summary: {str(e)}")
@@ -0,0 +1,38 @@
+"""
+Empreintes de fichiers et de répertoires (stdlib uniquement, importable sans pandas)
+"""
+import hashlib
+import os
+
+
+def directory_fingerprint(dir_root: str) -> str:
+    """
+    Empreinte d'un répertoire à partir des chemins, tailles et dates de
+    modification de ses fichiers (sans lire leur contenu).
+
+    Args:
+        dir_root: Chemin du répertoire à analyser (parcouru récursivement)
+
+    Returns:
+        Empreinte hexadécimale (sha1), identique tant qu'aucun fichier ne change
+
+    Raises:
+        FileNotFoundError: Si le répertoire n'existe pas
+    """
+    if not os.path.isdir(dir_root):
+        raise FileNotFoundError(f"Le répertoire {dir_root} n'existe pas")
+
+    entries = []
+    for current, dirs, files in os.walk(dir_root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.startswith('.~lock') or name.startswith('~'):
+                continue
+            path = os.path.join(current, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append(f"{os.path.relpath(path, dir_root)}|{st.st_size}|{st.st_mtime_ns}")
+
+    return hashlib.sha1("\n".join(entries).encode("utf-8")).hexdigest()
@@ -0,0 +1,53 @@
+"""
+Intégration temporelle vectorisée (méthode des trapèzes) sur un échantillonnage irrégulier
+"""
+from typing import Optional
+
+import numpy as np
+
+
+def trapezoid_increments(values: np.ndarray, seconds: np.ndarray,
+                         max_step_s: Optional[float] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aires des trapèzes entre lignes consécutives.
+
+    Un pas dont un horodatage est illisible, qui recule dans le temps, qui
+    dépasse max_step_s (trou d'enregistrement) ou dont une valeur manque ne
+    compte pas.
+
+    Args:
+        values: Valeurs des lignes (float64, NaN = manquant)
+        seconds: Instants des lignes en secondes (NaN si illisible)
+        max_step_s: Écart maximal intégré entre deux lignes (None: pas de limite)
+
+    Returns:
+        (aires en unité × heure, durées intégrées en secondes), de longueur n - 1 ;
+        0 pour les pas ignorés
+    """
+    steps = np.diff(seconds)
+    valid = np.isfinite(steps) & (steps > 0)
+    if max_step_s is not None:
+        valid &= steps <= max_step_s
+    with np.errstate(invalid="ignore"):
+        areas = 0.5 * (values[1:] + values[:-1]) * (steps / 3600.0)
+    valid &= np.isfinite(areas)
+    return np.where(valid, areas, 0.0), np.where(valid, steps, 0.0)
+
+
+def integrate(values: np.ndarray, seconds: np.ndarray, max_step_s: Optional[float] = None) -> dict:
+    """
+    Intégrale d'une voie sur toutes ses lignes.
+
+    Returns:
+        {"total": intégrale en unité × heure, "covered_h": durée réellement
+        intégrée, "mean": moyenne pondérée par le temps sur cette durée (None
+        si elle est nulle)}
+    """
+    areas, steps = trapezoid_increments(values, seconds, max_step_s)
+    total = float(areas.sum())
+    covered_h = float(steps.sum()) / 3600.0
+    return {
+        "total": total,
+        "covered_h": covered_h,
+        "mean": total / covered_h if covered_h > 0 else None,
+    }
@@ -0,0 +1,208 @@
+"""
+Contrôle qualité vectorisé des journaux Pignat : valeurs manquantes, trous
+d'horodatage, capteurs figés et valeurs hors plage
+"""
+from typing import Optional
+
+import numpy as np
+
+from utils.pignat.pignat_constants import (
+    GAP_TOLERANCE,
+    FLAT_MIN_DURATION_S,
+    MAX_QUALITY_SPANS,
+    VALID_RANGES_BY_UNIT,
+)
+
+
+def find_runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Séquences consécutives de True d'un masque booléen.
+
+    Returns:
+        (débuts, fins) des séquences, fins exclues
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def valid_range_for(column: str) -> Optional[tuple]:
+    """Plage plausible (min, max) d'une colonne d'après l'unité de son nom, ou None."""
+    unit = column.rsplit(' ', 1)[-1] if ' ' in column else None
+    return VALID_RANGES_BY_UNIT.get(unit)
+
+
+def _format_times(timestamps: Optional[np.ndarray], has_date: bool):
+    """Fonction indice -> horodatage texte (None si l'horodatage est absent)."""
+    if timestamps is None:
+        return lambda i: None
+    text = np.datetime_as_string(timestamps, unit='s')
+
+    def fmt(i: int):
+        value = text[i]
+        if value == 'NaT':
+            return None
+        return value.replace('T', ' ') if has_date else value.split('T')[1]
+    return fmt
+
+
+def _top_spans(starts, ends, durations, fmt, extra=None) -> list[dict]:
+    """Les MAX_QUALITY_SPANS plus longues périodes, dans l'ordre chronologique."""
+    order = np.argsort(-durations, kind='stable')[:MAX_QUALITY_SPANS]
+    spans = []
+    for i in np.sort(order):
+        span = {
+            "start": fmt(int(starts[i])),
+            "end": fmt(int(ends[i])),
+            "rows": int(ends[i] - starts[i] + 1),
+            "duration_s": None if np.isnan(durations[i]) else round(float(durations[i]), 1),
+        }
+        if extra is not None:
+            span.update(extra(i))
+        spans.append(span)
+    return spans
+
+
+def compute_data_quality(
+    values: np.ndarray,
+    sensors: list[str],
+    timestamps: Optional[np.ndarray] = None,
+    has_date: bool = True,
+    nominal_period_s: Optional[float] = None,
+    flat_min_duration_s: float = FLAT_MIN_DURATION_S,
+) -> dict:
+    """
+    Rapport qualité d'un journal de capteurs.
+
+    Args:
+        values: Tableau (n_lignes, n_capteurs) de float64 (NaN = manquant)
+        sensors: Noms des capteurs (colonnes de values)
+        timestamps: Horodatages datetime64 des lignes (NaT si illisible), ou None
+        has_date: Les horodatages portent une vraie date (sinon heures seules)
+        nominal_period_s: Période d'échantillonnage attendue (défaut: médiane des écarts)
+        flat_min_duration_s: Durée minimale d'une valeur figée signalée
+
+    Returns:
+        {"rows", "start", "end", "sampling": {...trous d'horodatage},
+        "sensors": {capteur: {...}}, "summary": {...}}
+    """
+    n_rows = values.shape[0]
+    fmt = _format_times(timestamps, has_date)
+
+    if timestamps is not None and n_rows:
+        valid_ts = ~np.isnat(timestamps)
+        seconds = np.full(n_rows, np.nan)
+        seconds[valid_ts] = (timestamps[valid_ts] - timestamps[valid_ts][0]) / np.timedelta64(1, 's')
+    else:
+        valid_ts = np.zeros(n_rows, dtype=bool)
+        seconds = np.full(n_rows, np.nan)
+
+    # Horodatage et trous d'enregistrement
+    deltas = np.diff(seconds)
+    finite = np.isfinite(deltas)
+    if nominal_period_s is None:
+        positive = deltas[finite & (deltas > 0)]
+        nominal_period_s = float(np.median(positive)) if len(positive) else None
+
+    sampling = {
+        "nominal_period_s": nominal_period_s,
+        "invalid_timestamps": int(n_rows - valid_ts.sum()),
+        "backward_steps": int((deltas[finite] < 0).sum()),
+        "gaps": {"count": 0, "missing_samples": 0, "longest_s": None, "spans": []},
+    }
+    if nominal_period_s:
+        gap_idx = np.flatnonzero(finite & (deltas > GAP_TOLERANCE * nominal_period_s))
+        gap_durations = deltas[gap_idx]
+        missing = np.maximum(np.rint(gap_durations / nominal_period_s).astype(np.int64) - 1, 0)
+        sampling["gaps"] = {
+            "count": int(len(gap_idx)),
+            "missing_samples": int(missing.sum()),
+            "longest_s": round(float(gap_durations.max()), 1) if len(gap_idx) else None,
+            "spans": _top_spans(gap_idx, gap_idx + 1, gap_durations, fmt,
+                                extra=lambda i: {"missing_samples": int(missing[i])}),
+        }
+
+    # Capteurs
+    nan_mask = np.isnan(values)
+    nan_counts = nan_mask.sum(axis=0)
+    sensors_report = {}
+    for j, sensor in enumerate(sensors):
+        column = values[:, j]
+        report = {
+            "nan_count": int(nan_counts[j]),
+            "nan_ratio": round(float(nan_counts[j]) / n_rows, 4) if n_rows else 0.0,
+            "missing_runs": 0,
+            "longest_missing_run": None,
+            "constant": False,
+            "flat_spans": {"count": 0, "longest_s": None, "spans": []},
+            "out_of_range": None,
+        }
+
+        if nan_counts[j]:
+            starts, ends = find_runs(nan_mask[:, j])
+            lengths = ends - starts
+            longest = int(np.argmax(lengths))
+            report["missing_runs"] = int(len(starts))
+            report["longest_missing_run"] = {
+                "start": fmt(int(starts[longest])),
+                "end": fmt(int(ends[longest] - 1)),
+                "rows": int(lengths[longest]),
+            }
+
+        present = column[~nan_mask[:, j]]
+        if len(present) == 0:
+            sensors_report[sensor] = report
+            continue
+
+        if present.min() == present.max():
+            # Voie inutilisée ou capteur figé sur tout l'essai
+            report["constant"] = True
+        else:
+            # Paires de lignes consécutives de même valeur (un NaN coupe la séquence)
+            equal = column[1:] == column[:-1]
+            starts, ends = find_runs(equal)
+            # Séquence de paires [s, e[ -> lignes s..e de même valeur
+            durations = seconds[ends] - seconds[starts]
+            flat = np.isfinite(durations) & (durations >= flat_min_duration_s)
+            if flat.any():
+                report["flat_spans"] = {
+                    "count": int(flat.sum()),
+                    "longest_s": round(float(durations[flat].max()), 1),
+                    "spans": _top_spans(starts[flat], ends[flat], durations[flat], fmt,
+                                        extra=lambda i, s=starts[flat]: {"value": float(column[s[i]])}),
+                }
+
+        bounds = valid_range_for(sensor)
+        if bounds is not None:
+            low, high = bounds
+            outside = np.zeros(len(column), dtype=bool)
+            if low is not None:
+                outside |= column < low
+            if high is not None:
+                outside |= column > high
+            count = int(outside.sum())
+            report["out_of_range"] = {
+                "range": [low, high],
+                "count": count,
+                "first": fmt(int(np.argmax(outside))) if count else None,
+                "min": float(present.min()),
+                "max": float(present.max()),
+            }
+        sensors_report[sensor] = report
+
+    valid_seconds = np.flatnonzero(valid_ts)
+    return {
+        "rows": int(n_rows),
+        "start": fmt(int(valid_seconds[0])) if len(valid_seconds) else None,
+        "end": fmt(int(valid_seconds[-1])) if len(valid_seconds) else None,
+        "sampling": sampling,
+        "sensors": sensors_report,
+        "summary": {
+            "gap_count": sampling["gaps"]["count"],
+            "sensors_with_missing": [s for s, r in sensors_report.items() if r["nan_count"]],
+            "constant_sensors": [s for s, r in sensors_report.items() if r["constant"]],
+            "stuck_sensors": [s for s, r in sensors_report.items() if r["flat_spans"]["count"]],
+            "out_of_range_sensors": [
+                s for s, r in sensors_report.items() if r["out_of_range"] and r["out_of_range"]["count"]
+            ],
+        },
+    }
@@ -0,0 +1,71 @@
+"""
+Évaluation vectorisée des voies calculées Pignat (DERIVED_CHANNELS)
+"""
+from typing import Optional
+
+import numpy as np
+
+from utils.integration import trapezoid_increments
+from utils.pignat.pignat_constants import DERIVED_CHANNELS, GAP_TOLERANCE
+
+
+def _difference(inputs: list[np.ndarray], seconds) -> np.ndarray:
+    return inputs[0] - inputs[1]
+
+
+def _sum(inputs: list[np.ndarray], seconds) -> np.ndarray:
+    # NaN si une des entrées manque, comme une somme de colonnes pandas
+    return np.column_stack(inputs).sum(axis=1)
+
+
+def _spread(inputs: list[np.ndarray], seconds) -> np.ndarray:
+    stacked = np.column_stack(inputs)
+    return stacked.max(axis=1) - stacked.min(axis=1)
+
+
+def _time_integral(inputs: list[np.ndarray], seconds) -> np.ndarray:
+    """Intégrale cumulée (méthode des trapèzes) en unité de l'entrée × heure."""
+    values = inputs[0]
+    if seconds is None or len(values) == 0:
+        return np.full(len(values), np.nan)
+    # Un horodatage illisible, un retour en arrière, une valeur manquante ou
+    # un trou d'enregistrement (comme pour get_integrated_totals) n'ajoutent
+    # rien au cumul
+    steps = np.diff(seconds)
+    steps = steps[np.isfinite(steps) & (steps > 0)]
+    max_step_s = GAP_TOLERANCE * float(np.median(steps)) if len(steps) else None
+    increments, _ = trapezoid_increments(values, seconds, max_step_s)
+    return np.concatenate(([0.0], np.cumsum(increments)))
+
+
+OPERATIONS = {
+    'difference': _difference,
+    'sum': _sum,
+    'spread': _spread,
+    'time_integral': _time_integral,
+}
+
+
+def evaluate_channel(name: str, inputs: list[np.ndarray], seconds: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Calcule une voie dérivée sur des colonnes NumPy.
+
+    Args:
+        name: Nom de la voie (clé de DERIVED_CHANNELS)
+        inputs: Colonnes float64 des entrées, dans l'ordre de DERIVED_CHANNELS[name]['inputs']
+        seconds: Secondes depuis le début du journal (NaN si illisible),
+                 requises par les opérations dépendant du temps
+
+    Returns:
+        Tableau float64 de même longueur que les entrées
+
+    Raises:
+        ValueError: Si la voie ou son opération est inconnue
+    """
+    spec = DERIVED_CHANNELS.get(name)
+    if spec is None:
+        raise ValueError(f"Voie calculée inconnue: {name}")
+    operation = OPERATIONS.get(spec['op'])
+    if operation is None:
+        raise ValueError(f"Opération inconnue pour {name}: {spec['op']} (attendues: {', '.join(OPERATIONS)})")
+    return operation(inputs, seconds)
@@ -1,3 +1,4 @@
+DATE = 'Date'
 TIME = 'Time'
 TT301 = 'TT301 °C'
 TT302 = 'TT302 °C'
@@ -6,6 +7,27 @@ TT206 = 'TT206 °C'
 FT240 = 'FT240'
 PI177 = 'PI177 bar'
 PT230 = 'PT230 bar'
+WT301 = 'WT301 kW?'
+WT302 = 'WT302 kW?'
+WT303 = 'WT303 kW?'
+FT211 = 'FT211 L/h'
+FT221 = 'FT221 L/h'
+
+# Voies calculées, utilisables comme des colonnes du CSV. Chaque voie est
+# évaluée une seule fois par chargement (voir utils/pignat/derived_channels.py) ;
+# opérations: difference (a - b), sum, spread (max - min), time_integral
+# (cumul par la méthode des trapèzes, en unité × heure)
+DELTA_PRESSURE = f"Delta_Pression_{PI177}_minus_{PT230}"
+INDUCTOR_POWER_TOTAL = 'WT301-WT303 total kW?'
+INDUCTOR_TEMPERATURE_SPREAD = 'Écart TT301-TT303 °C'
+FT240_CUMULATIVE = 'FT240 cumulé'
+
+DERIVED_CHANNELS = {
+    DELTA_PRESSURE: {'op': 'difference', 'inputs': [PI177, PT230]},
+    INDUCTOR_POWER_TOTAL: {'op': 'sum', 'inputs': [WT301, WT302, WT303]},
+    INDUCTOR_TEMPERATURE_SPREAD: {'op': 'spread', 'inputs': [TT301, TT302, TT303]},
+    FT240_CUMULATIVE: {'op': 'time_integral', 'inputs': [FT240]},
+}
 
 # Internal metric names (used for API communication - NO ACCENTS to avoid serialization issues)
 TEMPERATURE_DEPENDING_TIME = 'temperature_time'
@@ -13,6 +35,10 @@ DEBIMETRIC_RESPONSE_DEPENDING_TIME = 'debimetric_time'
 PRESSURE_PYROLYSEUR_DEPENDING_TIME = 'pressure_pyrolyseur_time'
 PRESSURE_POMPE_DEPENDING_TIME = 'pressure_pump_time'
 DELTA_PRESSURE_DEPENDING_TIME = 'delta_pressure_time'
+INDUCTOR_POWER_DEPENDING_TIME = 'inductor_power_time'
+INDUCTOR_TEMPERATURE_SPREAD_DEPENDING_TIME = 'inductor_temperature_spread_time'
+CUMULATIVE_FLOW_DEPENDING_TIME = 'cumulative_flow_time'
+INTEGRATED_TOTALS = 'integrated_totals'
 
 # Display titles for Excel (with accents and special characters)
 TEMPERATURE_DISPLAY_TITLE = 'Suivi de Température des inducteurs'
@@ -20,6 +46,10 @@ DEBIMETRIC_DISPLAY_TITLE = 'Suivi du débit massique'
 PRESSURE_PYROLYSEUR_DISPLAY_TITLE = 'Pression dans le pyrolyseur'
 PRESSURE_POMPE_DISPLAY_TITLE = 'Pression en sortie de pompe'
 DELTA_PRESSURE_DISPLAY_TITLE = 'DP (Pyrolyseur – Pompe)'
+INDUCTOR_POWER_DISPLAY_TITLE = 'Puissance totale des inducteurs'
+INDUCTOR_TEMPERATURE_SPREAD_DISPLAY_TITLE = 'Écart de température des inducteurs'
+CUMULATIVE_FLOW_DISPLAY_TITLE = 'Débit massique cumulé'
+INTEGRATED_TOTALS_DISPLAY_TITLE = 'Totaux intégrés'
 
 # Mapping internal IDs to display names
 DISPLAY_NAME_MAPPING = {
@@ -28,6 +58,10 @@ DISPLAY_NAME_MAPPING = {
     PRESSURE_PYROLYSEUR_DEPENDING_TIME: PRESSURE_PYROLYSEUR_DISPLAY_TITLE,
     PRESSURE_POMPE_DEPENDING_TIME: PRESSURE_POMPE_DISPLAY_TITLE,
     DELTA_PRESSURE_DEPENDING_TIME: DELTA_PRESSURE_DISPLAY_TITLE,
+    INDUCTOR_POWER_DEPENDING_TIME: INDUCTOR_POWER_DISPLAY_TITLE,
+    INDUCTOR_TEMPERATURE_SPREAD_DEPENDING_TIME: INDUCTOR_TEMPERATURE_SPREAD_DISPLAY_TITLE,
+    CUMULATIVE_FLOW_DEPENDING_TIME: CUMULATIVE_FLOW_DISPLAY_TITLE,
+    INTEGRATED_TOTALS: INTEGRATED_TOTALS_DISPLAY_TITLE,
 }
 
 DATA_REQUIRED = [TIME, TT301, TT302, TT303, TT206, FT240, PI177, PT230]
@@ -52,5 +86,101 @@ GRAPHS = [
     {
         'name': DELTA_PRESSURE_DEPENDING_TIME,
         'columns': [TIME, PI177, PT230]
+    },
+    {
+        'name': INDUCTOR_POWER_DEPENDING_TIME,
+        'columns': [TIME, WT301, WT302, WT303]
+    },
+    {
+        'name': INDUCTOR_TEMPERATURE_SPREAD_DEPENDING_TIME,
+        'columns': [TIME, TT301, TT302, TT303]
+    },
+    {
+        'name': CUMULATIVE_FLOW_DEPENDING_TIME,
+        'columns': [TIME, FT240]
+    },
+    {
+        # Tableau de totaux (pas de graphique), voir INTEGRATED_CHANNELS
+        'name': INTEGRATED_TOTALS,
+        'columns': [TIME, FT240]
     }
-]
\ No newline at end of file
+]
+
+# Colonnes lues (sources) et tracées (y_axis, éventuellement calculées) par
+# chaque métrique ; une métrique de GRAPHS déclarée ici n'a pas besoin de
+# méthode dédiée dans PignatData
+METRIC_SPECS = {
+    TEMPERATURE_DEPENDING_TIME: {
+        'sources': [TT301, TT302, TT303, TT206],
+        'y_axis': [TT301, TT302, TT303, TT206],
+    },
+    DEBIMETRIC_RESPONSE_DEPENDING_TIME: {'sources': [FT240], 'y_axis': [FT240]},
+    PRESSURE_PYROLYSEUR_DEPENDING_TIME: {'sources': [PI177], 'y_axis': [PI177]},
+    PRESSURE_POMPE_DEPENDING_TIME: {'sources': [PT230], 'y_axis': [PT230]},
+    DELTA_PRESSURE_DEPENDING_TIME: {'sources': [PI177, PT230], 'y_axis': [DELTA_PRESSURE]},
+    INDUCTOR_POWER_DEPENDING_TIME: {
+        'sources': [WT301, WT302, WT303],
+        'y_axis': [INDUCTOR_POWER_TOTAL],
+    },
+    INDUCTOR_TEMPERATURE_SPREAD_DEPENDING_TIME: {
+        'sources': [TT301, TT302, TT303],
+        'y_axis': [INDUCTOR_TEMPERATURE_SPREAD],
+    },
+    CUMULATIVE_FLOW_DEPENDING_TIME: {'sources': [FT240], 'y_axis': [FT240_CUMULATIVE]},
+}
+
+# Voies intégrées sur la fenêtre de temps (commande INTEGRATED_TOTALS et
+# tableau "Totaux intégrés" de la feuille Pignat) ; FT240 est en kg/h
+INTEGRATED_CHANNELS = [
+    {'channel': FT240, 'label': 'Masse alimentée', 'unit': 'kg', 'mean_unit': 'kg/h'},
+    {'channel': INDUCTOR_POWER_TOTAL, 'label': 'Énergie des inducteurs', 'unit': 'kWh', 'mean_unit': 'kW'},
+    {'channel': FT211, 'label': 'Volume FT211', 'unit': 'L', 'mean_unit': 'L/h'},
+    {'channel': FT221, 'label': 'Volume FT221', 'unit': 'L', 'mean_unit': 'L/h'},
+]
+
+# Détection des régimes stabilisés (commande STEADY_STATE)
+STEADY_STATE_CHANNELS = [TT301, TT302, TT303, TT206, FT240]
+# Fenêtre glissante (s) et durée minimale par défaut d'une période stable
+STEADY_STATE_WINDOW_S = 900
+# Part minimale des échantillons attendus dans une fenêtre (trous d'enregistrement)
+STEADY_STATE_MIN_COVERAGE = 0.8
+# Écart-type toléré sur la fenêtre : par voie, sinon selon l'unité en fin de
+# nom de colonne, sinon STEADY_STATE_RELATIVE_STD × |moyenne|
+STEADY_STATE_STD_BY_CHANNEL = {
+    # FT240 est enregistré au millième : le bruit de quantification domine
+    FT240: 0.0005,
+}
+STEADY_STATE_STD_BY_UNIT = {
+    '°C': 2.0,
+    'bar': 0.05,
+}
+STEADY_STATE_RELATIVE_STD = 0.05
+# Nombre maximal de périodes retournées (les plus longues)
+MAX_STEADY_WINDOWS = 10
+
+# Conditions opératoires rattachées à chaque injection GC-Online (commande
+# INJECTION_CONDITIONS et feuille "GC + Pignat")
+CONDITION_CHANNELS = [TT301, TT302, TT303, FT240, PI177, PT230]
+# Fenêtre (s) de moyenne des capteurs avant chaque injection
+INJECTION_LOOKBACK_S = 300
+INJECTION_CONDITIONS_SHEET_TITLE = 'GC + Pignat'
+
+# Pas du rééchantillonnage des tableaux de la feuille Pignat (s)
+RESAMPLE_PERIOD_S = 60
+
+# Contrôle qualité des journaux (commande DATA_QUALITY)
+MILLISECOND = 'Millisecond'
+DATA_QUALITY_SHEET_TITLE = 'Data quality'
+# Un écart entre deux horodatages est un trou s'il dépasse GAP_TOLERANCE × période nominale
+GAP_TOLERANCE = 1.5
+# Durée minimale (s) d'une valeur figée pour signaler un capteur bloqué
+FLAT_MIN_DURATION_S = 600
+# Nombre maximal de périodes détaillées par liste (trous, valeurs figées...)
+MAX_QUALITY_SPANS = 10
+# Plages physiquement plausibles, selon l'unité en fin de nom de colonne
+VALID_RANGES_BY_UNIT = {
+    '°C': (-50.0, 1300.0),
+    'bar': (-1.5, 100.0),
+    '%': (0.0, 100.0),
+    'L/h': (0.0, None),
+}
@@ -0,0 +1,151 @@
+"""
+Détection vectorisée des régimes stabilisés d'un journal Pignat : moyennes et
+variances glissantes sur une fenêtre de temps, par sommes cumulées (O(n))
+"""
+from typing import Optional
+
+import numpy as np
+
+from utils.pignat.pignat_constants import (
+    STEADY_STATE_MIN_COVERAGE,
+    STEADY_STATE_RELATIVE_STD,
+    STEADY_STATE_STD_BY_CHANNEL,
+    STEADY_STATE_STD_BY_UNIT,
+)
+
+
+def std_tolerance(column: str) -> Optional[float]:
+    """Écart-type absolu toléré pour la voie ou son unité (None: tolérance relative)."""
+    if column in STEADY_STATE_STD_BY_CHANNEL:
+        return STEADY_STATE_STD_BY_CHANNEL[column]
+    unit = column.rsplit(' ', 1)[-1] if ' ' in column else None
+    return STEADY_STATE_STD_BY_UNIT.get(unit)
+
+
+def continuous_seconds(seconds: np.ndarray, window_s: float) -> np.ndarray:
+    """
+    Instants croissants utilisables par np.searchsorted : un horodatage
+    illisible ou un retour en arrière (passage de minuit sans date) devient
+    un saut de 2 × window_s, qu'aucune fenêtre ne franchit.
+    """
+    if len(seconds) == 0:
+        return np.asarray(seconds, dtype="float64")
+    steps = np.diff(seconds)
+    steps = np.where(np.isfinite(steps) & (steps >= 0), steps, 2.0 * window_s)
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+
+def _prefix_sums(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(centres, sommes cumulées du nombre, des valeurs centrées et de leurs carrés), NaN ignorés."""
+    nan = np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        # Centrer chaque colonne limite la perte de précision de la somme des carrés
+        centers = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(values.shape[1])
+    centered = np.where(nan, 0.0, values - centers)
+    zero = np.zeros((1, values.shape[1]))
+    counts = np.concatenate((zero, np.cumsum(~nan, axis=0)))
+    sums = np.concatenate((zero, np.cumsum(centered, axis=0)))
+    squares = np.concatenate((zero, np.cumsum(centered ** 2, axis=0)))
+    return centers, counts, sums, squares
+
+
+def _range_stats(prefix, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(nombre, moyenne, écart-type) de chaque colonne sur les lignes [starts, ends[."""
+    centers, counts, sums, squares = prefix
+    n = counts[ends] - counts[starts]
+    s1 = sums[ends] - sums[starts]
+    s2 = squares[ends] - squares[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, centers + s1 / n, np.nan)
+        variance = np.where(n > 1, (s2 - s1 * s1 / n) / (n - 1), np.nan)
+    return n, mean, np.sqrt(np.maximum(variance, 0.0))
+
+
+def find_steady_windows(
+    values: np.ndarray,
+    channels: list[str],
+    seconds: np.ndarray,
+    window_s: float,
+    min_duration_s: float,
+    nominal_period_s: Optional[float] = None,
+) -> dict:
+    """
+    Périodes où toutes les voies sont stables.
+
+    Une ligne est stable si, sur la fenêtre glissante de window_s secondes qui
+    se termine à cette ligne, chaque voie a assez de valeurs
+    (STEADY_STATE_MIN_COVERAGE × window_s / période nominale) et un
+    écart-type sous sa tolérance (par voie ou unité, sinon
+    STEADY_STATE_RELATIVE_STD × |moyenne|). Les fenêtres des lignes stables sont réunies en périodes,
+    coupées aux trous d'enregistrement de plus de window_s.
+
+    Args:
+        values: Tableau (n_lignes, n_voies) de float64 (NaN = manquant)
+        channels: Noms des voies (colonnes de values)
+        seconds: Instants des lignes en secondes (NaN si illisible)
+        window_s: Durée de la fenêtre glissante
+        min_duration_s: Durée minimale d'une période retournée
+        nominal_period_s: Période d'échantillonnage (défaut: médiane des écarts)
+
+    Returns:
+        {"nominal_period_s", "stable_ratio": part des lignes en régime stabilisé,
+        "windows": [{"start_row", "end_row" (inclus), "duration_s", "rows",
+        "channels": {voie: {"mean", "std"}}}] par ordre chronologique}
+    """
+    n_rows = values.shape[0]
+    instants = continuous_seconds(seconds, window_s)
+    steps = np.diff(instants)
+    if nominal_period_s is None:
+        positive = steps[(steps > 0) & (steps <= window_s)]
+        nominal_period_s = float(np.median(positive)) if len(positive) else None
+    if n_rows == 0 or not nominal_period_s:
+        return {"nominal_period_s": nominal_period_s, "stable_ratio": 0.0, "windows": []}
+
+    prefix = _prefix_sums(values)
+    ends = np.arange(1, n_rows + 1)
+    starts = np.searchsorted(instants, instants - window_s, side="left")
+    n, mean, std = _range_stats(prefix, starts, ends)
+
+    absolute = np.array([std_tolerance(c) for c in channels], dtype="float64")
+    tolerance = np.where(np.isnan(absolute), STEADY_STATE_RELATIVE_STD * np.abs(mean), absolute)
+    min_rows = max(2, int(np.ceil(STEADY_STATE_MIN_COVERAGE * window_s / nominal_period_s)))
+    stable = ((n >= min_rows) & (std <= tolerance)).all(axis=1)
+
+    # Réunion des fenêtres [starts[i], i] des lignes stables (tableau de différences)
+    rows = np.flatnonzero(stable)
+    delta = np.bincount(starts[rows], minlength=n_rows + 1) - np.bincount(rows + 1, minlength=n_rows + 1)
+    covered = np.cumsum(delta)[:n_rows] > 0
+
+    # Une période ne franchit pas un trou de plus de window_s
+    segment = np.concatenate(([0], np.cumsum(steps > window_s)))
+    key = np.where(covered, segment, -1)
+    boundaries = np.flatnonzero(key[1:] != key[:-1]) + 1
+    run_starts = np.concatenate(([0], boundaries))
+    run_ends = np.concatenate((boundaries, [n_rows]))
+    keep = key[run_starts] >= 0
+    run_starts, run_ends = run_starts[keep], run_ends[keep]
+    durations = instants[run_ends - 1] - instants[run_starts]
+    keep = durations >= min_duration_s
+    run_starts, run_ends, durations = run_starts[keep], run_ends[keep], durations[keep]
+
+    _, window_mean, window_std = _range_stats(prefix, run_starts, run_ends)
+    windows = []
+    for i in range(len(run_starts)):
+        windows.append({
+            "start_row": int(run_starts[i]),
+            "end_row": int(run_ends[i] - 1),
+            "duration_s": round(float(durations[i]), 1),
+            "rows": int(run_ends[i] - run_starts[i]),
+            "channels": {
+                channel: {
+                    "mean": None if np.isnan(window_mean[i, j]) else float(window_mean[i, j]),
+                    "std": None if np.isnan(window_std[i, j]) else float(window_std[i, j]),
+                }
+                for j, channel in enumerate(channels)
+            },
+        })
+    return {
+        "nominal_period_s": nominal_period_s,
+        "stable_ratio": round(float(covered.mean()), 4),
+        "windows": windows,
+    }
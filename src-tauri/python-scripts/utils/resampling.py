@@ -0,0 +1,73 @@
+"""
+Agrégation par intervalles de temps en une seule passe (np.*.reduceat)
+"""
+import numpy as np
+
+AGGREGATES = ("mean", "min", "max", "std", "count")
+
+
+def resample_bins(keys: np.ndarray, values: np.ndarray, period: int, aggregates=("mean",)) -> dict:
+    """
+    Agrège toutes les colonnes de `values` par intervalles de `period`, en une
+    passe : les lignes sont triées par intervalle puis chaque agrégat est une
+    réduction np.*.reduceat sur les bornes des intervalles. Les NaN sont
+    ignorés, comme avec DataFrame.resample().
+
+    Args:
+        keys: Instants des lignes (entiers, ex. ns), même unité que period
+        values: Tableau (n_lignes, n_colonnes) de float64
+        period: Durée d'un intervalle ; les bornes sont les multiples de period
+        aggregates: Agrégats voulus parmi AGGREGATES
+
+    Returns:
+        {"bins": début de chaque intervalle non vide (trié), "count": nombre
+        de valeurs non NaN par intervalle et colonne, agrégat: tableau
+        (n_intervalles, n_colonnes)} ; NaN si l'intervalle n'a aucune valeur
+        (et, pour std, moins de deux)
+
+    Raises:
+        ValueError: Si un agrégat est inconnu
+    """
+    unknown = [a for a in aggregates if a not in AGGREGATES]
+    if unknown:
+        raise ValueError(f"Agrégats inconnus: {unknown} (attendus: {', '.join(AGGREGATES)})")
+
+    bins = np.floor_divide(keys, period)
+    order = np.argsort(bins, kind="stable")
+    bins = bins[order]
+    values = values[order]
+
+    if len(bins) == 0:
+        empty = np.empty((0, values.shape[1]))
+        return {"bins": bins, "count": empty, **{a: empty for a in aggregates}}
+
+    starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+    nan = np.isnan(values)
+    counts = np.add.reduceat(~nan, starts, axis=0).astype("float64")
+    result = {"bins": bins[starts] * period, "count": counts}
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sizes = np.diff(np.append(starts, len(bins)))
+        mean = None
+        if "mean" in aggregates or "std" in aggregates:
+            # Somme des écarts à la première valeur de l'intervalle : moins
+            # d'erreur d'arrondi qu'une somme directe (valeurs constantes exactes)
+            reference = values[starts]
+            reference = np.where(np.isnan(reference), 0.0, reference)
+            shifted = np.where(nan, 0.0, values - np.repeat(reference, sizes, axis=0))
+            sums = np.add.reduceat(shifted, starts, axis=0)
+            mean = np.where(counts > 0, reference + sums / counts, np.nan)
+        if "mean" in aggregates:
+            result["mean"] = mean
+        if "min" in aggregates:
+            result["min"] = np.fmin.reduceat(values, starts, axis=0)
+        if "max" in aggregates:
+            result["max"] = np.fmax.reduceat(values, starts, axis=0)
+        if "std" in aggregates:
+            # Deuxième passe sur les écarts à la moyenne (plus stable que la somme des carrés)
+            deviations = values - np.repeat(mean, sizes, axis=0)
+            squares = np.add.reduceat(np.where(nan, 0.0, deviations ** 2), starts, axis=0)
+            result["std"] = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+    if "count" in aggregates:
+        result["count"] = counts
+    return result
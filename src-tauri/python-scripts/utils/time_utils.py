@@ -129,4 +129,127 @@ def calculate_total_time_duration(first_time_str, last_time_str):
         m, _ = divmod(rem, 60)
         return f"{h:02d}:{m:02d}"
     except:
-        return "n.a."
\ No newline at end of file
+        return "n.a."
+
+def parse_injection_timestamp(time_value):
+    """
+    Horodatage complet d'un temps d'injection brut : contrairement à
+    standardize_injection_time, la date et les secondes sont conservées.
+
+    Args:
+        time_value: Valeur de temps dans différents formats possibles
+
+    Returns:
+        pd.Timestamp ; une heure sans date est placée au 1970-01-01 ; NaT si illisible
+
+    Examples:
+        >>> parse_injection_timestamp("2025-01-23 14:30:45")
+        Timestamp('2025-01-23 14:30:45')
+        >>> parse_injection_timestamp("23/01/2025 14:30")
+        Timestamp('2025-01-23 14:30:00')
+        >>> parse_injection_timestamp("14:30")
+        Timestamp('1970-01-01 14:30:00')
+    """
+    from datetime import datetime, time
+
+    if isinstance(time_value, datetime):
+        return pd.Timestamp(time_value)
+    if isinstance(time_value, time):
+        return pd.Timestamp(0) + pd.Timedelta(hours=time_value.hour, minutes=time_value.minute,
+                                              seconds=time_value.second)
+    if pd.isna(time_value) or not str(time_value).strip():
+        return pd.NaT
+
+    time_str = str(time_value).strip()
+    time_match = re.search(r'(\d{1,2}):(\d{2})(?::(\d{2}))?', time_str)
+    if not time_match:
+        return pd.NaT
+    hours, minutes, seconds = (int(v or 0) for v in time_match.groups())
+    offset = pd.Timedelta(hours=hours, minutes=minutes, seconds=seconds)
+
+    date_part = time_str[:time_match.start()].strip()
+    if not date_part:
+        return pd.Timestamp(0) + offset
+    # JJ/MM/AAAA côté Chromeleon, mais AAAA/MM/JJ reste année-mois-jour
+    dayfirst = '/' in date_part and not re.match(r'\d{4}/', date_part)
+    date = pd.to_datetime(date_part, errors='coerce', dayfirst=dayfirst)
+    return pd.NaT if pd.isna(date) else date.normalize() + offset
+
+
+def injection_time_index(timestamps: pd.Series) -> dict:
+    """
+    Index trié des injections pour filtrer des fenêtres de temps par
+    recherche dichotomique, construit une seule fois par fichier.
+
+    Args:
+        timestamps: Horodatages des injections (voir parse_injection_timestamp)
+
+    Returns:
+        {"dated": toutes les injections lisibles portent une date,
+        "datetime"/"time_of_day": (positions triées, clés ns triées) des
+        injections lisibles}
+    """
+    import numpy as np
+
+    values = pd.to_datetime(timestamps).to_numpy(dtype="datetime64[ns]")
+    rows = np.flatnonzero(~np.isnat(values))
+    values = values[rows]
+    time_of_day = values - values.astype("datetime64[D]")
+    index = {"dated": bool(len(values)) and bool((values.astype("datetime64[D]") != np.datetime64(0, 'D')).all())}
+    for key, keys in (("datetime", values.astype("int64")), ("time_of_day", time_of_day.astype("int64"))):
+        order = np.argsort(keys, kind="stable")
+        index[key] = (rows[order], keys[order])
+    return index
+
+
+def select_injection_window(index: dict, start_time=None, end_time=None):
+    """
+    Positions (croissantes) des injections comprises dans [start_time, end_time].
+
+    Les bornes datées sont comparées aux horodatages complets si toutes les
+    injections sont datées ; sinon seule l'heure compte, comme pour les
+    timeRange Pignat : une fenêtre en heures dont le début suit la fin
+    traverse minuit (ex. 23:00 -> 01:00).
+
+    Args:
+        index: Résultat de injection_time_index
+        start_time, end_time: Bornes optionnelles ("HH:MM[:SS]" ou date et heure)
+
+    Returns:
+        Tableau d'indices de lignes, ou None si aucune borne n'est donnée
+
+    Raises:
+        ValueError: Si une borne est illisible ou si la fenêtre ne contient
+            aucune injection
+    """
+    import numpy as np
+
+    if start_time is None and end_time is None:
+        return None
+
+    bounds = []
+    for value in (start_time, end_time):
+        if value is None:
+            bounds.append(None)
+            continue
+        parsed = parse_injection_timestamp(value)
+        if pd.isna(parsed):
+            raise ValueError(f"Borne de fenêtre de temps illisible: {value}")
+        bounds.append(parsed)
+
+    dated_bounds = all(b is None or b.normalize() != pd.Timestamp(0) for b in bounds)
+    use_datetime = index["dated"] and dated_bounds
+    rows, keys = index["datetime" if use_datetime else "time_of_day"]
+
+    def key_of(bound: pd.Timestamp) -> int:
+        if use_datetime:
+            return bound.value
+        return (bound - bound.normalize()).value
+
+    lo = 0 if bounds[0] is None else np.searchsorted(keys, key_of(bounds[0]), side="left")
+    hi = len(keys) if bounds[1] is None else np.searchsorted(keys, key_of(bounds[1]), side="right")
+    wraps = (not use_datetime and None not in bounds and key_of(bounds[0]) > key_of(bounds[1]))
+    selected = np.concatenate((rows[lo:], rows[:hi])) if wraps else rows[lo:hi]
+    if len(selected) == 0:
+        raise ValueError(f"Aucune injection entre {start_time} et {end_time}")
+    return np.sort(selected)
@@ -1,4 +1,4 @@
-use tauri::{command, AppHandle, Manager, State};
+use tauri::{command, AppHandle, Emitter, Manager, State};
 use dirs::document_dir;
 use serde::{Serialize, Deserialize};
 use serde_json::Value as JsonValue;
@@ -19,6 +19,8 @@ struct MetricSelected {
     name: String,
     #[serde(default, skip_serializing_if = "Vec::is_empty", rename = "chimicalElementSelected")]
     chimical_element_selected: Vec<String>,
+    #[serde(default, rename = "timeRange", skip_serializing_if = "Option::is_none")]
+    time_range: Option<TimeRangeSelection>,
 }
 
 #[derive(Debug, Serialize, Deserialize)]
@@ -34,6 +36,8 @@ struct PignatSelectedMetric {
     name: String,
     #[serde(rename = "timeRange")]
     time_range: Option<TimeRangeSelection>,
+    #[serde(default, skip_serializing_if = "Vec::is_empty")]
+    aggregates: Vec<String>,
 }
 
 #[derive(Debug, Serialize, Deserialize)]
@@ -43,6 +47,11 @@ struct SelectedMetricsBySensor {
     chromeleon_online_permanent_gas: Vec<MetricSelected>,
     pignat: Vec<PignatSelectedMetric>,
     resume: Vec<String>,
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    data_quality: Option<bool>,
+    // true ou {"lookbackS"?, "channels"?}
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    injection_conditions: Option<JsonValue>,
 }
 
 struct PythonProcess {
@@ -101,7 +110,7 @@ impl PythonProcess {
         })
     }
 
-    fn send_command(&mut self, args: &[&str]) -> Result<CommandOutput, String> {
+    fn send_command(&mut self, args: &[&str], app: &AppHandle) -> Result<CommandOutput, String> {
         self.last_used = Instant::now();
         
         // Envoyer la commande au processus Python
@@ -124,6 +133,13 @@ impl PythonProcess {
                     if line.trim() == "<<<END_RESPONSE>>>" {
                         break;
                     }
+                    // Événement d'avancement: relayé au frontend, hors réponse
+                    if let Some(event) = line.trim().strip_prefix("<<<EVENT>>>") {
+                        if let Ok(payload) = serde_json::from_str::<JsonValue>(event) {
+                            let _ = app.emit("python-progress", payload);
+                        }
+                        continue;
+                    }
                     response.push_str(&line);
                 }
                 Err(e) => return Err(format!("Failed to read from Python stdout: {}", e)),
@@ -190,7 +206,7 @@ impl PythonService {
         // Exécuter la commande
         process_guard.as_mut()
             .unwrap()
-            .send_command(args)
+            .send_command(args, &self.app_handle)
     }
 }
 
@@ -367,6 +383,20 @@ fn get_context_b64(python_service: State<PythonServiceState>, dir_path: String)
         .ok_or_else(|| "Invalid JSON: expected string".into())
 }
 
+#[tauri::command]
+fn preload_experiment(python_service: State<PythonServiceState>, dir_path: String) -> Result<JsonValue, String> {
+    // Lance le parsing des sources en arrière-plan côté Python et rend la main tout de suite
+    let out = run_python_with_service(&python_service, &["PRELOAD", &dir_path])?;
+    if out.stdout.trim().is_empty() {
+        return Err(if out.stderr.trim().is_empty() {
+            "Empty stdout from Python".into()
+        } else {
+            out.stderr
+        });
+    }
+    parse_python_json(&out.stdout)
+}
+
 #[tauri::command]
 fn get_context_experience_name(python_service: State<PythonServiceState>, dir_path: String) -> Result<String, String> {
     let out = run_python_with_service(&python_service, &["GET_CONTEXT_EXPERIENCE_NAME", &dir_path])?;
@@ -409,6 +439,96 @@ fn get_time_range(python_service: State<PythonServiceState>, dir_path: String) -
     parse_python_json(&out.stdout)
 }
 
+#[tauri::command]
+fn get_time_series(python_service: State<PythonServiceState>, dir_path: String, request: JsonValue) -> Result<JsonValue, String> {
+    // request: {"metrics": [...], "startTime"?, "endTime"?, "maxPoints"?}
+    let request = request.to_string();
+    let out = run_python_with_service(&python_service, &["GET_TIME_SERIES", &dir_path, &request])?;
+    if out.stdout.trim().is_empty() {
+        return Err(if out.stderr.trim().is_empty() {
+            "Empty stdout from Python".into()
+        } else {
+            out.stderr
+        });
+    }
+    parse_python_json(&out.stdout)
+}
+
+#[tauri::command]
+fn get_gc_series(python_service: State<PythonServiceState>, dir_path: String, request: JsonValue) -> Result<JsonValue, String> {
+    // request: {"chimicalElements"?: [...], "maxPoints"?, "maxElements"?}
+    let request = request.to_string();
+    let out = run_python_with_service(&python_service, &["GET_GC_SERIES", &dir_path, &request])?;
+    if out.stdout.trim().is_empty() {
+        return Err(if out.stderr.trim().is_empty() {
+            "Empty stdout from Python".into()
+        } else {
+            out.stderr
+        });
+    }
+    parse_python_json(&out.stdout)
+}
+
+#[tauri::command]
+fn get_data_quality(python_service: State<PythonServiceState>, dir_path: String, options: JsonValue) -> Result<JsonValue, String> {
+    // options: {"nominalPeriodS"?, "flatMinDurationS"?, "outPath"?}
+    let options = options.to_string();
+    let out = run_python_with_service(&python_service, &["DATA_QUALITY", &dir_path, &options])?;
+    if out.stdout.trim().is_empty() {
+        return Err(if out.stderr.trim().is_empty() {
+            "Empty stdout from Python".into()
+        } else {
+            out.stderr
+        });
+    }
+    parse_python_json(&out.stdout)
+}
+
+#[tauri::command]
+fn get_integrated_totals(python_service: State<PythonServiceState>, dir_path: String, request: JsonValue) -> Result<JsonValue, String> {
+    // request: {"startTime"?, "endTime"?, "nominalPeriodS"?}
+    let request = request.to_string();
+    let out = run_python_with_service(&python_service, &["INTEGRATED_TOTALS", &dir_path, &request])?;
+    if out.stdout.trim().is_empty() {
+        return Err(if out.stderr.trim().is_empty() {
+            "Empty stdout from Python".into()
+        } else {
+            out.stderr
+        });
+    }
+    parse_python_json(&out.stdout)
+}
+
+#[tauri::command]
+fn get_steady_states(python_service: State<PythonServiceState>, dir_path: String, request: JsonValue) -> Result<JsonValue, String> {
+    // request: {"windowS"?, "minDurationS"?, "channels"?, "maxWindows"?}
+    let request = request.to_string();
+    let out = run_python_with_service(&python_service, &["STEADY_STATE", &dir_path, &request])?;
+    if out.stdout.trim().is_empty() {
+        return Err(if out.stderr.trim().is_empty() {
+            "Empty stdout from Python".into()
+        } else {
+            out.stderr
+        });
+    }
+    parse_python_json(&out.stdout)
+}
+
+#[tauri::command]
+fn get_injection_conditions(python_service: State<PythonServiceState>, dir_path: String, options: JsonValue) -> Result<JsonValue, String> {
+    // options: {"lookbackS"?, "channels"?}
+    let options = options.to_string();
+    let out = run_python_with_service(&python_service, &["INJECTION_CONDITIONS", &dir_path, &options])?;
+    if out.stdout.trim().is_empty() {
+        return Err(if out.stderr.trim().is_empty() {
+            "Empty stdout from Python".into()
+        } else {
+            out.stderr
+        });
+    }
+    parse_python_json(&out.stdout)
+}
+
 #[tauri::command(rename_all = "camelCase")]
 async fn generate_and_save_excel(
     python_service: State<'_, PythonServiceState>,
@@ -528,8 +648,15 @@ pub fn run() {
             get_context_masses,
             get_context_b64,
             get_context_experience_name,
+            preload_experiment,
             get_graphs_available,
             get_time_range,
+            get_time_series,
+            get_gc_series,
+            get_data_quality,
+            get_integrated_totals,
+            get_steady_states,
+            get_injection_conditions,
             generate_and_save_excel,
             // utilitaires :
             get_documents_dir,
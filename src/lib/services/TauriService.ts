@@ -1,5 +1,23 @@
 import { invoke } from "@tauri-apps/api/core";
-import { PyResp, SelectedMetricsBySensor, MetricsBySensor } from "../utils/type";
+import { listen, UnlistenFn } from "@tauri-apps/api/event";
+import {
+  PyResp,
+  SelectedMetricsBySensor,
+  MetricsBySensor,
+  ProgressEvent,
+  TimeSeriesRequest,
+  TimeSeriesByMetric,
+  GcSeriesRequest,
+  GcSeries,
+  DataQualityOptions,
+  IntegratedTotalsRequest,
+  IntegratedTotals,
+  SteadyStateRequest,
+  SteadyStates,
+  InjectionConditionsOptions,
+  InjectionConditions,
+  DataQualityReport,
+} from "../utils/type";
 
 class TauriService {
   async getDocumentsDir(): Promise<string> {
@@ -22,6 +40,10 @@ class TauriService {
     return await invoke<string>("get_context_experience_name", { dirPath });
   }
 
+  async preloadExperiment(dirPath: string): Promise<{ preloading: string[] }> {
+    return await invoke<{ preloading: string[] }>("preload_experiment", { dirPath });
+  }
+
   async getMetricsAvailable(dirPath: string): Promise<MetricsBySensor> {
     return await invoke<MetricsBySensor>("get_graphs_available", { dirPath });
   }
@@ -30,10 +52,37 @@ class TauriService {
     min_time: string;
     max_time: string;
     unique_times: string[];
+    min_timestamp?: string | null;
+    max_timestamp?: string | null;
+    unique_timestamps?: string[];
   }> {
     return await invoke("get_time_range", { dirPath });
   }
 
+  async getTimeSeries(dirPath: string, request: TimeSeriesRequest): Promise<TimeSeriesByMetric> {
+    return await invoke<TimeSeriesByMetric>("get_time_series", { dirPath, request });
+  }
+
+  async getGcSeries(dirPath: string, request: GcSeriesRequest = {}): Promise<GcSeries> {
+    return await invoke<GcSeries>("get_gc_series", { dirPath, request });
+  }
+
+  async getDataQuality(dirPath: string, options: DataQualityOptions = {}): Promise<DataQualityReport> {
+    return await invoke<DataQualityReport>("get_data_quality", { dirPath, options });
+  }
+
+  async getIntegratedTotals(dirPath: string, request: IntegratedTotalsRequest = {}): Promise<IntegratedTotals> {
+    return await invoke<IntegratedTotals>("get_integrated_totals", { dirPath, request });
+  }
+
+  async getSteadyStates(dirPath: string, request: SteadyStateRequest = {}): Promise<SteadyStates> {
+    return await invoke<SteadyStates>("get_steady_states", { dirPath, request });
+  }
+
+  async getInjectionConditions(dirPath: string, options: InjectionConditionsOptions = {}): Promise<InjectionConditions> {
+    return await invoke<InjectionConditions>("get_injection_conditions", { dirPath, options });
+  }
+
   async generateAndSaveExcel(
     dirPath: string,
     metrics: SelectedMetricsBySensor,
@@ -46,6 +95,10 @@ class TauriService {
     });
   }
 
+  async onProgress(callback: (event: ProgressEvent) => void): Promise<UnlistenFn> {
+    return await listen<ProgressEvent>("python-progress", (event) => callback(event.payload));
+  }
+
   async copyFile(sourcePath: string, destinationPath: string): Promise<void> {
     return await invoke("copy_file", { sourcePath, destinationPath });
   }
@@ -4,6 +4,173 @@ export type PyResp = {
   traceback?: string;
 };
 
+export type ProgressEvent = {
+  stage: string;
+  detail: string | null;
+  rows: number | null;
+  elapsed_ms: number;
+  stage_ms: number;
+};
+
+export type TimeSeriesRequest = {
+  metrics: string[];   // Internal metric IDs (ex: "temperature_time")
+  startTime?: string | null;
+  endTime?: string | null;
+  maxPoints?: number;  // Point budget per metric (default 2000)
+};
+
+export type TimeSeries = {
+  name: string;
+  x_axis: string;
+  y_axis: string[];
+  total_points: number;
+  time: string[];
+  series: Record<string, (number | null)[]>;
+};
+
+export type TimeSeriesByMetric = Record<string, TimeSeries>;
+
+export type GcSeriesRequest = {
+  chimicalElements?: string[]; // Default: all compounds
+  maxPoints?: number;          // Injection budget (default 2000)
+  maxElements?: number;        // Compound budget (default 60)
+};
+
+export type GcSeries = {
+  name: string;
+  x_axis: string;
+  total_points: number;
+  injection_names: string[];
+  time: string[];
+  series: Record<string, (number | null)[]>;
+  missing: string[];   // Requested compounds not found
+  truncated: string[]; // Compounds dropped by maxElements
+};
+
+export type DataQualityOptions = {
+  nominalPeriodS?: number;   // Expected sampling period (default: median interval)
+  flatMinDurationS?: number; // Minimum duration of a stuck value (default 600 s)
+  outPath?: string;          // Also write a "Data quality" workbook
+};
+
+export type QualitySpan = {
+  start: string | null;
+  end: string | null;
+  rows: number;
+  duration_s: number | null;
+  missing_samples?: number;
+  value?: number;
+};
+
+export type SensorQuality = {
+  nan_count: number;
+  nan_ratio: number;
+  missing_runs: number;
+  longest_missing_run: { start: string | null; end: string | null; rows: number } | null;
+  constant: boolean;
+  flat_spans: { count: number; longest_s: number | null; spans: QualitySpan[] };
+  out_of_range: {
+    range: [number | null, number | null];
+    count: number;
+    first: string | null;
+    min: number;
+    max: number;
+  } | null;
+};
+
+export type DataQualityReport = {
+  rows: number;
+  start: string | null;
+  end: string | null;
+  sampling: {
+    nominal_period_s: number | null;
+    invalid_timestamps: number;
+    backward_steps: number;
+    gaps: { count: number; missing_samples: number; longest_s: number | null; spans: QualitySpan[] };
+  };
+  sensors: Record<string, SensorQuality>;
+  summary: {
+    gap_count: number;
+    sensors_with_missing: string[];
+    constant_sensors: string[];
+    stuck_sensors: string[];
+    out_of_range_sensors: string[];
+  };
+  out_path?: string;
+};
+
+export type IntegratedTotalsRequest = {
+  startTime?: string | null;
+  endTime?: string | null;
+  nominalPeriodS?: number;   // Expected sampling period (default: median interval)
+};
+
+export type IntegratedTotal = {
+  channel: string;
+  label: string;
+  unit: string;              // Unit of the total (kg, kWh, L)
+  total: number;
+  mean: number | null;       // Time-weighted mean over covered_h
+  mean_unit: string;
+  covered_h: number;         // Integrated duration (gaps excluded)
+};
+
+export type IntegratedTotals = {
+  start: string | null;
+  end: string | null;
+  rows: number;
+  duration_h: number;
+  nominal_period_s: number | null;
+  gaps: { count: number; duration_h: number };
+  totals: IntegratedTotal[];
+  missing: string[];         // Channels absent from the log
+};
+
+export type SteadyStateRequest = {
+  windowS?: number;          // Rolling window (default 900 s)
+  minDurationS?: number;     // Minimum window duration (default: windowS)
+  channels?: string[];       // Default: TT301, TT302, TT303, TT206, FT240
+  maxWindows?: number;       // Longest windows kept (default 10)
+};
+
+export type InjectionConditionsOptions = {
+  lookbackS?: number;        // Averaging window before each injection (default 300 s)
+  channels?: string[];       // Pignat channels (default: TT301-TT303, FT240, PI177, PT230)
+};
+
+export type InjectionConditions = {
+  mode: "datetime" | "time_of_day";  // time_of_day when GC and Pignat dates do not overlap
+  lookback_s: number;
+  channels: string[];
+  missing: string[];         // Requested channels absent from the log
+  matched: number;           // Injections with Pignat samples in their window
+  injections: {
+    name: string;
+    time: string;
+    timestamp: string | null;
+    samples: number;
+    conditions: Record<string, number | null>;
+    composition: Record<string, number | null>;
+  }[];
+};
+
+export type SteadyStateWindow = {
+  timeRange: { startTime: string; endTime: string };  // Ready to pre-fill a metric timeRange ("YYYY-MM-DD HH:MM:SS" when the log is dated)
+  duration_s: number;
+  rows: number;
+  channels: Record<string, { mean: number | null; std: number | null }>;
+};
+
+export type SteadyStates = {
+  window_s: number;
+  min_duration_s: number;
+  nominal_period_s: number | null;
+  channels: string[];
+  ignored: string[];         // Channels absent or empty
+  stable_ratio: number;      // Share of rows inside a steady window
+  windows: SteadyStateWindow[];
+};
+
 type Metric = {
   name: string;        // Internal ID (for API communication)
   displayName?: string; // Display name (for UI, optional for backward compatibility)
@@ -54,11 +221,15 @@ export interface TimeRangeSelection {
 export type MetricSelected = {
   name: string;
   chimicalElementSelected?: string[];
+  timeRange?: TimeRangeSelection; // Restricts the GC sheet (table, averages, summaries) to the window
 };
 
+export type PignatAggregate = "mean" | "min" | "max" | "std" | "count";
+
 export type PignatSelectedMetric = {
   name: string;
   timeRange?: TimeRangeSelection;
+  aggregates?: PignatAggregate[]; // Extra 1-minute columns; the mean is always included
 };
 
 export interface SelectedMetricsBySensor {
@@ -67,12 +238,18 @@ export interface SelectedMetricsBySensor {
   chromeleon_online_permanent_gas: MetricSelected[];
   pignat: PignatSelectedMetric[];
   resume: string[];
+  data_quality?: boolean; // Adds the Pignat "Data quality" sheet
+  injection_conditions?: boolean | InjectionConditionsOptions; // Adds the "GC + Pignat" sheet
 }
 
 export interface TimeRangeData {
   min_time: string;
   max_time: string;
   unique_times: string[];
+  // Full "YYYY-MM-DD HH:MM:SS" timestamps (null / empty when the log has no date)
+  min_timestamp?: string | null;
+  max_timestamp?: string | null;
+  unique_timestamps?: string[];
 }
 
 export interface ContextValidationResult {